@@ -0,0 +1,65 @@
+"""
+Compares the paths of `imslp.interfaces.scraping` that extract the
+metadata of the files of a work page: the original path, which searches
+the whole tree for each file, and the single-pass path, with each of the
+available BeautifulSoup parsers.
+
+Usage: python benchmarks/bench_scraping.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fixtures
+import imslp.interfaces.scraping
+
+
+def available_parsers():
+    parsers = ["html.parser"]
+    try:
+        import lxml
+        parsers.append("lxml")
+    except ImportError:
+        pass
+    return parsers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+
+    for n_files in (5, 25, 100):
+        content, images = fixtures.make_work_page(n_files=n_files)
+
+        for html_parser in available_parsers():
+            for single_pass in (False, True):
+                timings = timeit.repeat(
+                    lambda: imslp.interfaces.scraping._parse_images_metadata(
+                        content=content,
+                        files=images,
+                        single_pass=single_pass,
+                        parser=html_parser),
+                    number=1,
+                    repeat=args.repeat)
+
+                results.append({
+                    "n_files": n_files,
+                    "page_bytes": len(content),
+                    "parser": html_parser,
+                    "single_pass": single_pass,
+                    "min_s": min(timings),
+                })
+
+    print(json.dumps({"benchmark": "scraping", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
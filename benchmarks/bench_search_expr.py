@@ -0,0 +1,83 @@
+"""
+Compares the interpreted `check_search_expr_to_query` with the matchers
+built by `compile_search_expr`, applied to the titles of every work of
+the catalogue.
+
+Usage: python benchmarks/bench_search_expr.py [--synthetic N] [--repeat N]
+
+By default, the full works catalogue is loaded (see `load_cache`); with
+`--synthetic N`, a synthetic catalogue of N works is used instead.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fixtures
+import imslp.helpers.string_search
+import imslp.interfaces.internal
+
+
+# Search expressions measured, by name
+SEARCH_EXPRS = {
+    "string": "sonata",
+    "string_list_union": ["sonata", "symphony", "quartet", "requiem"],
+    "string_list_intersect": ["sonata", "piano", "no."],
+    "regex": re.compile(r"Op\.\d+"),
+    "mixed_list": ["concerto", re.compile(r"No\.[12]\b"), lambda title: len(title) > 10],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--synthetic", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.synthetic is not None:
+        _, works = fixtures.make_catalogue(n_works=args.synthetic, n_people=0)
+    else:
+        works = imslp.interfaces.internal.list_works()
+
+    titles = [work["intvals"]["worktitle"] for work in works]
+
+    results = []
+
+    for name, search_expr in SEARCH_EXPRS.items():
+        for intersect in (True, False):
+
+            def interpreted():
+                return [
+                    title for title in titles
+                    if imslp.helpers.string_search.check_search_expr_to_query(
+                        query=title, search_expr=search_expr, intersect=intersect)
+                ]
+
+            def compiled():
+                matcher = imslp.helpers.string_search.compile_search_expr(
+                    search_expr=search_expr, intersect=intersect)
+                return [title for title in titles if matcher(title)]
+
+            assert interpreted() == compiled()
+
+            interpreted_s = min(timeit.repeat(interpreted, number=1, repeat=args.repeat))
+            compiled_s = min(timeit.repeat(compiled, number=1, repeat=args.repeat))
+
+            results.append({
+                "expression": name,
+                "intersect": intersect,
+                "interpreted_s": interpreted_s,
+                "compiled_s": compiled_s,
+                "speedup": interpreted_s / compiled_s,
+            })
+
+    print(json.dumps({"benchmark": "search_expr", "n_works": len(titles), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measures the startup cost of the package: the time to run `import
+imslp.client` and to construct an `ImslpClient`, each in a fresh
+interpreter (so that no module is already imported).
+
+Usage: python benchmarks/bench_startup.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Snippet run in each fresh interpreter, which prints its timings as JSON
+STARTUP_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import imslp.client
+t1 = time.perf_counter()
+client = imslp.client.ImslpClient()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0,
+    "construct": t2 - t1,
+    "modules": sorted(m for m in ("mwclient", "bs4", "requests") if m in sys.modules),
+}))
+"""
+
+
+def measure_once() -> dict:
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    output = subprocess.check_output(
+        [sys.executable, "-c", STARTUP_SNIPPET],
+        cwd=root,
+        env=dict(os.environ, PYTHONPATH=root),
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeat)]
+
+    results = {
+        "benchmark": "startup",
+        "repeat": args.repeat,
+        "modules_imported": runs[-1]["modules"],
+    }
+    for key in ("import", "construct"):
+        timings = [run[key] for run in runs]
+        results[key] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "max_s": max(timings),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
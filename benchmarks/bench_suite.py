@@ -0,0 +1,187 @@
+"""
+Times the main operations of the package end to end, against a local
+stand-in for the IMSLP servers (see `mock_server.py`): loading the
+catalogue (`_raw_call`, `load_cache`), searching it (`search_works`,
+`search_people`) at several catalogue sizes, and scraping category charts
+and work pages (`fetch_category_table`, `fetch_images_metadata`).
+
+Usage: python benchmarks/bench_suite.py [--sizes N [N ...]] [--repeat N] [--output PATH]
+
+The results are printed as JSON (and written to PATH if given), so that
+they can be compared between revisions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mock_server
+import imslp
+import imslp.client
+import imslp.interfaces.internal
+import imslp.interfaces.scraping
+
+import mwclient
+import mwclient.page
+
+
+# Search expressions measured, by name
+SEARCH_EXPRS = {
+    "string": {"title": "sonata"},
+    "string_list": {"title": ["sonata", "piano"]},
+    "title_and_composer": {"title": "symphony", "composer": "beethoven"},
+    "regex": {"title": re.compile(r"No\.1\d\b")},
+}
+
+
+def timed(function, repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def reset_catalogue(people: list = None, works: list = None, memoize: bool = True) -> None:
+    imslp.interfaces.internal._default_cache = imslp.interfaces.internal.CatalogueCache(
+        people=people,
+        works=works,
+        search_results_cache_size=imslp.interfaces.internal.IMSLP_SEARCH_RESULTS_CACHE_SIZE if memoize else 0)
+
+
+def timed_search(search, repeat: int) -> dict:
+    """
+    Times a search on the loaded catalogue, once the structures built over
+    the catalogue exist: without memoization of the results (`warm_s`),
+    then when its results are memoized (`memo_hit_s`).
+    """
+
+    default_cache = imslp.interfaces.internal.get_default_cache()
+    people, works = default_cache.get_catalogue("people"), default_cache.get_catalogue("works")
+
+    reset_catalogue(people=people, works=works, memoize=False)
+    search()
+    warm_s = timed(search, repeat)
+
+    reset_catalogue(people=people, works=works)
+    search()
+    memo_hit_s = timed(search, repeat)
+
+    return {"warm_s": warm_s, "memo_hit_s": memo_hit_s}
+
+
+def bench_catalogue(n_works: int, repeat: int) -> dict:
+    results = {"n_works": n_works}
+
+    with mock_server.MockImslpServer(n_works=n_works) as server:
+        results["n_people"] = len(server.people)
+        url = imslp.interfaces.internal.IMSLP_API_WORKS
+
+        results["raw_call_s"] = timed(lambda: imslp.interfaces.internal._raw_call(url), repeat)
+        results["raw_call_concurrent_s"] = timed(
+            lambda: imslp.interfaces.internal._raw_call(url, concurrency=8), repeat)
+
+        def load():
+            reset_catalogue()
+            imslp.interfaces.internal.load_cache(from_file=False, persist=False, concurrency=8)
+
+        results["load_cache_s"] = timed(load, repeat)
+
+    # searches do not make requests, and are measured on the loaded catalogue
+    searches = []
+    people, works = imslp.interfaces.internal.list_people(), imslp.interfaces.internal.list_works()
+    for name, kwargs in SEARCH_EXPRS.items():
+        reset_catalogue(people=people, works=works, memoize=False)
+
+        t0 = time.perf_counter()
+        count = len(imslp.client.ImslpClient.search_works(**kwargs))
+        cold_s = time.perf_counter() - t0
+
+        searches.append(dict({
+            "expression": name,
+            "results": count,
+            "cold_s": cold_s,
+        }, **timed_search(lambda: imslp.client.ImslpClient.search_works(**kwargs), repeat)))
+
+    # (the results of paginated searches are not memoized)
+    def first_page():
+        return list(imslp.client.ImslpClient.iter_search_works(title="sonata", limit=20))
+
+    reset_catalogue(people=people, works=works, memoize=False)
+    searches.append({
+        "expression": "string_first_page",
+        "results": len(first_page()),
+        "warm_s": timed(first_page, repeat),
+    })
+
+    searches.append(dict({
+        "expression": "people",
+        "results": len(imslp.client.ImslpClient.search_people(name="bach")),
+    }, **timed_search(lambda: imslp.client.ImslpClient.search_people(name="bach"), repeat)))
+
+    results["search"] = searches
+
+    reset_catalogue()
+    return results
+
+
+def bench_scraping(repeat: int) -> dict:
+    results = dict()
+
+    with mock_server.MockImslpServer(n_works=0, n_people=0, n_files=25, chart_rows=1000) as server:
+        results["chart_rows"] = len(server.chart_works)
+        results["n_files"] = len(server.images)
+
+        for pipelined in (False, True):
+            results["fetch_category_table_{}s".format("pipelined_" if pipelined else "")] = timed(
+                lambda: imslp.interfaces.scraping.fetch_category_table("Composer", pipelined=pipelined),
+                repeat)
+
+        site = mwclient.Site(
+            "imslp.org", path="/", scheme="https",
+            pool=imslp.interfaces.transport.get_session(), do_init=False)
+        page = mwclient.page.Page(site, "Work (Composer)", info={"ns": 0, "title": "Work (Composer)"})
+
+        results["fetch_images_metadata_s"] = timed(
+            lambda: imslp.interfaces.scraping.fetch_images_metadata(page), repeat)
+
+        titles = ["Work {} (Composer)".format(i) for i in range(20)]
+        results["fetch_images_metadata_batch_20_s"] = timed(
+            lambda: imslp.interfaces.scraping.fetch_images_metadata_batch(titles, site=site), repeat)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    # keep the user-level disk cache out of the measurements
+    os.environ["IMSLP_CACHE_DIR"] = tempfile.mkdtemp(prefix="imslp-bench-")
+
+    report = {
+        "benchmark": "suite",
+        "version": imslp.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "catalogue": [bench_catalogue(n_works=n_works, repeat=args.repeat) for n_works in args.sizes],
+        "scraping": bench_scraping(repeat=args.repeat),
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output is not None:
+        with open(args.output, mode="w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Synthetic fixtures modelled on the markup of IMSLP pages, used by the
+benchmarks (recordings of real pages cannot be redistributed with the
+package).
+"""
+
+import json
+import random
+
+
+# Template of the entry of a file on a work page
+WORK_PAGE_FILE_ENTRY = """
+<div class="we_file_entry">
+<div class="we_file_download plainlinks"><p><b><a class="external text" rel="nofollow" href="/wiki/Special:ImagefromIndex/{file_id}/{token}"><span title="Download this file">{label}</span></a></b></p></div>
+<div class="we_file_info2"><span class="we_file_dlarrwrap"><a href="/wiki/File:{esc_title}" title="File:{title}">#{file_id}</a> - {size_mb:.2f}MB, {page_count} pp. - <span class="we_ratings" id="IMSLPRatingsList{file_id}"></span> - <a href="/wiki/Special:GetFCtrStats/@{file_id}" title="Special:GetFCtrStats/@{file_id}">{download_count}</a>&#xD7; - <a href="/wiki/Special:IMSLPMirrorMirrors/{file_id}">Mirror</a></span></div>
+<div class="we_edition_info"><table><tr><th>Editor</th><td><a href="/wiki/Category:Editor_{n}" title="Category:Editor {n}">Editor {n}</a></td></tr><tr><th>Publisher. Info.</th><td>Publisher {n}, n.d. Plate {plate}.</td></tr><tr><th>Copyright</th><td><a href="/wiki/Public_Domain" title="Public Domain">Public Domain</a></td></tr><tr><th>Misc. Notes</th><td>Scanned at 600 dpi. Notes about the edition of file number {n}.</td></tr></table></div>
+</div>
+"""
+
+# Filler markup, standing for the navigation, sidebar and metadata tables
+WORK_PAGE_FILLER = """
+<div class="portal"><ul>{items}</ul></div>
+"""
+
+
+class FixtureImage:
+    """
+    Stand-in for a `mwclient.image.Image`, with the attributes used by
+    `imslp.interfaces.scraping`.
+    """
+
+    def __init__(self, title: str, url: str, size: int, sha1: str):
+        self.name = "File:{}".format(title)
+        self.base_title = title
+        self.imageinfo = {"url": url, "size": size, "sha1": sha1}
+
+
+def make_work_page(n_files: int, filler_items: int = 400, seed: int = 0):
+    """
+    Returns the HTML of a work page with `n_files` files, along with the
+    list of the image objects of these files.
+    """
+
+    rng = random.Random(seed)
+
+    entries = []
+    images = []
+    ratings = dict()
+
+    for n in range(n_files):
+        file_id = 100000 + n
+        title = "PMLP{:05d}-Composer Work Op.{} Part {}.pdf".format(seed, n_files, n)
+        entries.append(WORK_PAGE_FILE_ENTRY.format(
+            file_id=file_id,
+            token="{:08x}".format(rng.getrandbits(32)),
+            label="Part {}".format(n),
+            esc_title=title.replace(" ", "_"),
+            title=title,
+            size_mb=rng.uniform(0.2, 20.0),
+            page_count=rng.randint(1, 400),
+            download_count=rng.randint(0, 100000),
+            n=n,
+            plate=rng.randint(1, 9999),
+        ))
+        images.append(FixtureImage(
+            title=title,
+            url="//imslp.org/images/{}".format(title.replace(" ", "_")),
+            size=rng.randint(10 ** 5, 10 ** 8),
+            sha1="{:040x}".format(rng.getrandbits(160)),
+        ))
+        ratings[str(file_id)] = [round(rng.uniform(0, 10), 1), str(rng.randint(0, 50))]
+
+    filler = WORK_PAGE_FILLER.format(items="".join(
+        '<li><a href="/wiki/Page_{0}" title="Page {0}">Page {0}</a></li>'.format(i)
+        for i in range(filler_items)))
+
+    html = (
+        "<!DOCTYPE html><html><head><title>Work (Composer) - IMSLP</title>"
+        "<script>var wgPageName=\"Work_(Composer)\";</script>"
+        "<script>var IMSLPRatings={};</script>"
+        "</head><body><div id=\"content\">{}<div class=\"we\">{}</div>{}</div></body></html>"
+    ).format(json.dumps(ratings), filler, "".join(entries), filler)
+
+    return html.encode("utf-8"), images
+
+
+# Vocabulary used to generate the titles of works and the names of people
+_FORMS = ["Symphony", "Sonata", "Concerto", "Prelude", "Fugue", "Mass", "Quartet", "Étude",
+          "Nocturne", "Variations", "Suite", "Overture", "Requiem", "Te Deum", "Lieder"]
+_INSTRUMENTS = ["", "for Piano", "for Violin and Piano", "for Orchestra", "for String Quartet",
+                "for Organ", "for Voice and Piano", "for Flute"]
+_SURNAMES = ["Bach", "Beethoven", "Dvořák", "Mozart", "Händel", "Chopin", "Fauré", "Satie",
+             "Schubert", "Brahms", "Liszt", "Ravel", "Debussy", "Janáček", "Grieg", "Sibelius"]
+_FIRST_NAMES = ["Johann", "Ludwig", "Antonín", "Wolfgang", "Georg", "Frédéric", "Gabriel",
+                "Erik", "Franz", "Johannes", "Maurice", "Claude", "Leoš", "Edvard", "Jean"]
+
+
+def make_person_record(i: int, rng: random.Random) -> dict:
+    name = "{} {}, {}".format(rng.choice(_SURNAMES), i, rng.choice(_FIRST_NAMES))
+    return {
+        "id": "Category:{}".format(name),
+        "type": "1",
+        "parent": "",
+        "intvals": {},
+        "permlink": "http://imslp.org/wiki/Category:{}".format(name.replace(" ", "_")),
+    }
+
+
+def make_work_record(i: int, composer: str, rng: random.Random) -> dict:
+    title = "{} No.{} {}, Op.{}".format(
+        rng.choice(_FORMS), rng.randint(1, 30), rng.choice(_INSTRUMENTS), i).replace("  ", " ")
+    page_name = "{} ({})".format(title, composer)
+    return {
+        "id": page_name,
+        "type": "2",
+        "parent": "Category:{}".format(composer),
+        "intvals": {
+            "composer": composer,
+            "worktitle": title,
+            "icatno": "Op.{}".format(i),
+            "pageid": str(100000 + i),
+        },
+        "permlink": "http://imslp.org/wiki/{}".format(page_name.replace(" ", "_")),
+    }
+
+
+def make_catalogue(n_works: int, n_people: int = None, seed: int = 0):
+    """
+    Returns synthetic people and works catalogues, shaped like the records
+    of the internal IMSLP API (by default with the IMSLP ratio of about
+    five people per work).
+    """
+
+    rng = random.Random(seed)
+
+    if n_people is None:
+        n_people = 5 * n_works
+
+    people = [make_person_record(i, rng) for i in range(n_people)]
+
+    # about one person in ten is a composer
+    composer_records = people[:n_people // 10] or [make_person_record(i, rng) for i in range(100)]
+    composers = [person["id"][len("Category:"):] for person in composer_records]
+    works = [make_work_record(i, rng.choice(composers), rng) for i in range(n_works)]
+
+    return people, works
+
+
+# Template of a page of the chart of the works of a category
+CATEGORY_PAGE = """<!DOCTYPE html><html><head><title>{title} - IMSLP</title></head><body>
+<div id="content">{filler}{next_link}
+<table class="wikitable sortable"><tr><th>Work</th><th>Opus/Catalogue Number</th><th>Key</th><th>Genre</th></tr>
+{rows}</table>{next_link}</div></body></html>"""
+
+CATEGORY_PAGE_NEXT_LINK = (
+    '<a href="/index.php?title={esc_title}&amp;customcat=ccperson1&amp;from={next}" '
+    'class="categorypaginglink" title="{title}">next 200</a>')
+
+CATEGORY_PAGE_ROW = (
+    '<tr><td><a href="/wiki/{esc_work}" title="{work}">{work}</a></td>'
+    '<td>Op.{n}</td><td>{key}&#xA0;major</td><td>{genre}</td></tr>')
+
+
+def make_category_page(category_title: str, works: list, page: int, page_size: int = 200) -> bytes:
+    """
+    Returns the HTML of page `page` of the chart of the works of a category
+    (with a link to the next page, unless it is the last one).
+    """
+
+    page_works = works[page * page_size:(page + 1) * page_size]
+
+    next_link = ""
+    if (page + 1) * page_size < len(works):
+        next_link = CATEGORY_PAGE_NEXT_LINK.format(
+            esc_title=category_title.replace(" ", "_").replace("'", "%27"),
+            title=category_title,
+            next=page + 1)
+
+    rows = "\n".join(
+        CATEGORY_PAGE_ROW.format(
+            esc_work=work.replace(" ", "_"),
+            work=work,
+            n=page * page_size + i,
+            key="CDEFGAB"[i % 7],
+            genre=_FORMS[i % len(_FORMS)])
+        for i, work in enumerate(page_works))
+
+    filler = WORK_PAGE_FILLER.format(items="".join(
+        '<li><a href="/wiki/Page_{0}" title="Page {0}">Page {0}</a></li>'.format(i)
+        for i in range(100)))
+
+    return CATEGORY_PAGE.format(
+        title=category_title, filler=filler, next_link=next_link, rows=rows).encode("utf-8")
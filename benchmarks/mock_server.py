@@ -0,0 +1,177 @@
+"""
+Local stand-in for the IMSLP servers, used by the benchmarks: it serves
+the pages of the internal IMSLP API (worklists), the charts of categories,
+the HTML of work pages, and answers the `query` actions of the MediaWiki
+API, from the synthetic fixtures of `fixtures.py`.
+
+The requests of the package are routed to the server by mounting a
+transport adapter on the shared session of `imslp.interfaces.transport`,
+so that the code paths being measured are exactly those used against
+IMSLP.
+"""
+
+import http.server
+import json
+import re
+import threading
+import urllib.parse
+
+import requests.adapters
+
+import fixtures
+import imslp.interfaces.transport
+
+
+# Number of records per page of the internal IMSLP API
+MOCK_API_PAGE_SIZE = 1000
+
+# Regular expression to extract the type and offset of a worklist request
+MOCK_REGEXP_WORKLIST = re.compile(r"type=(\d+)/start=(\d+)")
+
+
+class _RedirectAdapter(requests.adapters.HTTPAdapter):
+    """
+    Transport adapter that sends the requests made to a host to another
+    base URL instead.
+    """
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self._base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urllib.parse.urlsplit(request.url)
+        request.url = self._base_url + parts.path + ("?" + parts.query if parts.query else "")
+        return super().send(request, **kwargs)
+
+
+class MockImslpServer:
+    """
+    HTTP server (on a random local port, in a background thread) serving a
+    synthetic catalogue of `n_works` works and `n_people` people, work pages
+    with `n_files` files each, and category charts of `chart_rows` works.
+
+    Use as a context manager: on entry, the requests made by the package to
+    `imslp.org` are routed to the server.
+    """
+
+    def __init__(self, n_works: int, n_people: int = None, n_files: int = 10, chart_rows: int = 1000):
+        self.people, self.works = fixtures.make_catalogue(n_works=n_works, n_people=n_people)
+        self.work_page, self.images = fixtures.make_work_page(n_files=n_files)
+        self.chart_works = ["Work {} (Composer)".format(i) for i in range(chart_rows)]
+        self.requests_count = 0
+
+        self._images_by_title = {"File:{}".format(image.base_title): image for image in self.images}
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return "http://{}:{}".format(host, port)
+
+    def _worklist(self, query: str) -> dict:
+        m = MOCK_REGEXP_WORKLIST.search(query)
+        typ, start = int(m.group(1)), int(m.group(2))
+        records = self.people if typ == 1 else self.works
+
+        obj = {str(start + i): record for i, record in enumerate(records[start:start + MOCK_API_PAGE_SIZE])}
+        obj["metadata"] = {"moreresultsavailable": start + MOCK_API_PAGE_SIZE < len(records)}
+        return obj
+
+    def _file_info(self, title: str, i: int) -> dict:
+        image = self._images_by_title[title]
+        return {"pageid": 1000 + i, "ns": 6, "title": title, "imageinfo": [dict(image.imageinfo)]}
+
+    def _mediawiki_query(self, params: dict) -> dict:
+        titles = params.get("titles", "").split("|")
+        pages = dict()
+
+        if params.get("generator") == "images":
+            for i, title in enumerate(self._images_by_title):
+                pages[str(1000 + i)] = self._file_info(title, i)
+
+        else:
+            for i, title in enumerate(titles):
+                if title in self._images_by_title:
+                    pages[str(1000 + i)] = self._file_info(title, i)
+                else:
+                    pages[str(i + 1)] = {
+                        "pageid": i + 1, "ns": 0, "title": title,
+                        "images": [{"ns": 6, "title": file_title} for file_title in self._images_by_title],
+                    }
+
+        return {"batchcomplete": "", "query": {"pages": pages}}
+
+    def _respond(self, method: str, path: str, query: str, body: bytes) -> bytes:
+        self.requests_count += 1
+
+        if path.endswith("/API.ISCR.php"):
+            return json.dumps(self._worklist(query)).encode("utf-8")
+
+        if path.endswith("/api.php"):
+            params = dict(urllib.parse.parse_qsl(query))
+            if method == "POST":
+                params.update(urllib.parse.parse_qsl(body.decode("utf-8")))
+            return json.dumps(self._mediawiki_query(params)).encode("utf-8")
+
+        if path.endswith("/index.php"):
+            params = dict(urllib.parse.parse_qsl(query))
+            return fixtures.make_category_page(
+                category_title=params["title"].replace("_", " "),
+                works=self.chart_works,
+                page=int(params.get("from", 0)))
+
+        return self.work_page
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method: str):
+                parts = urllib.parse.urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                content = server._respond(method=method, path=parts.path, query=parts.query, body=body)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json" if content[:1] == b"{" else "text/html")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "MockImslpServer":
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        # route the requests of the shared session to the server
+        imslp.interfaces.transport.configure()
+        session = imslp.interfaces.transport.get_session()
+        adapter = _RedirectAdapter(
+            base_url=self.base_url,
+            pool_connections=imslp.interfaces.transport.IMSLP_HTTP_POOL_SIZE,
+            pool_maxsize=imslp.interfaces.transport.IMSLP_HTTP_POOL_SIZE)
+        for prefix in ("http://imslp.org/", "https://imslp.org/"):
+            session.mount(prefix, adapter)
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        imslp.interfaces.transport.configure()
@@ -0,0 +1,214 @@
+import asyncio
+import functools
+import typing
+
+import imslp
+import imslp.client
+import imslp.helpers.string_search
+import imslp.interfaces
+import imslp.interfaces.async_transport
+import imslp.interfaces.internal
+import imslp.interfaces.transport
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "AsyncImslpClient",
+]
+
+
+class AsyncImslpClient:
+    """
+    Asynchronous client of IMSLP, for applications running on an `asyncio`
+    event loop: all the requests go through a single
+    `imslp.interfaces.async_transport.AsyncTransport` (built on `aiohttp`),
+    so that many page enrichments can be interleaved on the event loop,
+    sharing a connection pool, with at most `concurrency` requests in
+    flight. HTML pages are parsed in the default executor of the loop.
+
+    The catalogue is loaded into the same memory cache as the synchronous
+    functions (or into the `catalogue_cache` given to the constructor), so
+    that the (in-memory) searches of `ImslpClient` can be used once it is
+    loaded.
+    """
+
+    def __init__(
+            self,
+            pool_size: int = imslp.interfaces.transport.IMSLP_HTTP_POOL_SIZE,
+            concurrency: int = imslp.interfaces.async_transport.IMSLP_ASYNC_CONCURRENCY,
+            transport: typing.Optional[imslp.interfaces.async_transport.AsyncTransport] = None,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ):
+        if transport is None:
+            transport = imslp.interfaces.async_transport.AsyncTransport(
+                pool_size=pool_size,
+                concurrency=concurrency,
+            )
+        self._transport = transport
+        self._catalogue_cache = catalogue_cache
+
+    @property
+    def transport(self) -> imslp.interfaces.async_transport.AsyncTransport:
+        """
+        Returns the asynchronous transport of the client.
+        """
+        return self._transport
+
+    @property
+    def catalogue_cache(self) -> imslp.interfaces.internal.CatalogueCache:
+        """
+        Returns the memory cache of the catalogues searched by the client
+        (see `imslp.client.ImslpClient.catalogue_cache`).
+        """
+        if self._catalogue_cache is None:
+            return imslp.interfaces.internal.get_default_cache()
+        return self._catalogue_cache
+
+    async def close(self) -> None:
+        """
+        Closes the connection pool of the client.
+        """
+        await self._transport.close()
+
+    async def __aenter__(self) -> "AsyncImslpClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def load_cache(
+            self,
+            from_file: bool = True,
+            concurrency: int = 8,
+            persist: bool = True,
+            compact: bool = False,
+    ) -> None:
+        """
+        Loads the people and works catalogues concurrently into the memory
+        cache of the client (see `imslp.interfaces.internal.CatalogueCache.load_async()`),
+        if they are not already loaded.
+
+        :param from_file: Determines whether to use package's internal cache
+        :param concurrency: Number of simultaneous requests made to IMSLP per catalogue
+        :param persist: Determines whether to update the user-level disk cache
+        :param compact: Determines whether to use the compact representation
+        """
+
+        await self.catalogue_cache.load_async(
+            transport=self._transport,
+            from_file=from_file,
+            concurrency=concurrency,
+            persist=persist,
+            compact=compact,
+        )
+
+    async def search_works(
+            self,
+            title: imslp.helpers.string_search.ImslpSearchExpression = None,
+            composer: imslp.helpers.string_search.ImslpSearchExpression = None,
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+    ) -> typing.Set[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Searches the works catalogue (see `ImslpClient.search_works()`),
+        loading it first if necessary; the search is run in the default
+        executor of the event loop, so that it does not block the loop.
+        """
+
+        await self.load_cache()
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(
+                imslp.client.ImslpClient.search_works,
+                title=title,
+                composer=composer,
+                intersect=intersect,
+                case_insensitive=case_insensitive,
+                accent_insensitive=accent_insensitive,
+                catalogue_cache=self.catalogue_cache,
+            ))
+
+    async def search_people(
+            self,
+            name: imslp.helpers.string_search.ImslpSearchExpression,
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+    ) -> typing.Set[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Searches the people catalogue (see `ImslpClient.search_people()`),
+        loading it first if necessary; the search is run in the default
+        executor of the event loop, so that it does not block the loop.
+        """
+
+        await self.load_cache()
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(
+                imslp.client.ImslpClient.search_people,
+                name=name,
+                intersect=intersect,
+                case_insensitive=case_insensitive,
+                accent_insensitive=accent_insensitive,
+                catalogue_cache=self.catalogue_cache,
+            ))
+
+    async def fetch_category_table(
+            self,
+            category_name: str,
+            subcategory: typing.Optional[str] = None,
+    ) -> typing.List[dict]:
+        """
+        Fetches the chart containing an index to a category's works (see
+        `imslp.interfaces.scraping.fetch_category_table_async()`).
+        """
+
+        return await imslp.interfaces.scraping.fetch_category_table_async(
+            transport=self._transport,
+            category_name=category_name,
+            subcategory=subcategory,
+        )
+
+    async def fetch_category_tables(
+            self,
+            category_name: str,
+            subcategories: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.Dict[str, typing.List[dict]]:
+        """
+        Fetches the charts of several subcategories of a category
+        concurrently (see `imslp.interfaces.scraping.fetch_category_tables_async()`).
+        """
+
+        return await imslp.interfaces.scraping.fetch_category_tables_async(
+            transport=self._transport,
+            category_name=category_name,
+            subcategories=subcategories,
+        )
+
+    async def fetch_images_metadata(self, page: typing.Union["mwclient.page.Page", str]) -> list:
+        """
+        Fetches the metadata of the images of a page, including their
+        download counters (see
+        `imslp.interfaces.scraping.fetch_images_metadata_async()`).
+        """
+
+        return await imslp.interfaces.scraping.fetch_images_metadata_async(
+            transport=self._transport,
+            page=page,
+        )
+
+    async def fetch_images_metadata_batch(
+            self,
+            pages: typing.Sequence[typing.Union["mwclient.page.Page", str]],
+    ) -> typing.List[list]:
+        """
+        Fetches the metadata of the images of many pages concurrently (see
+        `imslp.interfaces.scraping.fetch_images_metadata_batch_async()`).
+        """
+
+        return await imslp.interfaces.scraping.fetch_images_metadata_batch_async(
+            transport=self._transport,
+            pages=pages,
+        )
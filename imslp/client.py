@@ -1,39 +1,133 @@
 
+import functools
+import heapq
 import typing
 
-import mwclient
-
 import imslp
 import imslp.helpers
+import imslp.helpers.search_index
 import imslp.helpers.string_search
 import imslp.interfaces
+import imslp.interfaces.compact
 import imslp.interfaces.constants
 import imslp.interfaces.internal
-import imslp.interfaces.mw_api
-import imslp.interfaces.scraping
 
 
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 
 __all__ = [
     "ImslpClient",
+    "SearchResults",
 ]
 
 
+class SearchResults(set):
+    """
+    Set of the records matching a search, along with whether the search
+    covered the whole catalogue (`complete` is `True`), or only the part
+    loaded so far by `imslp.interfaces.internal.start_background_loading()`.
+    """
+
+    def __init__(self, records: typing.Iterable = (), complete: bool = True):
+        super().__init__(records)
+        self.complete = complete
+
+
+class _CatalogueMethod:
+    """
+    Decorator of the methods of `ImslpClient` that query the catalogue:
+    called on the class, like static methods, they query the memory cache
+    given as their `catalogue_cache` argument, or the process-wide one;
+    called on an instance, they query the cache attached to it (see
+    `ImslpClient.catalogue_cache`).
+    """
+
+    def __init__(self, function: typing.Callable):
+        self._function = function
+        functools.update_wrapper(self, function)
+
+    def __get__(self, instance, owner) -> typing.Callable:
+        if instance is None:
+            return self._function
+        return functools.partial(self._function, catalogue_cache=instance.catalogue_cache)
+
+
 class ImslpClient:
 
-    # the mwclient object
-    _site = None               # type: mwclient.Site
+    # the mwclient object (created on first use, see `site`)
+    _site = None               # type: imslp.interfaces.mw_api.ImslpMwClient
+
+    # the credentials to log in with when the mwclient object is created
+    _username = None           # type: typing.Optional[str]
+    _password = None           # type: typing.Optional[str]
 
     # the download wait time (in seconds)
     _wait_time = 15            # type: int
 
-    def __init__(self, username=None, password=None):
+    def __init__(
+            self,
+            username=None,
+            password=None,
+            background_loading: bool = False,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ):
+
+        # the MediaWiki site is only initialized when it is first needed,
+        # as this requires network requests that are not needed to search
+        # the catalogue
+        self._username = username
+        self._password = password
 
-        self._site = imslp.interfaces.mw_api.ImslpMwClient(
-            username=username,
-            password=password,
-        )
+        # the catalogue queried by the client, by default the process-wide
+        # one (see `catalogue_cache`)
+        self._catalogue_cache = catalogue_cache
+
+        # the catalogue can be loaded while the client is in use, and
+        # searched as it is being loaded (see `search_works()`)
+        if background_loading:
+            self.catalogue_cache.start_background_loading()
+
+    @property
+    def catalogue_cache(self) -> imslp.interfaces.internal.CatalogueCache:
+        """
+        Returns the memory cache of the catalogues queried by the methods
+        of the client, which is the process-wide one unless another one was
+        given to the constructor.
+        """
+        if self._catalogue_cache is None:
+            return imslp.interfaces.internal.get_default_cache()
+        return self._catalogue_cache
+
+    @property
+    def site(self) -> "imslp.interfaces.mw_api.ImslpMwClient":
+        """
+        Returns the MediaWiki client of IMSLP, initializing it (and logging
+        in, if credentials were provided) on first access.
+        """
+        if self._site is None:
+            self._site = imslp.interfaces.mw_api.ImslpMwClient(
+                username=self._username,
+                password=self._password,
+            )
+        return self._site
+
+    def _get_session_site(self) -> typing.Optional["imslp.interfaces.mw_api.ImslpMwClient"]:
+        # the session of a client created with credentials is that of the
+        # logged in site, which is created (and logged in) when first needed
+        if self._site is None and self._username is not None and self._password is not None:
+            return self.site
+        return self._site
+
+    def sync_catalogue(self, persist: bool = True) -> typing.Dict[str, int]:
+        """
+        Brings the catalogues queried by the client up to date, reading the
+        pages deleted, undeleted or renamed since the last sync from the
+        logs of the wiki (see `imslp.interfaces.internal.sync_cache()`).
+
+        :param persist: Determines whether to update the user-level disk cache
+        :return: The numbers of records `"inserted"`, `"updated"` and `"deleted"`.
+        """
+        return self.catalogue_cache.sync(site=self.site, persist=persist)
 
     def login(
             self,
@@ -42,25 +136,61 @@ class ImslpClient:
             cookies: dict = None,
             domain: str = None,
     ):
-        self._site.login(
+        self.site.login(
             username=username,
             password=username,
             cookies=cookies,
             domain=domain,
         )
 
+    def download_scores(
+            self,
+            images: typing.Iterable[dict],
+            directory: str,
+            max_workers: int = 4,
+            wait_time: typing.Optional[float] = None,
+    ) -> typing.List[str]:
+        """
+        Downloads the files of scores concurrently, streaming them to disk,
+        resuming interrupted transfers, and checking them against their
+        size and SHA-1 digest (see `imslp.interfaces.download`).
+
+        :param images: The metadata of the files, as returned by
+            `imslp.interfaces.scraping.fetch_images_metadata()`.
+        :param directory: The destination directory.
+        :param max_workers: The maximum number of simultaneous downloads.
+        :param wait_time: The minimum time (in seconds) between requests to
+            a same host, by default the client's download wait time.
+        :return: The paths of the downloaded files, in order.
+        """
+
+        # the disclaimer cookies, and the session cookies if logged in
+        cookies = dict(imslp.interfaces.constants.IMSLP_DISCLAIMER_COOKIES)
+        site = self._get_session_site()
+        if site is not None and site.connection is not None:
+            cookies.update(site.connection.cookies.get_dict())
+
+        return imslp.interfaces.download.download_files(
+            images=images,
+            directory=directory,
+            max_workers=max_workers,
+            wait_time=self._wait_time if wait_time is None else wait_time,
+            cookies=cookies,
+        )
+
     @property
     def logged_in(self) -> bool:
         """
         Returns whether the client is currently logged in.
         """
+        site = self._get_session_site()
         return (
-                self._site is not None and
-                self._site.connection is not None and
-                self._site.connection.cookies is not None and
-                len(self._site.connection.cookies) > 1 and
-                imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME in self._site.connection.cookies and
-                self._site.connection.cookies[imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME] != ""
+                site is not None and
+                site.connection is not None and
+                site.connection.cookies is not None and
+                len(site.connection.cookies) > 1 and
+                imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME in site.connection.cookies and
+                site.connection.cookies[imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME] != ""
         )
 
     @property
@@ -72,83 +202,622 @@ class ImslpClient:
         if not self.logged_in:
             return
 
-        return self._site.connection.cookies[imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME]
+        return self._get_session_site().connection.cookies[imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME]
 
     @staticmethod
+    def _search_catalogue(
+            catalogue: str,
+            field: str,
+            search_expr: imslp.helpers.string_search.ImslpSearchExpression,
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.FrozenSet[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Returns the records of the people or works catalogue whose `field`
+        matches the search expression (see `_match_catalogue()`). The
+        results are memoized by the catalogue cache (see
+        `imslp.interfaces.internal.CatalogueCache.get_search_results()`),
+        keyed by the normalized expression and the options of the search,
+        unless the expression contains callables.
+        """
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+
+        if accent_insensitive:
+            expr_key = imslp.helpers.string_search.get_search_expr_key(
+                imslp.helpers.string_search.normalize_search_expr(search_expr), case_insensitive=False)
+        else:
+            expr_key = imslp.helpers.string_search.get_search_expr_key(
+                search_expr, case_insensitive=case_insensitive)
+
+        key = None
+        if expr_key is not None:
+            key = (catalogue, field, expr_key, intersect, case_insensitive, accent_insensitive)
+            results = catalogue_cache.get_search_results(key)
+            if results is not None:
+                return results
+
+        # (the catalogue is loaded first, as loading it changes its version)
+        catalogue_cache.get_catalogue(catalogue)
+        version = catalogue_cache.version
+
+        results = frozenset(ImslpClient._match_catalogue(
+            catalogue=catalogue,
+            field=field,
+            search_expr=search_expr,
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive,
+            catalogue_cache=catalogue_cache))
+
+        if key is not None:
+            catalogue_cache.put_search_results(key=key, results=results, version=version)
+
+        return results
+
+    @staticmethod
+    def _match_catalogue(
+            catalogue: str,
+            field: str,
+            search_expr: imslp.helpers.string_search.ImslpSearchExpression,
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.Set[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Returns the records of the people or works catalogue whose `field`
+        matches the search expression. The search index of the field is
+        used to narrow down the records to check; expressions that cannot
+        be answered by the index (regular expressions, callables) fall back
+        to checking every record.
+
+        If `accent_insensitive` is `True`, the plain strings of the expression
+        are matched regardless of accents and case (see
+        `imslp.helpers.string_search.normalize_search_key`), while regular
+        expressions and callables are matched against the raw field values.
+        """
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+        records = catalogue_cache.get_records(catalogue)
+
+        if search_expr is None:
+            return set(records)
+
+        index = catalogue_cache.get_search_index(catalogue=catalogue, field=field)
+        positions = index.candidates(search_expr=search_expr, intersect=intersect)
+
+        # the catalogue may have grown (while being loaded in the background)
+        # since `records` was listed, in which case the index is longer
+        if positions is not None and len(index) > len(records):
+            positions = [position for position in positions if position < len(records)]
+
+        if positions is None:
+            positions = range(len(records))
+
+        predicate = ImslpClient._compile_field_predicate(
+            catalogue_cache=catalogue_cache,
+            records=records,
+            catalogue=catalogue,
+            field=field,
+            search_expr=search_expr,
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive)
+
+        return set(records[position] for position in positions if predicate(position))
+
+    @staticmethod
+    def _compile_field_predicate(
+            catalogue_cache: imslp.interfaces.internal.CatalogueCache,
+            records: typing.Sequence[imslp.interfaces.internal.HashablePageRecord],
+            catalogue: str,
+            field: str,
+            search_expr: imslp.helpers.string_search.ImslpSearchExpression,
+            intersect: bool,
+            case_insensitive: bool,
+            accent_insensitive: bool,
+    ) -> typing.Callable[[int], bool]:
+        """
+        Returns a function taking the position of a record of the catalogue,
+        and returning whether its `field` matches the search expression.
+        Accent-insensitive expressions made only of plain strings are
+        matched against the precomputed search keys of the field; the
+        others are matched against the raw field values.
+        """
+
+        search_items = search_expr if isinstance(search_expr, list) else [search_expr]
+
+        if accent_insensitive and all(isinstance(item, str) for item in search_items):
+            get_value = catalogue_cache.get_search_keys(catalogue=catalogue, field=field).__getitem__
+            search_expr = imslp.helpers.string_search.normalize_search_expr(search_expr)
+            case_insensitive = False
+            accent_insensitive = False
+        elif isinstance(records, imslp.interfaces.compact.CompactCatalogue):
+            get_value = records.column(field).__getitem__
+        else:
+            get_value = lambda position: imslp.interfaces.internal.get_record_field(records[position], field)
+
+        matcher = imslp.helpers.string_search.compile_search_expr(
+            search_expr=search_expr,
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive)
+
+        return lambda position: matcher(get_value(position))
+
+    @staticmethod
+    def _iter_catalogue(
+            catalogue: str,
+            search_exprs: typing.Dict[str, imslp.helpers.string_search.ImslpSearchExpression],
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+            offset: int = 0,
+            limit: typing.Optional[int] = None,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.Iterator[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Yields the records of the people or works catalogue whose fields
+        match the search expressions (all of them if `intersect` is `True`,
+        any of them otherwise), in catalogue order, skipping the first
+        `offset` matches and stopping after `limit` matches. The records
+        are read in a single pass, in which each candidate record (for the
+        search indexes of the fields) is checked against all expressions.
+
+        As in `search_works()`, an expression that is `None` matches every
+        record.
+        """
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+        records = catalogue_cache.get_records(catalogue)
+
+        if limit is not None and limit <= 0:
+            return
+
+        if intersect:
+            search_exprs = {field: expr for field, expr in search_exprs.items() if expr is not None}
+        elif any(expr is None for expr in search_exprs.values()):
+            search_exprs = dict()
+
+        candidates = []
+        predicates = []
+
+        for field, search_expr in search_exprs.items():
+            index = catalogue_cache.get_search_index(catalogue=catalogue, field=field)
+            positions = index.candidates(search_expr=search_expr, intersect=intersect)
+
+            # (see `_match_catalogue()`)
+            if positions is not None and len(index) > len(records):
+                positions = [position for position in positions if position < len(records)]
+            candidates.append(positions)
+
+            predicates.append(ImslpClient._compile_field_predicate(
+                catalogue_cache=catalogue_cache,
+                records=records,
+                catalogue=catalogue,
+                field=field,
+                search_expr=search_expr,
+                intersect=intersect,
+                case_insensitive=case_insensitive,
+                accent_insensitive=accent_insensitive))
+
+        if intersect:
+            known = [set(positions) for positions in candidates if positions is not None]
+            positions = sorted(set.intersection(*known)) if len(known) > 0 else range(len(records))
+        elif len(candidates) > 0 and None not in candidates:
+            positions = sorted(set().union(*candidates))
+        else:
+            positions = range(len(records))
+
+        combine = all if intersect else any
+
+        for position in positions:
+            if len(predicates) > 0 and not combine(predicate(position) for predicate in predicates):
+                continue
+
+            if offset > 0:
+                offset -= 1
+                continue
+
+            yield records[position]
+
+            if limit is not None:
+                limit -= 1
+                if limit == 0:
+                    return
+
+    @_CatalogueMethod
     def search_works(
         title: imslp.helpers.string_search.ImslpSearchExpression = None,
         composer: imslp.helpers.string_search.ImslpSearchExpression = None,
         intersect: bool = True,
-        case_insensitive: bool = True
-    ) -> typing.Set[imslp.interfaces.internal.HashablePageRecord]:
+        case_insensitive: bool = True,
+        accent_insensitive: bool = False,
+        wait: bool = True,
+        catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> SearchResults:
         """
 
         :param title:
         :param composer:
         :param intersect:
         :param case_insensitive:
+        :param accent_insensitive:
+        :param wait: Determines whether to wait for the catalogue to be
+            fully loaded, rather than search the part loaded so far (see
+            `SearchResults.complete`)
+        :param catalogue_cache: The memory cache of the catalogue to search,
+            by default the one of the client (see `catalogue_cache`)
         :return:
         """
 
-        results = set(imslp.interfaces.internal.list_works())
-
-        results_by_title = results
-        if title is not None:
-            results_by_title = set(filter(
-                lambda record:
-                imslp.helpers.string_search.check_search_expr_to_query(
-                    query=record["intvals"]["worktitle"],
-                    search_expr=title,
-                    intersect=intersect,
-                    case_insensitive=case_insensitive),
-                results_by_title
-            ))
-
-        results_by_composer = results
-        if composer is not None:
-            results_by_composer = set(filter(
-                lambda record:
-                imslp.helpers.string_search.check_search_expr_to_query(
-                    query=record["intvals"]["composer"],
-                    search_expr=composer,
-                    intersect=intersect,
-                    case_insensitive=case_insensitive),
-                results_by_composer
-            ))
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+
+        if wait:
+            catalogue_cache.wait()
+
+        complete = not catalogue_cache.is_partial()
+
+        results_by_title = ImslpClient._search_catalogue(
+            catalogue="works",
+            field="intvals.worktitle",
+            search_expr=title,
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive,
+            catalogue_cache=catalogue_cache)
+
+        results_by_composer = ImslpClient._search_catalogue(
+            catalogue="works",
+            field="intvals.composer",
+            search_expr=composer,
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive,
+            catalogue_cache=catalogue_cache)
 
         if intersect:
             results = results_by_title.intersection(results_by_composer)
         else:
             results = results_by_title.union(results_by_composer)
 
-        return results
+        return SearchResults(results, complete=complete)
 
-    @staticmethod
+    @_CatalogueMethod
     def search_people(
             name: imslp.helpers.string_search.ImslpSearchExpression,
             intersect: bool = True,
-            case_insensitive: bool = True
-    ) -> typing.Set[imslp.interfaces.internal.HashablePageRecord]:
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+            wait: bool = True,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> SearchResults:
         """
 
         :param name:
         :param intersect:
         :param case_insensitive:
+        :param accent_insensitive:
+        :param wait: Determines whether to wait for the catalogue to be
+            fully loaded, rather than search the part loaded so far (see
+            `SearchResults.complete`)
+        :param catalogue_cache: The memory cache of the catalogue to search,
+            by default the one of the client (see `catalogue_cache`)
         :return:
         """
 
-        results = set(imslp.interfaces.internal.list_people())
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
 
-        if name is not None:
-            results = set(filter(
-                lambda record:
-                imslp.helpers.string_search.check_search_expr_to_query(
-                    query=record["id"],
-                    search_expr=name,
-                    intersect=intersect,
-                    case_insensitive=case_insensitive),
-                results
-            ))
+        if wait:
+            catalogue_cache.wait()
 
-        return results
+        complete = not catalogue_cache.is_partial()
+
+        return SearchResults(
+            ImslpClient._search_catalogue(
+                catalogue="people",
+                field="id",
+                search_expr=name,
+                intersect=intersect,
+                case_insensitive=case_insensitive,
+                accent_insensitive=accent_insensitive,
+                catalogue_cache=catalogue_cache),
+            complete=complete)
+
+    @_CatalogueMethod
+    def iter_search_works(
+            title: imslp.helpers.string_search.ImslpSearchExpression = None,
+            composer: imslp.helpers.string_search.ImslpSearchExpression = None,
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+            offset: int = 0,
+            limit: typing.Optional[int] = None,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.Iterator[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Lazy version of `search_works()`, which yields the matching works
+        in catalogue order (so that pages of results are deterministic),
+        checking the title and composer of each work in a single pass, and
+        stops as soon as `limit` works have been found.
+
+        :param title: The search expression of the title.
+        :param composer: The search expression of the composer.
+        :param intersect: Whether the works must match both expressions (and
+            all the items of lists), rather than any.
+        :param case_insensitive: Whether plain strings are matched regardless of case.
+        :param accent_insensitive: Whether plain strings are matched regardless of accents.
+        :param offset: The number of matching works to skip.
+        :param limit: The maximum number of works, or `None` for all.
+        :param catalogue_cache: The memory cache of the catalogue to search,
+            by default the one of the client (see `catalogue_cache`).
+        :return: An iterator over the records of the works.
+        """
+
+        return ImslpClient._iter_catalogue(
+            catalogue="works",
+            search_exprs={"intvals.worktitle": title, "intvals.composer": composer},
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive,
+            offset=offset,
+            limit=limit,
+            catalogue_cache=catalogue_cache)
+
+    @_CatalogueMethod
+    def iter_search_people(
+            name: imslp.helpers.string_search.ImslpSearchExpression,
+            intersect: bool = True,
+            case_insensitive: bool = True,
+            accent_insensitive: bool = False,
+            offset: int = 0,
+            limit: typing.Optional[int] = None,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.Iterator[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Lazy version of `search_people()`, which yields the matching people
+        in catalogue order (see `iter_search_works()`).
+
+        :param name: The search expression of the name.
+        :param intersect: Whether the people must match all the items of lists, rather than any.
+        :param case_insensitive: Whether plain strings are matched regardless of case.
+        :param accent_insensitive: Whether plain strings are matched regardless of accents.
+        :param offset: The number of matching people to skip.
+        :param limit: The maximum number of people, or `None` for all.
+        :param catalogue_cache: The memory cache of the catalogue to search,
+            by default the one of the client (see `catalogue_cache`).
+        :return: An iterator over the records of the people.
+        """
+
+        return ImslpClient._iter_catalogue(
+            catalogue="people",
+            search_exprs={"id": name},
+            intersect=intersect,
+            case_insensitive=case_insensitive,
+            accent_insensitive=accent_insensitive,
+            offset=offset,
+            limit=limit,
+            catalogue_cache=catalogue_cache)
+
+    @_CatalogueMethod
+    def works_by_composer(
+            composer: str,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.List[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Returns the works of a composer, in catalogue order, through a hash
+        map from exact composer names to works (built on first use), rather
+        than by scanning the catalogue.
+
+        :param composer: The exact name of the composer as it appears in the
+            IMSLP catalogue (such as `"Bach, Johann Sebastian"`), possibly
+            prefixed by `"Category:"` (as in the `id` of person records).
+        :param catalogue_cache: The memory cache of the catalogue, by default
+            the one of the client (see `catalogue_cache`).
+        :return: The list of the records of the works of the composer.
+        """
+
+        if composer.startswith("Category:"):
+            composer = composer[len("Category:"):]
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+        records = catalogue_cache.get_records("works")
+        table = catalogue_cache.get_lookup_table(catalogue="works", field="intvals.composer")
+
+        return [records[position] for position in table.get(composer, ()) if position < len(records)]
+
+    @_CatalogueMethod
+    def get_work(
+            permlink: str,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.Optional[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Returns the work with a given permanent link, or `None` if there is
+        no such work in the catalogue.
+
+        :param permlink: The permanent link of the work.
+        :param catalogue_cache: The memory cache of the catalogue, by default
+            the one of the client (see `catalogue_cache`).
+        :return: The record of the work, or `None`.
+        """
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+        table = catalogue_cache.get_lookup_table(catalogue="works", field="permlink", unique=True)
+
+        records = catalogue_cache.get_records("works")
+
+        position = table.get(permlink)
+        if position is None or position >= len(records):
+            return None
+
+        return records[position]
+
+    @_CatalogueMethod
+    def get_person(
+            person_id: str,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.Optional[imslp.interfaces.internal.HashablePageRecord]:
+        """
+        Returns the person with a given identifier, or `None` if there is no
+        such person in the catalogue.
+
+        :param person_id: The identifier of the person, that is the title of
+            their category page, with or without the `"Category:"` prefix.
+        :param catalogue_cache: The memory cache of the catalogue, by default
+            the one of the client (see `catalogue_cache`).
+        :return: The record of the person, or `None`.
+        """
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+        table = catalogue_cache.get_lookup_table(catalogue="people", field="id", unique=True)
+
+        position = table.get(person_id)
+        if position is None and not person_id.startswith("Category:"):
+            position = table.get("Category:" + person_id)
+        records = catalogue_cache.get_records("people")
+        if position is None or position >= len(records):
+            return None
+
+        return records[position]
+
+    @staticmethod
+    def _rank_catalogue(
+            catalogue: str,
+            terms: typing.Dict[str, str],
+            limit: int = 10,
+            min_score: float = 0.0,
+            download_counts: typing.Optional[typing.Mapping[str, int]] = None,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.List[typing.Tuple[imslp.interfaces.internal.HashablePageRecord, float]]:
+        """
+        Returns the records of the people or works catalogue most similar to
+        the given terms, as ranked by the search indexes of their fields
+        (see `imslp.helpers.search_index.NgramIndex.scores()`). The score of
+        a record is the average of its similarity to the term of each field;
+        equal scores are ordered by decreasing download count, if provided.
+        """
+
+        catalogue_cache = catalogue_cache or imslp.interfaces.internal.get_default_cache()
+        records = catalogue_cache.get_records(catalogue)
+
+        terms = {field: term for field, term in terms.items() if term}
+        if len(terms) == 0 or limit <= 0:
+            return list()
+
+        total_scores = dict()  # type: typing.Dict[int, float]
+        for field, term in terms.items():
+            index = catalogue_cache.get_search_index(catalogue=catalogue, field=field)
+            for position, score in index.scores(term).items():
+                if position >= len(records):
+                    continue
+                total_scores[position] = total_scores.get(position, 0.0) + score
+
+        scores = {
+            position: total_score / len(terms)
+            for position, total_score in total_scores.items()
+            if total_score / len(terms) >= min_score
+        }
+
+        if download_counts:
+            def get_download_count(position: int) -> int:
+                return download_counts.get(records[position]["id"], 0)
+        else:
+            def get_download_count(position: int) -> int:
+                return 0
+
+        positions = heapq.nsmallest(
+            limit,
+            scores.keys(),
+            key=lambda position: (-scores[position], -get_download_count(position), position))
+
+        return [(records[position], scores[position]) for position in positions]
+
+    @_CatalogueMethod
+    def rank_works(
+            title: typing.Optional[str] = None,
+            composer: typing.Optional[str] = None,
+            limit: int = 10,
+            min_score: float = 0.0,
+            download_counts: typing.Optional[typing.Mapping[str, int]] = None,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.List[typing.Tuple[imslp.interfaces.internal.HashablePageRecord, float]]:
+        """
+        Returns the works most similar to an approximate title and/or
+        composer, by decreasing relevance. Unlike `search_works()`, the
+        terms need not be exact substrings: the records are scored by the
+        proportion of character trigrams they share with the terms (ignoring
+        case and accents), so that misspelled terms still find their works,
+        and only the `limit` best records are returned.
+
+        :param title: The approximate title of the work.
+        :param composer: The approximate name of the composer.
+        :param limit: The maximum number of results.
+        :param min_score: The minimum score (between 0 and 1) of the results.
+        :param download_counts: The download counts of works, by page title
+            (see `fetch_download_counts()`), used to order works of equal
+            score.
+        :param catalogue_cache: The memory cache of the catalogue, by default
+            the one of the client (see `catalogue_cache`).
+        :return: A list of `(record, score)` pairs, by decreasing score.
+        """
+
+        return ImslpClient._rank_catalogue(
+            catalogue="works",
+            terms={"intvals.worktitle": title, "intvals.composer": composer},
+            limit=limit,
+            min_score=min_score,
+            download_counts=download_counts,
+            catalogue_cache=catalogue_cache)
+
+    @_CatalogueMethod
+    def rank_people(
+            name: str,
+            limit: int = 10,
+            min_score: float = 0.0,
+            catalogue_cache: typing.Optional[imslp.interfaces.internal.CatalogueCache] = None,
+    ) -> typing.List[typing.Tuple[imslp.interfaces.internal.HashablePageRecord, float]]:
+        """
+        Returns the people whose names are most similar to an approximate
+        name, by decreasing relevance (see `rank_works()`).
+
+        :param name: The approximate name.
+        :param limit: The maximum number of results.
+        :param min_score: The minimum score (between 0 and 1) of the results.
+        :param catalogue_cache: The memory cache of the catalogue, by default
+            the one of the client (see `catalogue_cache`).
+        :return: A list of `(record, score)` pairs, by decreasing score.
+        """
+
+        return ImslpClient._rank_catalogue(
+            catalogue="people",
+            terms={"id": name},
+            limit=limit,
+            min_score=min_score,
+            catalogue_cache=catalogue_cache)
+
+    def fetch_download_counts(
+            self,
+            records: typing.Iterable[imslp.interfaces.internal.HashablePageRecord],
+    ) -> typing.Dict[str, int]:
+        """
+        Fetches the total download count of the files of each work (see
+        `imslp.interfaces.scraping.fetch_images_metadata_batch()`), to
+        order the results of `rank_works()`.
+
+        :param records: The records of the works.
+        :return: A dictionary from page titles to download counts.
+        """
+
+        titles = list(dict.fromkeys(record["id"] for record in records))
+
+        images_metadata = imslp.interfaces.scraping.fetch_images_metadata_batch(
+            pages=titles,
+            site=self.site)
 
+        return {
+            title: sum(image.get("download_count") or 0 for image in images)
+            for title, images in zip(titles, images_metadata)
+        }
@@ -0,0 +1,85 @@
+
+import collections
+import threading
+import typing
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "CacheInfo",
+    "LruCache",
+]
+
+
+class CacheInfo(typing.NamedTuple):
+    """
+    Statistics of an `LruCache`, as for `functools.lru_cache`.
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LruCache:
+    """
+    Thread-safe mapping holding at most `maxsize` entries, which evicts the
+    least recently used entry when full, and counts the lookups that found
+    an entry (hits) and those that did not (misses).
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self._maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        """
+        Returns the value of an entry, marking it as the most recently
+        used, or `default` if there is no such entry.
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        """
+        Adds or replaces an entry, evicting the least recently used entry
+        if the cache is full.
+        """
+        if self._maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all the entries (but keeps the statistics).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> CacheInfo:
+        """
+        Returns the statistics of the cache.
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                currsize=len(self._entries))
@@ -0,0 +1,188 @@
+
+import array
+import heapq
+import typing
+
+import imslp.helpers.string_search
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "NgramIndex",
+]
+
+
+# Length of the character n-grams used as index tokens
+DEFAULT_NGRAM_LENGTH = 3
+
+
+class NgramIndex:
+    """
+    Inverted index from the character n-grams of a sequence of strings to
+    the positions of the strings that contain them. Because any string that
+    contains a search term must contain all of the n-grams of that term,
+    intersecting the posting lists of these n-grams yields a (usually very
+    small) set of candidate positions, which can then be checked exactly.
+
+    The index is built over strings normalized by `normalize_search_key`
+    (casefolded, without accents): since this normalization maps each
+    character independently, it provides valid candidates for
+    case-sensitive, case-insensitive and accent-insensitive queries alike.
+    """
+
+    def __init__(
+            self,
+            texts: typing.Iterable[str] = (),
+            n: int = DEFAULT_NGRAM_LENGTH,
+            normalized: bool = False,
+    ):
+        self._n = n
+        self._size = 0
+        self._postings = dict()  # type: typing.Dict[str, array.array]
+        self._gram_counts = array.array("i")
+        self.extend(texts, normalized=normalized)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grams(self, text: str, normalized: bool = False) -> typing.Set[str]:
+        if not normalized:
+            text = imslp.helpers.string_search.normalize_search_key(text)
+        return {text[i:i + self._n] for i in range(len(text) - self._n + 1)}
+
+    def extend(self, texts: typing.Iterable[str], normalized: bool = False) -> None:
+        """
+        Appends strings to the index; their positions follow those of the
+        strings already indexed.
+
+        :param texts: The strings to index.
+        :param normalized: Whether the strings are already normalized by
+            `normalize_search_key`.
+        """
+        for text in texts:
+            position = self._size
+            self._size += 1
+
+            grams = self._grams(text or "", normalized=normalized)
+            self._gram_counts.append(len(grams))
+
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array.array("i")
+                posting.append(position)
+
+    def lookup(self, term: str) -> typing.Optional[typing.Set[int]]:
+        """
+        Returns the positions of the indexed strings that may contain `term`,
+        or `None` if the term is too short to be answered by the index (in
+        which case every position is a candidate).
+
+        :param term: The substring being searched for.
+        :return: A set of candidate positions, or `None`.
+        """
+
+        grams = self._grams(term)
+        if len(grams) == 0:
+            return None
+
+        # intersect the shortest posting lists first
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+
+        positions = set(postings[0])
+        for posting in postings[1:]:
+            if len(positions) == 0:
+                break
+            positions.intersection_update(posting)
+
+        return positions
+
+    def scores(self, term: str) -> typing.Dict[int, float]:
+        """
+        Returns the similarity between `term` and the indexed strings that
+        share at least one n-gram with it, measured by the Dice coefficient
+        of their sets of n-grams (`2 |A & B| / (|A| + |B|)`, between 0 and
+        1). Only the posting lists of the n-grams of the term are read, so
+        strings without any n-gram in common are never scored; a misspelled
+        term still shares most of its n-grams with the intended string.
+
+        :param term: The (possibly approximate) string being searched for.
+        :return: A dictionary from positions to similarity scores.
+        """
+
+        grams = self._grams(term)
+        if len(grams) == 0:
+            return dict()
+
+        shared_counts = dict()  # type: typing.Dict[int, int]
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                shared_counts[position] = shared_counts.get(position, 0) + 1
+
+        term_count = len(grams)
+        gram_counts = self._gram_counts
+        return {
+            position: 2.0 * shared_count / (term_count + gram_counts[position])
+            for position, shared_count in shared_counts.items()
+        }
+
+    def rank(self, term: str, k: int = 10) -> typing.List[typing.Tuple[float, int]]:
+        """
+        Returns the `k` indexed strings most similar to `term` (see
+        `scores()`), selected with a heap rather than by sorting every
+        scored string.
+
+        :param term: The (possibly approximate) string being searched for.
+        :param k: The maximum number of results.
+        :return: A list of `(score, position)` pairs, by decreasing score
+            (and increasing position among equal scores).
+        """
+
+        return heapq.nsmallest(
+            k,
+            ((score, position) for position, score in self.scores(term).items()),
+            key=lambda item: (-item[0], item[1]))
+
+    def candidates(
+            self,
+            search_expr: imslp.helpers.string_search.ImslpSearchExpression,
+            intersect: bool = True,
+    ) -> typing.Optional[typing.Set[int]]:
+        """
+        Returns the positions of the indexed strings that may match the
+        search expression, with the semantics of `check_search_expr_to_query`,
+        or `None` if the expression cannot be narrowed down by the index
+        (regular expressions, callables, very short strings).
+
+        :param search_expr: The search expression.
+        :param intersect: Whether the items of a list must all match.
+        :return: A set of candidate positions, or `None`.
+        """
+
+        if isinstance(search_expr, str):
+            return self.lookup(search_expr)
+
+        if isinstance(search_expr, typing.List):
+            item_candidates = [
+                self.candidates(search_expr=search_expr_item, intersect=intersect)
+                for search_expr_item in search_expr
+            ]
+
+            if intersect:
+                item_candidates = sorted(
+                    filter(lambda positions: positions is not None, item_candidates),
+                    key=len)
+                if len(item_candidates) == 0:
+                    return None
+
+                positions = set(item_candidates[0])
+                for other_positions in item_candidates[1:]:
+                    positions.intersection_update(other_positions)
+                return positions
+
+            if any(map(lambda positions: positions is None, item_candidates)):
+                return None
+            return set().union(*item_candidates)
+
+        return None
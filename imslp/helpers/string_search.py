@@ -1,6 +1,7 @@
 
 import re
 import typing
+import unicodedata
 
 
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
@@ -9,6 +10,10 @@ __all__ = [
     "ImslpSearchExpression",
     "ImslpSearchExpressionSubpart",
     "check_search_expr_to_query",
+    "compile_search_expr",
+    "get_search_expr_key",
+    "normalize_search_expr",
+    "normalize_search_key",
 ]
 
 
@@ -25,6 +30,80 @@ ImslpSearchExpression = typing.Optional[typing.Union[
 ]]
 
 
+def normalize_search_key(text: str) -> str:
+    """
+    Normalizes a string for accent- and case-insensitive comparisons: the
+    string is decomposed (Unicode NFKD), its combining marks (accents) are
+    removed, and it is casefolded, so that for instance `"Dvořák"` becomes
+    `"dvorak"`.
+
+    :param text: The string to normalize.
+    :return: The normalized string.
+    """
+
+    if text.isascii():
+        return text.casefold()
+
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(c)
+    ).casefold()
+
+
+def normalize_search_expr(search_expr: ImslpSearchExpression) -> ImslpSearchExpression:
+    """
+    Normalizes the plain strings of a search expression with
+    `normalize_search_key`, so that the expression can be matched against
+    normalized strings; regular expressions and callables are unchanged.
+
+    :param search_expr: The search expression.
+    :return: The normalized search expression.
+    """
+
+    if isinstance(search_expr, str):
+        return normalize_search_key(search_expr)
+
+    if isinstance(search_expr, typing.List):
+        return list(map(normalize_search_expr, search_expr))
+
+    return search_expr
+
+
+def get_search_expr_key(
+        search_expr: ImslpSearchExpression,
+        case_insensitive: bool = True,
+) -> typing.Optional[typing.Hashable]:
+    """
+    Returns a hashable key of a search expression, equal for expressions
+    that match the same strings, so that the results of searches can be
+    memoized: plain strings are lowercased if `case_insensitive` is `True`,
+    regular expressions are identified by their pattern and flags, and
+    lists by the keys of their items. Callables cannot be compared, so
+    `None` is returned for the expressions that contain one.
+
+    :param search_expr: The search expression.
+    :param case_insensitive: Whether plain strings are matched regardless of case.
+    :return: The key of the expression, or `None`.
+    """
+
+    if search_expr is None:
+        return ("any",)
+
+    if isinstance(search_expr, str):
+        return ("str", search_expr.lower() if case_insensitive else search_expr)
+
+    if isinstance(search_expr, typing.Pattern):
+        return ("re", search_expr.pattern, search_expr.flags)
+
+    if isinstance(search_expr, typing.List):
+        keys = tuple(get_search_expr_key(item, case_insensitive=case_insensitive) for item in search_expr)
+        if None in keys:
+            return None
+        return ("list",) + keys
+
+    return None
+
+
 def check_search_expr_to_query(
         query: str,
         search_expr: ImslpSearchExpression = None,
@@ -66,3 +145,130 @@ def check_search_expr_to_query(
         return intersect
 
     return False
+
+
+def _compile_strings(
+        terms: typing.List[str],
+        case_insensitive: bool,
+        intersect: bool,
+) -> typing.Callable[[str], bool]:
+    """
+    Compiles a list of plain strings into a matcher: if `intersect` is
+    `True`, the matcher checks that all the strings are substrings of the
+    query, otherwise that one of them is, using a single regular expression.
+    """
+
+    if case_insensitive:
+        terms = list(map(str.lower, terms))
+
+    # deduplicate, keeping the shortest (cheapest) terms first
+    terms = sorted(set(terms), key=len)
+
+    if len(terms) == 1:
+        term = terms[0]
+        if case_insensitive:
+            return lambda query: term in query.lower()
+        return lambda query: term in query
+
+    if intersect:
+        if case_insensitive:
+            return lambda query: all(map(query.lower().__contains__, terms))
+        return lambda query: all(map(query.__contains__, terms))
+
+    search = re.compile("|".join(map(re.escape, terms))).search
+    if case_insensitive:
+        return lambda query: search(query.lower()) is not None
+    return lambda query: search(query) is not None
+
+
+def _compile_accent_insensitive_strings(
+        terms: typing.List[str],
+        intersect: bool,
+) -> typing.Callable[[str], bool]:
+    """
+    Compiles a list of plain strings into a matcher, as `_compile_strings`,
+    but comparing the normalized strings (see `normalize_search_key`) to
+    the normalized query.
+    """
+
+    matcher = _compile_strings(
+        terms=list(map(normalize_search_key, terms)),
+        case_insensitive=False,
+        intersect=intersect)
+    return lambda query: matcher(normalize_search_key(query))
+
+
+def compile_search_expr(
+        search_expr: ImslpSearchExpression = None,
+        case_insensitive: bool = True,
+        intersect: bool = True,
+        accent_insensitive: bool = False,
+) -> typing.Callable[[str], bool]:
+    """
+    Compiles a search expression into a reusable matcher, which returns the
+    same result as `check_search_expr_to_query` for any query, but does not
+    re-interpret the expression for every query: the type of each part is
+    dispatched once, plain strings are lowercased once, the plain strings of
+    a list are merged into a single test, and the cheapest tests of a list
+    are evaluated first.
+
+    If `accent_insensitive` is `True`, plain strings are instead matched
+    regardless of accents and case (see `normalize_search_key`), while
+    regular expressions and callables still receive the query unchanged.
+
+    :param search_expr: The search expression.
+    :param case_insensitive: Whether plain strings are matched regardless of case.
+    :param intersect: Whether the items of a list must all match.
+    :param accent_insensitive: Whether plain strings are matched regardless of accents and case.
+    :return: A function taking a query string and returning whether it matches.
+    """
+
+    if search_expr is None:
+        return lambda query: True
+
+    if isinstance(search_expr, str):
+        if accent_insensitive:
+            return _compile_accent_insensitive_strings(terms=[search_expr], intersect=intersect)
+        return _compile_strings(
+            terms=[search_expr],
+            case_insensitive=case_insensitive,
+            intersect=intersect)
+
+    elif isinstance(search_expr, typing.Pattern):
+        search = search_expr.search
+        return lambda query: search(query) is not None
+
+    elif isinstance(search_expr, typing.Callable):
+        return search_expr
+
+    elif isinstance(search_expr, typing.List):
+
+        if len(search_expr) == 0:
+            return lambda query: intersect
+
+        strings = [item for item in search_expr if isinstance(item, str)]
+        patterns = [item for item in search_expr if isinstance(item, typing.Pattern)]
+        others = [item for item in search_expr if not isinstance(item, (str, typing.Pattern))]
+
+        # order the tests from the cheapest to the most expensive
+        matchers = []
+        if len(strings) > 0 and accent_insensitive:
+            matchers.append(_compile_accent_insensitive_strings(terms=strings, intersect=intersect))
+        elif len(strings) > 0:
+            matchers.append(_compile_strings(
+                terms=strings,
+                case_insensitive=case_insensitive,
+                intersect=intersect))
+        matchers += [
+            compile_search_expr(search_expr=item, case_insensitive=case_insensitive, intersect=intersect)
+            for item in patterns + others
+        ]
+
+        if len(matchers) == 1:
+            return matchers[0]
+
+        if intersect:
+            return lambda query: all(matcher(query) for matcher in matchers)
+        return lambda query: any(matcher(query) for matcher in matchers)
+
+    return lambda query: False
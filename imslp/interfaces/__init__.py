@@ -0,0 +1,34 @@
+
+import importlib
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+
+# The interface modules depend on heavy third-party packages (`mwclient`,
+# `bs4`, `requests`), so they are only imported when they are first accessed
+# as attributes of this package
+_LAZY_SUBMODULES = [
+    "async_transport",
+    "compact",
+    "constants",
+    "disk_cache",
+    "download",
+    "http_cache",
+    "instrumentation",
+    "internal",
+    "mw_api",
+    "recent_changes",
+    "scraping",
+    "transport",
+]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + _LAZY_SUBMODULES)
@@ -0,0 +1,169 @@
+
+import asyncio
+import json
+import typing
+
+import imslp.interfaces.instrumentation
+import imslp.interfaces.transport
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "AsyncResponse",
+    "AsyncTransport",
+]
+
+
+# Default maximum number of requests in flight at the same time
+IMSLP_ASYNC_CONCURRENCY = 32
+
+
+class AsyncResponse:
+    """
+    Response of a request made by an `AsyncTransport`, whose body has been
+    read entirely; it has the attributes of `requests.Response` that are
+    used by the package.
+    """
+
+    def __init__(self, url: str, status_code: int, headers: typing.Mapping[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncTransport:
+    """
+    Asynchronous counterpart of `imslp.interfaces.transport`, built on an
+    `aiohttp.ClientSession`: all the requests share a connection pool of
+    `pool_size` connections, at most `concurrency` requests are in flight
+    at the same time (the others wait on a semaphore), and failed requests
+    are retried with exponential backoff. Every attempt consumes a token of
+    the global rate limiter of `imslp.interfaces.transport` (see
+    `imslp.interfaces.transport.get_rate_limiter()`), shared with the
+    synchronous requests, and waits for it without blocking the loop.
+
+    The `aiohttp` package is only imported (and the session only created)
+    when the first request is made, from within the running event loop.
+    """
+
+    def __init__(
+            self,
+            pool_size: int = imslp.interfaces.transport.IMSLP_HTTP_POOL_SIZE,
+            concurrency: int = IMSLP_ASYNC_CONCURRENCY,
+            timeout: typing.Union[float, typing.Tuple[float, float]] = imslp.interfaces.transport.IMSLP_HTTP_TIMEOUT,
+            retries: int = imslp.interfaces.transport.IMSLP_HTTP_RETRIES,
+            backoff_factor: float = imslp.interfaces.transport.IMSLP_HTTP_BACKOFF_FACTOR,
+    ):
+        self._pool_size = pool_size
+        self._concurrency = concurrency
+        self._timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+
+        self._session = None       # type: typing.Optional["aiohttp.ClientSession"]
+        self._semaphore = None     # type: typing.Optional[asyncio.Semaphore]
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError(
+                    "the asynchronous API requires the 'aiohttp' package "
+                    "(install the 'async' extra: pip install \"imslp[async]\")")
+
+            connect_timeout, read_timeout = self._timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        return self._session
+
+    def _get_backoff(self, attempt: int, response: typing.Optional[AsyncResponse] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self._backoff_factor * (2 ** (attempt - 1))
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        """
+        Makes a GET request, retrying it with exponential backoff if it
+        fails or if its status is one of `IMSLP_HTTP_RETRY_STATUSES`.
+
+        :param url: The URL.
+        :param kwargs: The parameters of `aiohttp.ClientSession.get()`
+            (such as `params`, `headers` or `cookies`).
+        :return: The response, with its body read.
+        """
+
+        session = self._get_session()
+
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            response = None
+
+            rate_limiter = imslp.interfaces.transport.get_rate_limiter()
+            if rate_limiter is not None:
+                await asyncio.sleep(rate_limiter.reserve())
+
+            try:
+                async with self._semaphore:
+                    async with session.get(url, **kwargs) as r:
+                        response = AsyncResponse(
+                            url=str(r.url),
+                            status_code=r.status,
+                            headers=r.headers,
+                            content=await r.read(),
+                        )
+
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt > self._retries:
+                    raise
+
+            if response is not None:
+                if (response.status_code not in imslp.interfaces.transport.IMSLP_HTTP_RETRY_STATUSES or
+                        attempt > self._retries):
+                    if imslp.interfaces.instrumentation.is_enabled():
+                        imslp.interfaces.instrumentation.emit(
+                            "http.request",
+                            loop.time() - start_time,
+                            method="GET",
+                            url=url,
+                            status=response.status_code,
+                            bytes=len(response.content),
+                            retries=attempt - 1)
+                    return response
+
+            await asyncio.sleep(self._get_backoff(attempt=attempt, response=response))
+
+    async def close(self) -> None:
+        """
+        Closes the connection pool.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
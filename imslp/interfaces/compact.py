@@ -0,0 +1,372 @@
+
+import collections.abc
+import json
+import mmap
+import os
+import struct
+import sys
+import typing
+
+import imslp.interfaces.disk_cache
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "CompactCatalogue",
+    "get_compact_catalogue_path",
+    "open_compact_catalogue",
+    "write_compact_catalogue",
+]
+
+
+# Magic bytes at the beginning of a compact catalogue file
+IMSLP_COMPACT_MAGIC = b"IMSLPCC1"
+
+# Pattern of the name of the file storing a compact catalogue in the cache
+IMSLP_COMPACT_FILENAME = "imslp-{}-cache.compact"
+
+# Fields of the IMSLP API records that are stored as columns (nested fields
+# are designated by a dotted path); any other field, or any field whose
+# value is not a string, is stored as JSON in the `IMSLP_COMPACT_EXTRA` column
+IMSLP_COMPACT_COLUMNS = [
+    "id",
+    "type",
+    "parent",
+    "permlink",
+    "intvals.composer",
+    "intvals.worktitle",
+    "intvals.icatno",
+    "intvals.pageid",
+]
+IMSLP_COMPACT_EXTRA = "_extra"
+
+# Alignment of the sections of a compact catalogue file
+_ALIGNMENT = 8
+
+# Struct of the offsets of the strings of a column
+_OFFSET_TYPECODE = "I"
+_OFFSET_STRUCT = struct.Struct("<I")
+
+
+def _split_record(record: dict) -> typing.Tuple[typing.Dict[str, str], dict]:
+    """
+    Splits a record into the values of the string columns, and a (nested)
+    dictionary of all the remaining fields.
+    """
+
+    values = dict()
+    extra = dict()
+
+    for key, value in record.items():
+        if isinstance(value, dict):
+            for subkey, subvalue in value.items():
+                field = "{}.{}".format(key, subkey)
+                if field in IMSLP_COMPACT_COLUMNS and isinstance(subvalue, str):
+                    values[field] = subvalue
+                else:
+                    extra.setdefault(key, dict())[subkey] = subvalue
+            if len(value) == 0:
+                extra[key] = dict()
+        elif key in IMSLP_COMPACT_COLUMNS and isinstance(value, str):
+            values[key] = value
+        else:
+            extra[key] = value
+
+    return values, extra
+
+
+def write_compact_catalogue(path: str, records: typing.Iterable[dict], start: int = None) -> None:
+    """
+    Writes records to a compact catalogue file, which stores each of the
+    `IMSLP_COMPACT_COLUMNS` as a table of UTF-8 strings indexed by an array
+    of offsets, so that the file can be memory-mapped and shared between
+    processes by `CompactCatalogue`. The file is written atomically.
+
+    :param path: The path of the file to write.
+    :param records: The IMSLP API records.
+    :param start: The high-water mark of the catalogue (see
+        `imslp.interfaces.disk_cache`), by default the number of records.
+    """
+
+    columns = IMSLP_COMPACT_COLUMNS + [IMSLP_COMPACT_EXTRA]
+
+    data = {column: bytearray() for column in columns}
+    offsets = {column: [0] for column in columns}
+    present = {column: bytearray() for column in columns}
+
+    count = 0
+    for record in records:
+        count += 1
+
+        values, extra = _split_record(record)
+        if len(extra) > 0:
+            values[IMSLP_COMPACT_EXTRA] = json.dumps(extra)
+
+        for column in columns:
+            value = values.get(column)
+            if value is not None:
+                data[column] += value.encode("utf-8")
+            present[column].append(value is not None)
+            offsets[column].append(len(data[column]))
+
+    # compute the layout of the sections
+    sections = []
+    for column in columns:
+        sections += [
+            (column, "offsets", b"".join(map(_OFFSET_STRUCT.pack, offsets[column]))),
+            (column, "present", bytes(present[column])),
+            (column, "data", bytes(data[column])),
+        ]
+
+    header = {
+        "count": count,
+        "start": count if start is None else start,
+        "columns": {column: dict() for column in columns},
+    }
+
+    # positions of the sections are relative to the end of the header
+    position = 0
+    for column, section_name, section in sections:
+        header["columns"][column][section_name] = [position, len(section)]
+        position += len(section) + (-len(section)) % _ALIGNMENT
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * ((-(len(IMSLP_COMPACT_MAGIC) + 4 + len(header_bytes))) % _ALIGNMENT)
+
+    chunks = [IMSLP_COMPACT_MAGIC, struct.pack("<I", len(header_bytes)), header_bytes]
+    for _, _, section in sections:
+        chunks += [section, b"\0" * ((-len(section)) % _ALIGNMENT)]
+
+    imslp.interfaces.disk_cache.atomic_write_bytes(path=path, data=b"".join(chunks))
+
+
+class _CompactColumn(collections.abc.Sequence):
+    """
+    Read-only sequence of the string values of a column of a compact
+    catalogue (`None` for the records that do not have the field), which
+    decodes each string only when it is accessed.
+    """
+
+    def __init__(self, catalogue: "CompactCatalogue", column: str):
+        self._catalogue = catalogue
+        self._column = column
+
+    def __len__(self) -> int:
+        return len(self._catalogue)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        return self._catalogue._get_value(self._column, self._catalogue._range[item])
+
+    def __iter__(self):
+        get_value = self._catalogue._get_value
+        for i in self._catalogue._range:
+            yield get_value(self._column, i)
+
+
+class CompactCatalogue(collections.abc.Sequence):
+    """
+    Read-only sequence of IMSLP API records backed by a memory-mapped
+    compact catalogue file (see `write_compact_catalogue()`): the pages of
+    the file are shared by all the processes that open it, and a record is
+    only materialized (as an object built by `record_factory`) when it is
+    accessed. Slicing a `CompactCatalogue` returns a view that shares the
+    same mapping.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            record_factory: typing.Callable[[dict], dict] = dict,
+    ):
+        self._path = path
+        self._record_factory = record_factory
+
+        with open(path, mode="rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(IMSLP_COMPACT_MAGIC)] != IMSLP_COMPACT_MAGIC:
+            raise ValueError("'{}' is not a compact catalogue file".format(path))
+
+        position = len(IMSLP_COMPACT_MAGIC)
+        header_length = struct.unpack("<I", self._mmap[position:position + 4])[0]
+        header = json.loads(self._mmap[position + 4:position + 4 + header_length])
+
+        self._header = header
+        self._range = range(header["count"])
+
+        base = position + 4 + header_length
+        buffer = memoryview(self._mmap)
+
+        self._buffer = buffer
+        self._offsets = dict()
+        self._present = dict()
+        self._data_position = dict()
+
+        # offsets are stored in little-endian order, and can only be viewed
+        # directly as integers on little-endian platforms
+        self._native_offsets = sys.byteorder == "little"
+
+        for column, sections in header["columns"].items():
+            offsets_position, offsets_length = sections["offsets"]
+            offsets = buffer[base + offsets_position:base + offsets_position + offsets_length]
+            if self._native_offsets:
+                offsets = offsets.cast(_OFFSET_TYPECODE)
+            self._offsets[column] = offsets
+
+            present_position, present_length = sections["present"]
+            self._present[column] = buffer[base + present_position:base + present_position + present_length]
+
+            self._data_position[column] = base + sections["data"][0]
+
+    @property
+    def path(self) -> str:
+        """
+        Returns the path of the memory-mapped file.
+        """
+        return self._path
+
+    @property
+    def start(self) -> int:
+        """
+        Returns the high-water mark of the catalogue, that is the offset of
+        the internal IMSLP API past which no records have been fetched.
+        """
+        return self._header["start"]
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            view = object.__new__(CompactCatalogue)
+            view.__dict__.update(self.__dict__)
+            view._range = self._range[item]
+            return view
+        return self._get_record(self._range[item])
+
+    def __iter__(self):
+        for i in self._range:
+            yield self._get_record(i)
+
+    def __getstate__(self):
+        return {
+            "path": self._path,
+            "record_factory": self._record_factory,
+            "range": self._range,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(path=state["path"], record_factory=state["record_factory"])
+        self._range = state["range"]
+
+    def _get_offset(self, column: str, i: int) -> int:
+        offsets = self._offsets[column]
+        if self._native_offsets:
+            return offsets[i]
+        return _OFFSET_STRUCT.unpack(offsets[4 * i:4 * i + 4])[0]
+
+    def _get_value(self, column: str, i: int) -> typing.Optional[str]:
+        if not self._present[column][i]:
+            return None
+        data_position = self._data_position[column]
+        return self._mmap[
+               data_position + self._get_offset(column, i):
+               data_position + self._get_offset(column, i + 1)
+               ].decode("utf-8")
+
+    def _get_record(self, i: int) -> dict:
+        record = dict()
+
+        for column in IMSLP_COMPACT_COLUMNS:
+            value = self._get_value(column, i)
+            if value is None:
+                continue
+            if "." in column:
+                key, subkey = column.split(".", 1)
+                record.setdefault(key, dict())[subkey] = value
+            else:
+                record[column] = value
+
+        extra = self._get_value(IMSLP_COMPACT_EXTRA, i)
+        if extra is not None:
+            for key, value in json.loads(extra).items():
+                if isinstance(value, dict) and isinstance(record.get(key), dict):
+                    record[key].update(value)
+                else:
+                    record[key] = value
+
+        return self._record_factory(record)
+
+    def column(self, field: str) -> typing.Sequence[typing.Optional[str]]:
+        """
+        Returns a lazy sequence of the values of a field of the records,
+        which does not materialize the records. For fields that are not
+        stored as a column, the records are materialized.
+
+        :param field: The (possibly dotted) name of the field.
+        :return: A sequence of the values of the field.
+        """
+
+        if field in IMSLP_COMPACT_COLUMNS:
+            return _CompactColumn(catalogue=self, column=field)
+
+        def get_field(record):
+            value = record
+            for key in field.split("."):
+                value = value[key]
+            return value
+
+        return list(map(get_field, self))
+
+    def close(self) -> None:
+        """
+        Closes the memory mapping; views of the catalogue cannot be used
+        afterwards.
+        """
+        for buffer in list(self._offsets.values()) + list(self._present.values()):
+            buffer.release()
+        self._buffer.release()
+        self._mmap.close()
+
+
+def get_compact_catalogue_path(name: str, cache_dir: typing.Optional[str] = None) -> str:
+    """
+    Returns the path of the compact version of a catalogue in the
+    user-level cache directory.
+
+    :param name: The name of the catalogue (`"people"` or `"works"`).
+    :param cache_dir: The cache directory, by default the directory
+        returned by `imslp.interfaces.disk_cache.get_cache_dir()`.
+    :return: The path of the compact catalogue file.
+    """
+    return os.path.join(
+        cache_dir or imslp.interfaces.disk_cache.get_cache_dir(),
+        IMSLP_COMPACT_FILENAME.format(name))
+
+
+def open_compact_catalogue(
+        name: str,
+        record_factory: typing.Callable[[dict], dict] = dict,
+        cache_dir: typing.Optional[str] = None,
+) -> typing.Optional[CompactCatalogue]:
+    """
+    Opens the compact version of a catalogue stored in the user-level cache
+    directory, if there is a valid one.
+
+    :param name: The name of the catalogue (`"people"` or `"works"`).
+    :param record_factory: The type of the materialized records.
+    :param cache_dir: The cache directory.
+    :return: The compact catalogue, or `None`.
+    """
+
+    path = get_compact_catalogue_path(name=name, cache_dir=cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return CompactCatalogue(path=path, record_factory=record_factory)
+    except (OSError, ValueError, KeyError):
+        return None
@@ -4,6 +4,7 @@ __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 __all__ = [
     "IMSLP_SUBCATEGORIES",
     "IMSLP_COOKIE_NAME_USERNAME",
+    "IMSLP_DISCLAIMER_COOKIES",
 ]
 
 
@@ -25,3 +26,10 @@ IMSLP_SUBCATEGORIES = [
 
 # IMSLP cookie name where user is stored
 IMSLP_COOKIE_NAME_USERNAME = "imslp_wikiUserName"
+
+# IMSLP cookies necessary to allow for proper download of images/PDFs
+# (otherwise, downloading any file results in the disclaimer page)
+IMSLP_DISCLAIMER_COOKIES = {
+    "imslp_wikiLanguageSelectorLanguage": "en",
+    "imslpdisclaimeraccepted": "yes",
+}
@@ -0,0 +1,233 @@
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import typing
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "atomic_write_bytes",
+    "get_cache_dir",
+    "read_catalogue",
+    "read_catalogue_header",
+    "read_sync_timestamp",
+    "write_catalogue",
+    "write_sync_timestamp",
+]
+
+
+# Environment variable that can be used to override the cache directory
+IMSLP_CACHE_DIR_ENV = "IMSLP_CACHE_DIR"
+
+# Pattern of the name of the file storing a catalogue ("people" or "works")
+IMSLP_CATALOGUE_FILENAME = "imslp-{}-cache.json.gz"
+
+# Name of the file storing the time up to which the catalogues were synced
+IMSLP_SYNC_FILENAME = "imslp-sync.json"
+
+# Version of the format of the catalogue files
+IMSLP_CATALOGUE_FORMAT_VERSION = 1
+
+
+def get_cache_dir() -> str:
+    """
+    Returns the path of the user-level directory in which the package
+    persists its caches: the value of the `IMSLP_CACHE_DIR` environment
+    variable if it is set, and otherwise the platform's user cache
+    directory (such as `~/.cache/imslp`).
+
+    :return: The path of the cache directory (which may not exist yet).
+    """
+
+    cache_dir = os.environ.get(IMSLP_CACHE_DIR_ENV)
+    if cache_dir:
+        return os.path.abspath(os.path.expanduser(cache_dir))
+
+    if sys.platform == "win32":
+        base_dir = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base_dir = os.path.expanduser("~/Library/Caches")
+    else:
+        base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+
+    return os.path.join(base_dir, "imslp")
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Writes `data` to the file at `path` atomically: the data is written to
+    a temporary file in the same directory, which then replaces the target
+    file, so that concurrent readers see either the old or the new file,
+    never a partially written one.
+
+    :param path: The path of the file to write.
+    :param data: The contents of the file.
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _catalogue_path(name: str, cache_dir: typing.Optional[str] = None) -> str:
+    return os.path.join(cache_dir or get_cache_dir(), IMSLP_CATALOGUE_FILENAME.format(name))
+
+
+# noinspection PyBroadException
+def read_catalogue_header(name: str, cache_dir: typing.Optional[str] = None) -> typing.Optional[dict]:
+    """
+    Reads the header of a catalogue persisted by `write_catalogue()`, which
+    contains the high-water mark `start` (the offset of the internal IMSLP
+    API past which no records have been fetched yet) and the time of the
+    last update, without reading the records.
+
+    :param name: The name of the catalogue (`"people"` or `"works"`).
+    :param cache_dir: The cache directory, by default `get_cache_dir()`.
+    :return: The header as a dictionary, or `None` if no valid catalogue
+        has been persisted.
+    """
+
+    path = _catalogue_path(name=name, cache_dir=cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with gzip.open(path, mode="rb") as f:
+            header = json.loads(f.readline())
+    except Exception:
+        return None
+
+    if header.get("version") != IMSLP_CATALOGUE_FORMAT_VERSION:
+        return None
+
+    return header
+
+
+# noinspection PyBroadException
+def read_catalogue(
+        name: str,
+        cache_dir: typing.Optional[str] = None,
+) -> typing.Optional[typing.Tuple[typing.List[dict], int]]:
+    """
+    Reads a catalogue persisted by `write_catalogue()`, and returns its
+    records along with its high-water mark.
+
+    :param name: The name of the catalogue (`"people"` or `"works"`).
+    :param cache_dir: The cache directory, by default `get_cache_dir()`.
+    :return: A tuple `(records, start)`, or `None` if no valid catalogue
+        has been persisted.
+    """
+
+    path = _catalogue_path(name=name, cache_dir=cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with gzip.open(path, mode="rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != IMSLP_CATALOGUE_FORMAT_VERSION:
+                return None
+            records = json.loads(f.read())
+    except Exception:
+        return None
+
+    return records, header["start"]
+
+
+def write_catalogue(
+        name: str,
+        records: typing.List[dict],
+        start: int,
+        cache_dir: typing.Optional[str] = None,
+        overwrite: bool = False,
+) -> bool:
+    """
+    Persists a catalogue along with its high-water mark. Unless `overwrite`
+    is `True` (as when records were renamed or deleted, see
+    `imslp.interfaces.internal.CatalogueCache.sync()`), the write is skipped
+    if another process has already persisted a catalogue that goes at
+    least as far.
+
+    :param name: The name of the catalogue (`"people"` or `"works"`).
+    :param records: The records of the catalogue.
+    :param start: The offset past the last record fetched from IMSLP.
+    :param cache_dir: The cache directory, by default `get_cache_dir()`.
+    :param overwrite: Whether to write the catalogue even if the persisted
+        one goes at least as far.
+    :return: Whether the catalogue was written.
+    """
+
+    if not overwrite:
+        existing_header = read_catalogue_header(name=name, cache_dir=cache_dir)
+        if existing_header is not None and existing_header["start"] >= start:
+            return False
+
+    header = {
+        "version": IMSLP_CATALOGUE_FORMAT_VERSION,
+        "name": name,
+        "start": start,
+        "updated": time.time(),
+    }
+
+    data = gzip.compress(
+        json.dumps(header).encode("utf-8") + b"\n" + json.dumps(records).encode("utf-8"),
+        compresslevel=6)
+
+    atomic_write_bytes(path=_catalogue_path(name=name, cache_dir=cache_dir), data=data)
+
+    return True
+
+
+# noinspection PyBroadException
+def read_sync_timestamp(cache_dir: typing.Optional[str] = None) -> typing.Optional[str]:
+    """
+    Reads the time up to which the persisted catalogues were synced with
+    the logs of the wiki (see `write_sync_timestamp()`).
+
+    :param cache_dir: The cache directory, by default `get_cache_dir()`.
+    :return: The time in the format of the MediaWiki API, or `None` if the
+        catalogues were never synced.
+    """
+
+    path = os.path.join(cache_dir or get_cache_dir(), IMSLP_SYNC_FILENAME)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, mode="rb") as f:
+            return json.loads(f.read())["timestamp"]
+    except Exception:
+        return None
+
+
+def write_sync_timestamp(timestamp: str, cache_dir: typing.Optional[str] = None) -> None:
+    """
+    Persists the time up to which the catalogues were synced with the logs
+    of the wiki; it should be written after the catalogues themselves, so
+    that an interrupted sync is replayed rather than lost.
+
+    :param timestamp: The time in the format of the MediaWiki API.
+    :param cache_dir: The cache directory, by default `get_cache_dir()`.
+    """
+
+    atomic_write_bytes(
+        path=os.path.join(cache_dir or get_cache_dir(), IMSLP_SYNC_FILENAME),
+        data=json.dumps({"timestamp": timestamp}).encode("utf-8"))
@@ -0,0 +1,209 @@
+
+import concurrent.futures
+import hashlib
+import os
+import threading
+import time
+import typing
+import urllib.parse
+
+import imslp.interfaces.constants
+import imslp.interfaces.transport
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "DownloadError",
+    "HostThrottle",
+
+    "download_file",
+    "download_files",
+]
+
+
+# Size (in bytes) of the chunks in which files are streamed to disk
+IMSLP_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Default maximum number of simultaneous downloads
+IMSLP_DOWNLOAD_MAX_WORKERS = 4
+
+# Suffix of the files being downloaded
+IMSLP_DOWNLOAD_PARTIAL_SUFFIX = ".part"
+
+
+class DownloadError(IOError):
+    """
+    Raised when a downloaded file does not match its expected size or
+    SHA-1 digest.
+    """
+    pass
+
+
+class HostThrottle:
+    """
+    Thread-safe throttle that spaces the beginnings of the requests made
+    to the same host by at least `wait_time` seconds.
+    """
+
+    def __init__(self, wait_time: float = 0):
+        self._wait_time = wait_time
+        self._next_times = dict()  # type: typing.Dict[str, float]
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """
+        Waits until a request can be made to the host of `url`.
+
+        :param url: The URL about to be requested.
+        """
+
+        if self._wait_time <= 0:
+            return
+
+        host = urllib.parse.urlsplit(url).netloc
+
+        with self._lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_times.get(host, now))
+            self._next_times[host] = request_time + self._wait_time
+
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+def _hash_file(path: str, hasher, chunk_size: int = IMSLP_DOWNLOAD_CHUNK_SIZE) -> None:
+    with open(path, mode="rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+
+
+def _check_file(path: str, size: typing.Optional[int], sha1: typing.Optional[str]) -> bool:
+    if size is not None and os.path.getsize(path) != size:
+        return False
+    if sha1 is not None:
+        hasher = hashlib.sha1()
+        _hash_file(path, hasher)
+        return hasher.hexdigest() == sha1.lower()
+    return True
+
+
+def download_file(
+        url: str,
+        path: str,
+        size: typing.Optional[int] = None,
+        sha1: typing.Optional[str] = None,
+        cookies: typing.Optional[dict] = None,
+        throttle: typing.Optional[HostThrottle] = None,
+        chunk_size: int = IMSLP_DOWNLOAD_CHUNK_SIZE,
+) -> str:
+    """
+    Downloads a file, streaming it to disk in chunks. The file is first
+    written to `path` with a `.part` suffix; if such a partial file already
+    exists, the download is resumed with an HTTP `Range` request. Once the
+    transfer is complete, the file is checked against its expected `size`
+    and `sha1` digest (as provided by the MediaWiki image information), and
+    renamed to `path`. If `path` already exists and matches, nothing is
+    downloaded.
+
+    :param url: The URL of the file.
+    :param path: The destination path.
+    :param size: The expected size of the file, in bytes.
+    :param sha1: The expected SHA-1 digest of the file, in hexadecimal.
+    :param cookies: The cookies to send, by default the IMSLP disclaimer
+        cookies (see `imslp.interfaces.constants.IMSLP_DISCLAIMER_COOKIES`).
+    :param throttle: The throttle spacing the requests to the same host.
+    :param chunk_size: The size of the chunks written to disk.
+    :return: The destination path.
+    """
+
+    if os.path.exists(path) and _check_file(path=path, size=size, sha1=sha1):
+        return path
+
+    if cookies is None:
+        cookies = imslp.interfaces.constants.IMSLP_DISCLAIMER_COOKIES
+
+    partial_path = path + IMSLP_DOWNLOAD_PARTIAL_SUFFIX
+
+    offset = 0
+    if os.path.exists(partial_path):
+        offset = os.path.getsize(partial_path)
+
+    headers = dict()
+    if offset > 0:
+        headers["Range"] = "bytes={}-".format(offset)
+
+    if throttle is not None:
+        throttle.wait(url)
+
+    with imslp.interfaces.transport.get(url, headers=headers, cookies=cookies, stream=True) as r:
+
+        # the partial file already contains the whole file
+        if r.status_code == 416 and offset > 0:
+            pass
+
+        else:
+            r.raise_for_status()
+
+            # the server ignored the range, and is sending the whole file
+            if r.status_code != 206:
+                offset = 0
+
+            with open(partial_path, mode="ab" if offset > 0 else "wb") as f:
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+
+    if not _check_file(path=partial_path, size=size, sha1=sha1):
+        os.remove(partial_path)
+        raise DownloadError("downloaded file '{}' does not match its expected size or SHA-1 digest".format(url))
+
+    os.replace(partial_path, path)
+
+    return path
+
+
+def _get_filename(image: dict) -> str:
+    filename = image.get("title") or urllib.parse.unquote(
+        urllib.parse.urlsplit(image["url"]).path.rsplit("/", 1)[-1])
+    return filename.replace("/", "_").replace(os.sep, "_")
+
+
+def download_files(
+        images: typing.Iterable[dict],
+        directory: str,
+        max_workers: int = IMSLP_DOWNLOAD_MAX_WORKERS,
+        wait_time: float = 0,
+        cookies: typing.Optional[dict] = None,
+) -> typing.List[str]:
+    """
+    Downloads many files concurrently (see `download_file()`), with at most
+    `max_workers` simultaneous transfers, and the beginnings of the
+    requests to a same host spaced by at least `wait_time` seconds.
+
+    :param images: The metadata of the files, as returned by
+        `imslp.interfaces.scraping.fetch_images_metadata()` (the `url`,
+        and optionally `title`, `size` and `sha1` are used).
+    :param directory: The destination directory.
+    :param max_workers: The maximum number of simultaneous downloads.
+    :param wait_time: The minimum time (in seconds) between requests to a
+        same host.
+    :param cookies: The cookies to send with the requests.
+    :return: The paths of the files, in order.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    throttle = HostThrottle(wait_time=wait_time)
+
+    def download_one(image: dict) -> str:
+        return download_file(
+            url=image["url"],
+            path=os.path.join(directory, _get_filename(image)),
+            size=image.get("size"),
+            sha1=image.get("sha1"),
+            cookies=cookies,
+            throttle=throttle,
+        )
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(download_one, images))
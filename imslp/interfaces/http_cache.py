@@ -0,0 +1,299 @@
+
+import hashlib
+import json
+import os
+import threading
+import time
+import typing
+
+import requests
+import requests.structures
+import requests.utils
+
+import imslp.interfaces.disk_cache
+import imslp.interfaces.instrumentation
+import imslp.interfaces.transport
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "HttpCache",
+
+    "cached_get",
+    "disable_http_cache",
+    "enable_http_cache",
+    "get_http_cache",
+]
+
+
+# Default time (in seconds) during which a cached response is used without
+# being revalidated with IMSLP
+IMSLP_HTTP_CACHE_TTL = 24 * 60 * 60
+
+# Default maximum total size (in bytes) of the cached responses
+IMSLP_HTTP_CACHE_MAX_SIZE = 512 * 1024 * 1024
+
+# Name of the subdirectory of the cache directory storing the responses
+IMSLP_HTTP_CACHE_SUBDIR = "http"
+
+# Response headers that are stored along with the cached bodies
+IMSLP_HTTP_CACHE_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+class HttpCache:
+    """
+    On-disk cache of the bodies of successful GET responses, which stores
+    the `ETag` and `Last-Modified` validators of each response: within
+    `ttl` seconds of being stored (or revalidated), a response is served
+    from disk without any request; afterwards, it is revalidated with a
+    conditional request, and a `304 Not Modified` answer costs no download.
+    When the total size of the cache exceeds `max_size` bytes, the least
+    recently used responses are evicted.
+
+    Each response is stored in a single file (a JSON header line followed
+    by the body), written atomically, so the cache can be shared by
+    concurrent processes.
+    """
+
+    def __init__(
+            self,
+            directory: typing.Optional[str] = None,
+            ttl: float = IMSLP_HTTP_CACHE_TTL,
+            max_size: int = IMSLP_HTTP_CACHE_MAX_SIZE,
+    ):
+        self._directory = directory or os.path.join(
+            imslp.interfaces.disk_cache.get_cache_dir(), IMSLP_HTTP_CACHE_SUBDIR)
+        self._ttl = ttl
+        self._max_size = max_size
+
+        # approximate total size of the cache, computed on first write
+        self._size = None          # type: typing.Optional[int]
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        """
+        Returns the directory in which the responses are stored.
+        """
+        return self._directory
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self._directory, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    # noinspection PyBroadException
+    def _read(self, url: str) -> typing.Optional[typing.Tuple[dict, bytes]]:
+        try:
+            with open(self._path(url), mode="rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except Exception:
+            return None
+
+        if header.get("url") != url:
+            return None
+
+        return header, body
+
+    def _write(self, url: str, headers: dict, body: bytes) -> None:
+        header = {
+            "url": url,
+            "stored": time.time(),
+            "headers": headers,
+        }
+        data = json.dumps(header).encode("utf-8") + b"\n" + body
+
+        path = self._path(url)
+        try:
+            previous_size = os.path.getsize(path)
+        except OSError:
+            previous_size = 0
+
+        imslp.interfaces.disk_cache.atomic_write_bytes(path=path, data=data)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._compute_size()
+            else:
+                self._size += len(data) - previous_size
+
+            if self._size > self._max_size:
+                self._evict()
+
+    def _compute_size(self) -> int:
+        size = 0
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    size += entry.stat().st_size
+        return size
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used responses, until the cache is back
+        under 90% of its maximum size.
+        """
+
+        with os.scandir(self._directory) as entries:
+            files = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in entries
+                if entry.is_file() and not entry.name.startswith(".")
+            ]
+
+        size = sum(map(lambda file: file[1], files))
+        for _, file_size, path in sorted(files):
+            if size <= 0.9 * self._max_size:
+                break
+            try:
+                os.remove(path)
+                size -= file_size
+            except OSError:
+                pass
+
+        self._size = size
+
+    def _touch(self, url: str) -> None:
+        # the modification time of a file records its last use
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _make_response(url: str, headers: dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Makes a GET request through the shared session of the package (see
+        `imslp.interfaces.transport`), served from or stored in the cache.
+        Cached responses have a `from_cache` attribute set to `True`.
+
+        :param url: The URL.
+        :param kwargs: The parameters of `requests.Session.request()`.
+        :return: The response.
+        """
+
+        entry = self._read(url)
+
+        if entry is not None:
+            header, body = entry
+
+            if time.time() - header["stored"] < self._ttl:
+                self._touch(url)
+                imslp.interfaces.instrumentation.emit("http_cache.get", url=url, cache="hit", bytes=len(body))
+                return self._make_response(url=url, headers=header["headers"], body=body)
+
+            # revalidate the cached response
+            conditional_headers = dict(kwargs.pop("headers", None) or dict())
+            cached_headers = requests.structures.CaseInsensitiveDict(header["headers"])
+            if "ETag" in cached_headers:
+                conditional_headers["If-None-Match"] = cached_headers["ETag"]
+            if "Last-Modified" in cached_headers:
+                conditional_headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+            kwargs["headers"] = conditional_headers
+
+        r = imslp.interfaces.transport.get(url, **kwargs)
+
+        if r.status_code == 304 and entry is not None:
+            header, body = entry
+            headers = dict(header["headers"])
+            for key in IMSLP_HTTP_CACHE_HEADERS:
+                if key in r.headers:
+                    headers[key] = r.headers[key]
+            self._write(url=url, headers=headers, body=body)
+            imslp.interfaces.instrumentation.emit("http_cache.get", url=url, cache="revalidated", bytes=len(body))
+            return self._make_response(url=url, headers=headers, body=body)
+
+        if r.status_code == 200:
+            self._write(
+                url=url,
+                headers={key: r.headers[key] for key in IMSLP_HTTP_CACHE_HEADERS if key in r.headers},
+                body=r.content)
+
+        imslp.interfaces.instrumentation.emit("http_cache.get", url=url, cache="miss")
+
+        r.from_cache = False
+        return r
+
+    def clear(self) -> None:
+        """
+        Removes all the cached responses.
+        """
+        with self._lock:
+            if os.path.isdir(self._directory):
+                for name in os.listdir(self._directory):
+                    try:
+                        os.remove(os.path.join(self._directory, name))
+                    except OSError:
+                        pass
+            self._size = 0
+
+
+# Internal variable storing the cache enabled for the package, if any
+_http_cache = None         # type: typing.Optional[HttpCache]
+
+
+def enable_http_cache(
+        directory: typing.Optional[str] = None,
+        ttl: float = IMSLP_HTTP_CACHE_TTL,
+        max_size: int = IMSLP_HTTP_CACHE_MAX_SIZE,
+) -> HttpCache:
+    """
+    Enables the on-disk cache of the pages scraped from IMSLP (work pages
+    and category charts); see `HttpCache`.
+
+    :param directory: The directory of the cache, by default the `http`
+        subdirectory of the user-level cache directory.
+    :param ttl: The time (in seconds) before a response is revalidated.
+    :param max_size: The maximum total size (in bytes) of the cache.
+    :return: The cache.
+    """
+
+    global _http_cache
+
+    _http_cache = HttpCache(directory=directory, ttl=ttl, max_size=max_size)
+
+    return _http_cache
+
+
+def disable_http_cache() -> None:
+    """
+    Disables the on-disk cache of the pages scraped from IMSLP (the cached
+    responses are kept on disk).
+    """
+
+    global _http_cache
+
+    _http_cache = None
+
+
+def get_http_cache() -> typing.Optional[HttpCache]:
+    """
+    Returns the cache enabled with `enable_http_cache()`, or `None`.
+    """
+    return _http_cache
+
+
+def cached_get(url: str, **kwargs) -> requests.Response:
+    """
+    Makes a GET request through the cache if it is enabled, and through the
+    shared session of the package otherwise.
+
+    :param url: The URL.
+    :param kwargs: The parameters of `requests.Session.request()`.
+    :return: The response.
+    """
+
+    if _http_cache is not None:
+        return _http_cache.get(url, **kwargs)
+
+    return imslp.interfaces.transport.get(url, **kwargs)
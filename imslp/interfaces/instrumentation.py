@@ -0,0 +1,256 @@
+
+import bisect
+import logging
+import threading
+import time
+import typing
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "InstrumentationEvent",
+    "LoggingListener",
+    "MetricsCollector",
+
+    "add_listener",
+    "emit",
+    "is_enabled",
+    "remove_listener",
+    "span",
+]
+
+
+# Upper bounds (in seconds) of the buckets of the latency histograms
+IMSLP_LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+class InstrumentationEvent(typing.NamedTuple):
+    """
+    Event reported to the listeners: the name of the operation (such as
+    `"http.request"`), its duration in seconds (or `None` for events that
+    are not timed), and its attributes (such as `"bytes"`, `"retries"` or
+    `"cache"`).
+    """
+    name: str
+    duration: typing.Optional[float]
+    attributes: typing.Dict[str, typing.Any]
+
+
+# Internal variable storing the listeners; when it is empty, the
+# instrumentation is disabled, and costs a single test per operation
+_listeners = []            # type: typing.List[typing.Callable[[InstrumentationEvent], None]]
+
+_logger = logging.getLogger(__name__)
+
+
+def add_listener(listener: typing.Callable[[InstrumentationEvent], None]) -> None:
+    """
+    Registers a function to be called with each `InstrumentationEvent`
+    (from the thread that performed the operation).
+
+    :param listener: The function.
+    """
+    _listeners.append(listener)
+
+
+def remove_listener(listener: typing.Callable[[InstrumentationEvent], None]) -> None:
+    """
+    Unregisters a function registered with `add_listener()`.
+
+    :param listener: The function.
+    """
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether any listener is registered.
+    """
+    return len(_listeners) > 0
+
+
+# noinspection PyBroadException
+def emit(name: str, duration: typing.Optional[float] = None, **attributes) -> None:
+    """
+    Reports an event to the listeners; the failures of listeners are
+    logged, and do not interrupt the operation being instrumented.
+
+    :param name: The name of the operation.
+    :param duration: The duration of the operation, in seconds.
+    :param attributes: The attributes of the event.
+    """
+
+    if not _listeners:
+        return
+
+    event = InstrumentationEvent(name=name, duration=duration, attributes=attributes)
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception:
+            _logger.exception("instrumentation listener %r failed", listener)
+
+
+class _Span:
+    """
+    Context manager timing an operation, and reporting it on exit.
+    """
+
+    __slots__ = ("name", "attributes", "_start")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+        self._start = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        emit(self.name, time.perf_counter() - self._start, **self.attributes)
+        return False
+
+
+class _NullSpan:
+    """
+    Context manager standing for a `_Span` when instrumentation is disabled.
+    """
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attributes) -> typing.Union[_Span, _NullSpan]:
+    """
+    Returns a context manager that times the operation it wraps, and
+    reports it as an event when it exits; attributes known only during the
+    operation can be added with its `set()` method. When instrumentation is
+    disabled, a shared no-op context manager is returned.
+
+    :param name: The name of the operation.
+    :param attributes: The attributes of the event.
+    :return: The context manager.
+    """
+
+    if not _listeners:
+        return _NULL_SPAN
+
+    return _Span(name, attributes)
+
+
+class LoggingListener:
+    """
+    Listener that logs each event, by default at the `DEBUG` level of the
+    `imslp` logger.
+    """
+
+    def __init__(self, logger: typing.Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self._logger = logger or logging.getLogger("imslp")
+        self._level = level
+
+    def __call__(self, event: InstrumentationEvent) -> None:
+        if not self._logger.isEnabledFor(self._level):
+            return
+        self._logger.log(
+            self._level,
+            "%s%s %s",
+            event.name,
+            "" if event.duration is None else " {:.2f} ms".format(1000 * event.duration),
+            " ".join("{}={}".format(key, value) for key, value in event.attributes.items()))
+
+
+class MetricsCollector:
+    """
+    Thread-safe listener that aggregates the events by name: number of
+    events, latency histogram (see `IMSLP_LATENCY_BUCKETS`), and totals of
+    the `bytes`, `retries` and `error` attributes; and the hit rate of the
+    HTTP cache (from the `cache` attribute).
+    """
+
+    def __init__(self, buckets: typing.Sequence[float] = IMSLP_LATENCY_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Discards the aggregated metrics.
+        """
+        with self._lock:
+            self._operations = dict()  # type: typing.Dict[str, dict]
+            self._cache = {"hit": 0, "revalidated": 0, "miss": 0}
+
+    def __call__(self, event: InstrumentationEvent) -> None:
+        with self._lock:
+            operation = self._operations.get(event.name)
+            if operation is None:
+                operation = self._operations[event.name] = {
+                    "count": 0,
+                    "total_s": 0.0,
+                    "max_s": 0.0,
+                    "histogram": [0] * (len(self._buckets) + 1),
+                    "bytes": 0,
+                    "retries": 0,
+                    "errors": 0,
+                }
+
+            operation["count"] += 1
+
+            if event.duration is not None:
+                operation["total_s"] += event.duration
+                operation["max_s"] = max(operation["max_s"], event.duration)
+                operation["histogram"][bisect.bisect_left(self._buckets, event.duration)] += 1
+
+            attributes = event.attributes
+            operation["bytes"] += attributes.get("bytes") or 0
+            operation["retries"] += attributes.get("retries") or 0
+            if "error" in attributes:
+                operation["errors"] += 1
+
+            if attributes.get("cache") in self._cache:
+                self._cache[attributes["cache"]] += 1
+
+    def summary(self) -> dict:
+        """
+        Returns the aggregated metrics, as a dictionary that can be
+        serialized to JSON.
+        """
+
+        labels = ["<={}".format(bound) for bound in self._buckets] + [">{}".format(self._buckets[-1])]
+
+        with self._lock:
+            operations = {
+                name: dict(
+                    operation,
+                    mean_s=operation["total_s"] / operation["count"],
+                    histogram=dict(zip(labels, operation["histogram"])),
+                )
+                for name, operation in self._operations.items()
+            }
+
+            lookups = sum(self._cache.values())
+            cache = dict(
+                self._cache,
+                hit_rate=(self._cache["hit"] + self._cache["revalidated"]) / lookups if lookups > 0 else None,
+            )
+
+        return {"operations": operations, "cache": cache}
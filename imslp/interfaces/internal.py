@@ -1,23 +1,49 @@
 
+import asyncio
+import bisect
+import concurrent.futures
+import functools
 import glob
 import json
 import os
+import re
+import threading
+import time
 import typing
 import zipfile
 
-import requests
-
 import imslp
+import imslp.helpers.lru_cache
+import imslp.helpers.search_index
+import imslp.helpers.string_search
+import imslp.interfaces.compact
+import imslp.interfaces.disk_cache
+import imslp.interfaces.instrumentation
+import imslp.interfaces.recent_changes
 
 
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 
 __all__ = [
+    "CatalogueCache",
     "HashablePageRecord",
 
+    "get_default_cache",
+    "get_field_values",
+    "get_lookup_table",
+    "get_record_field",
+    "get_search_index",
+    "get_search_keys",
+    "is_cache_partial",
+    "iter_people",
+    "iter_works",
     "list_people",
     "list_works",
     "load_cache",
+    "load_cache_async",
+    "start_background_loading",
+    "sync_cache",
+    "wait_for_cache",
 ]
 
 
@@ -35,54 +61,983 @@ IMSLP_API_PEOPLE = IMSLP_API_GENERIC.format(typ=1)
 # URL for list of works
 IMSLP_API_WORKS = IMSLP_API_GENERIC.format(typ=2)
 
+# Number of records before the expected offset of a record at which the page
+# of results refetched for it begins (see `_refetch_records()`)
+IMSLP_REFETCH_MARGIN = 5
 
-# Internal variables to cache calls
-_cache_people = None
-_cache_works = None
+# Default maximum number of search results memoized per catalogue cache
+IMSLP_SEARCH_RESULTS_CACHE_SIZE = 1024
 
 
 class HashablePageRecord(dict):
     """
     Subclass of a dictionary that can contain an IMSLP API record that
     can be hashed, using a string hash of the `permlink` of the record.
+    The hash is computed once and cached, so records should not be
+    modified once they have been hashed.
     """
 
+    __slots__ = ("_hash",)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._hash = None
 
     def __hash__(self):
-        hash_id = hash(self["permlink"])
+        hash_id = getattr(self, "_hash", None)
+        if hash_id is None:
+            hash_id = self._hash = hash(self["permlink"])
         return hash_id
 
+    def __reduce__(self):
+        # the cached hash is not pickled, as string hashes are randomized
+        # per process: it is recomputed on first use after unpickling
+        return self.__class__, (dict(self),)
+
 
-def _raw_call(imslp_url_pattern: str, start: int = 0, count: int = None):
+def _to_records(contents: typing.Iterable[dict]) -> typing.List[HashablePageRecord]:
+    return [
+        record if isinstance(record, HashablePageRecord) else HashablePageRecord(record)
+        for record in contents
+    ]
+
+
+class CatalogueCache:
     """
-    Returns the result of a request made to the internal IMSLP API
-    to retrieve a list of works or of people. This method is a helper
-    method called by `list_people()` and `list_works()`.
+    Memory cache of the IMSLP people and works catalogues, along with the
+    normalized search keys, search indexes and lookup tables built over
+    their fields.
+
+    The catalogues are loaded on first use, with the options given to the
+    constructor (see `load_cache()`). Loading is single-flight: while a
+    loading is in progress, the other callers wait for it rather than start
+    their own, and the people and the works are loaded in parallel.
+
+    The module-level functions (`list_people()`, `load_cache()`, ...) use a
+    process-wide instance (see `get_default_cache()`); other instances can
+    be attached to `imslp.client.ImslpClient` objects, so that isolated
+    catalogues, loaded and refreshed independently, coexist.
     """
 
-    results = []
-    more_results = True
+    def __init__(
+            self,
+            from_file: bool = True,
+            persist: bool = True,
+            concurrency: int = 1,
+            compact: bool = False,
+            people: typing.Optional[typing.Iterable[dict]] = None,
+            works: typing.Optional[typing.Iterable[dict]] = None,
+            search_results_cache_size: int = IMSLP_SEARCH_RESULTS_CACHE_SIZE,
+    ):
+        """
+        :param from_file: Determines whether to use package's internal cache
+        :param persist: Determines whether to update the user-level disk cache
+        :param concurrency: Number of simultaneous requests made to IMSLP per catalogue
+        :param compact: Determines whether to use the compact representation
+        :param people: The records of the people catalogue, if it should
+            not be loaded from IMSLP.
+        :param works: The records of the works catalogue, if it should not
+            be loaded from IMSLP.
+        :param search_results_cache_size: The maximum number of search
+            results memoized (see `get_search_results()`).
+        """
 
-    while more_results:
+        # the options used when the catalogues are loaded on first use
+        self._options = {
+            "from_file": from_file,
+            "persist": persist,
+            "concurrency": concurrency,
+            "compact": compact,
+        }
+
+        self._catalogues = {
+            "people": None if people is None else _to_records(people),
+            "works": None if works is None else _to_records(works),
+        }  # type: typing.Dict[str, typing.Optional[typing.Sequence[HashablePageRecord]]]
+
+        # the high-water marks of the catalogues (the offsets of the internal
+        # IMSLP API past which no records have been fetched yet), and the
+        # time up to which they were synced with the logs of the wiki
+        self._starts = {
+            name: None if records is None else len(records)
+            for name, records in self._catalogues.items()
+        }  # type: typing.Dict[str, typing.Optional[int]]
+        self._synced = None        # type: typing.Optional[str]
+
+        # the normalized search keys of the fields of the records, and the
+        # search indexes built over them, keyed by catalogue name and field;
+        # and the hash maps from the exact values of a field to the positions
+        # of the records, keyed by catalogue name, field and whether the
+        # values are unique, along with the number of records they cover
+        self._search_keys = dict()
+        self._indexes = dict()
+        self._lookup_tables = dict()
+
+        # serializes the extension of the search keys, search indexes and
+        # lookup tables, as the catalogues may grow while being searched
+        self._lock = threading.RLock()
+
+        # the memoized results of searches, and the version of the
+        # catalogues, incremented (and the results discarded) whenever
+        # the catalogues change
+        self._search_results = imslp.helpers.lru_cache.LruCache(maxsize=search_results_cache_size)
+        self._version = 0
+
+        # the condition notified when catalogues are installed or grow, and
+        # when a loading ends; whether a loading is in progress, whether the
+        # catalogues only hold part of the records (during a loading in the
+        # background), and the exception that interrupted such a loading
+        self._condition = threading.Condition()
+        self._loading = False
+        self._partial = False
+        self._error = None         # type: typing.Optional[BaseException]
+
+    def _get_options(self, **options) -> dict:
+        return {
+            key: self._options[key] if options.get(key) is None else options[key]
+            for key in self._options
+        }
+
+    def _changed(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._search_results.clear()
+
+    def _install(self, catalogues: typing.Dict[str, typing.Tuple[typing.Sequence[HashablePageRecord], int]]) -> None:
+        with self._condition:
+            for name, (records, start) in catalogues.items():
+                if self._catalogues[name] is None:
+                    self._catalogues[name] = records
+                    self._starts[name] = start
+            self._changed()
+            self._condition.notify_all()
+
+    def get_catalogue(self, catalogue: str) -> typing.Sequence[HashablePageRecord]:
+        """
+        Returns the records of the people or works catalogue, loading it
+        first if necessary; if it is being loaded in the background (see
+        `start_background_loading()`), only its local snapshot is waited
+        for. The returned sequence may grow while the catalogue is loaded.
+
+        :param catalogue: Either `"people"` or `"works"`.
+        :return: The records of the catalogue.
+        """
+
+        records = self._catalogues[catalogue]
+
+        if records is None:
+            with self._condition:
+                self._condition.wait_for(lambda: self._catalogues[catalogue] is not None or not self._loading)
+            records = self._catalogues[catalogue]
+
+        if records is None:
+            self.load()
+            records = self._catalogues[catalogue]
+
+        return records
+
+    def get_records(
+            self,
+            catalogue: str,
+            start: int = 0,
+            count: typing.Optional[int] = None,
+    ) -> typing.Sequence[HashablePageRecord]:
+        """
+        Returns a slice of the records of the people or works catalogue
+        (see `get_catalogue()`), which does not change when the catalogue
+        grows.
+
+        :param catalogue: Either `"people"` or `"works"`.
+        :param start: The offset of the first record.
+        :param count: The maximum number of records, or `None` for all.
+        :return: The records.
+        """
+        return self.get_catalogue(catalogue)[start:start+count if count is not None else None]
+
+    def get_search_keys(self, catalogue: str, field: str) -> typing.List[str]:
+        """
+        Returns the normalized search keys of a field of the records of the
+        people or works catalogue (see
+        `imslp.helpers.string_search.normalize_search_key`), computed once on
+        first use, and extended if records were added to the catalogue since;
+        the keys are in the same order as the records of the catalogue.
+
+        :param catalogue: Either `"people"` or `"works"`.
+        :param field: The (possibly dotted) name of the field.
+        :return: The list of search keys.
+        """
+
+        key = (catalogue, field)
+        records = self.get_records(catalogue)
+
+        with self._lock:
+            search_keys = self._search_keys.get(key)
+            if search_keys is None:
+                search_keys = self._search_keys[key] = []
+
+            if len(search_keys) < len(records):
+                normalize_search_key = imslp.helpers.string_search.normalize_search_key
+                search_keys.extend(
+                    normalize_search_key(value or "")
+                    for value in get_field_values(records[len(search_keys):], field))
+
+        return search_keys
+
+    def get_search_index(self, catalogue: str, field: str) -> imslp.helpers.search_index.NgramIndex:
+        """
+        Returns the search index over a field of the records of the people
+        or works catalogue, building it on first use from the normalized
+        search keys of the field, and extending it if records were added to
+        the catalogue since. The positions in the index are the positions
+        of the records in the catalogue.
+
+        :param catalogue: Either `"people"` or `"works"`.
+        :param field: The (possibly dotted) name of the field to index.
+        :return: The search index.
+        """
+
+        key = (catalogue, field)
+        search_keys = self.get_search_keys(catalogue=catalogue, field=field)
+
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = imslp.helpers.search_index.NgramIndex(search_keys, normalized=True)
+                self._indexes[key] = index
+
+            elif len(index) < len(search_keys):
+                index.extend(search_keys[len(index):], normalized=True)
+
+        return index
+
+    def get_lookup_table(
+            self,
+            catalogue: str,
+            field: str,
+            unique: bool = False,
+    ) -> typing.Dict[str, typing.Union[int, typing.List[int]]]:
+        """
+        Returns a hash map from the exact values of a field of the records
+        of the people or works catalogue to the positions of these records
+        in the catalogue, building it on first use (and extending it if
+        records were added to the catalogue since), so that records can be
+        looked up by value without scanning the catalogue.
+
+        :param catalogue: Either `"people"` or `"works"`.
+        :param field: The (possibly dotted) name of the field.
+        :param unique: Whether the values of the field identify the records
+            (such as `"permlink"`), in which case each value is mapped to a
+            single position (the first one), rather than to a list.
+        :return: The hash map from values to positions.
+        """
+
+        key = (catalogue, field, unique)
+        records = self.get_records(catalogue)
+
+        with self._lock:
+            table, size = self._lookup_tables.get(key, (dict(), 0))
+
+            if size < len(records):
+                values = get_field_values(records[size:], field)
+
+                if unique:
+                    for position, value in enumerate(values, start=size):
+                        table.setdefault(value, position)
+                else:
+                    for position, value in enumerate(values, start=size):
+                        positions = table.get(value)
+                        if positions is None:
+                            table[value] = [position]
+                        else:
+                            positions.append(position)
+
+                self._lookup_tables[key] = (table, len(records))
+
+        return table
+
+    @property
+    def version(self) -> int:
+        """
+        Returns the version of the catalogues, which is incremented whenever
+        they change (when they are loaded, reset, or grow).
+        """
+        return self._version
+
+    def get_search_results(self, key: typing.Hashable) -> typing.Optional[typing.FrozenSet[HashablePageRecord]]:
+        """
+        Returns the memoized results of a search (see `put_search_results()`),
+        or `None` if they are not memoized.
+
+        :param key: The key of the search.
+        :return: The results, or `None`.
+        """
+        return self._search_results.get(key)
+
+    def put_search_results(
+            self,
+            key: typing.Hashable,
+            results: typing.FrozenSet[HashablePageRecord],
+            version: int,
+    ) -> None:
+        """
+        Memoizes the results of a search, evicting the least recently used
+        results if too many are memoized; the results are discarded if the
+        catalogues changed since the search began.
+
+        :param key: The key of the search, which should identify the
+            catalogue, the search expressions and the options of the search.
+        :param results: The results.
+        :param version: The `version` of the catalogues when the search began.
+        """
+        with self._lock:
+            if version == self._version:
+                self._search_results.put(key, results)
+
+    def search_results_info(self) -> imslp.helpers.lru_cache.CacheInfo:
+        """
+        Returns the statistics (hits, misses, size) of the memoized search
+        results.
+        """
+        return self._search_results.info()
+
+    def load(
+            self,
+            from_file: typing.Optional[bool] = None,
+            concurrency: typing.Optional[int] = None,
+            persist: typing.Optional[bool] = None,
+            compact: typing.Optional[bool] = None,
+    ) -> None:
+        """
+        Loads the catalogues that are not loaded yet (see `load_cache()`),
+        the people and the works in parallel; the options that are `None`
+        are those given to the constructor. If a loading is already in
+        progress, it is waited for first.
+        """
+
+        options = self._get_options(from_file=from_file, concurrency=concurrency, persist=persist, compact=compact)
+
+        with self._condition:
+            self._condition.wait_for(lambda: not self._loading)
+
+            names = [name for name, records in self._catalogues.items() if records is None]
+            if len(names) == 0:
+                return
+
+            self._loading = True
+
+        loaded = dict()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(names)) as executor:
+                futures = {
+                    name: executor.submit(
+                        _load_catalogue,
+                        name=name,
+                        list_function=list_people if name == "people" else list_works,
+                        **options)
+                    for name in names
+                }
+                for name, future in futures.items():
+                    loaded[name] = future.result()
+
+        finally:
+            with self._condition:
+                self._install(loaded)
+                self._loading = False
+
+    def reset(
+            self,
+            from_file: typing.Optional[bool] = None,
+            persist: typing.Optional[bool] = None,
+            compact: typing.Optional[bool] = None,
+    ) -> None:
+        """
+        Discards the catalogues, and the structures built over them, and
+        loads them again (see `load()`).
+        """
+
+        with self._condition:
+            # a loading in progress would otherwise repopulate the cache
+            self._condition.wait_for(lambda: not self._loading)
+
+            self._catalogues = {"people": None, "works": None}
+            self._starts = {"people": None, "works": None}
+            self._synced = None
+            self._partial = False
+            self._error = None
+
+            with self._lock:
+                self._search_keys.clear()
+                self._indexes.clear()
+                self._lookup_tables.clear()
+                self._changed()
+
+        self.load(from_file=from_file, persist=persist, compact=compact)
+
+    def start_background_loading(
+            self,
+            from_file: typing.Optional[bool] = None,
+            persist: typing.Optional[bool] = None,
+            delay: float = 0.0,
+    ) -> None:
+        """
+        Starts loading the catalogues in a background thread, and returns
+        immediately (see `imslp.interfaces.internal.start_background_loading()`).
+        Nothing is done if the catalogues are already loaded, or being loaded;
+        a loading in the background that was interrupted is resumed from the
+        high-water marks of the catalogues.
+        """
+
+        options = self._get_options(from_file=from_file, persist=persist)
+
+        with self._condition:
+            loaded = all(records is not None for records in self._catalogues.values())
+            if self._loading or (loaded and not self._partial):
+                return
+
+            resume = self._partial
+            self._loading = True
+            self._partial = True
+            self._error = None
+
+        thread = threading.Thread(
+            target=self._load_in_background,
+            kwargs={
+                "from_file": options["from_file"],
+                "persist": options["persist"],
+                "delay": delay,
+                "resume": resume,
+            },
+            name="imslp-background-loading",
+            daemon=True,
+        )
+        thread.start()
+
+    def _load_in_background(self, from_file: bool, persist: bool, delay: float, resume: bool) -> None:
+        error = None
+        try:
+            pending = []
+
+            # the local snapshots of both catalogues are installed first, so
+            # that both can be searched before any request is made; the
+            # catalogues of an interrupted loading are completed instead
+            for name in ("works", "people"):
+                records = self._catalogues[name]
+                if records is not None:
+                    if resume and isinstance(records, list):
+                        pending.append((name, records, self._starts[name]))
+                    continue
+
+                contents, start = _read_local_catalogue(name=name, from_file=from_file)
+                records = list(map(HashablePageRecord, contents))
+                self._install({name: (records, start)})
+                pending.append((name, records, start))
+
+            if len(pending) > 0:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                    futures = [
+                        executor.submit(
+                            self._append_remainder,
+                            name=name, records=records, start=start, persist=persist, delay=delay)
+                        for name, records, start in pending
+                    ]
+                    for future in futures:
+                        future.result()
+
+        except BaseException as e:
+            error = e
+
+        finally:
+            with self._condition:
+                self._error = error
+                self._partial = error is not None
+                self._loading = False
+                self._condition.notify_all()
+
+    def _append_remainder(
+            self,
+            name: str,
+            records: typing.List[HashablePageRecord],
+            start: int,
+            persist: bool,
+            delay: float,
+    ) -> None:
+        """
+        Appends the records of a catalogue past its high-water mark, page by
+        page as they are fetched from IMSLP.
+        """
+
+        fetched = 0
+        imslp_url_pattern = IMSLP_API_PEOPLE if name == "people" else IMSLP_API_WORKS
+
+        for page in _iter_raw_pages(imslp_url_pattern=imslp_url_pattern, start=start, delay=delay):
+            with self._condition:
+                records.extend(map(HashablePageRecord, page))
+                self._starts[name] = start + fetched + len(page)
+                self._changed()
+                self._condition.notify_all()
+            fetched += len(page)
+
+        if persist and fetched > 0:
+            try:
+                imslp.interfaces.disk_cache.write_catalogue(name=name, records=records, start=start + fetched)
+            except OSError:
+                # the disk cache is only an optimization
+                pass
+
+    def is_partial(self) -> bool:
+        """
+        Returns whether the catalogues only hold part of their records: while
+        they are being loaded in the background, or if that loading was
+        interrupted (until it is resumed by `start_background_loading()`).
+        """
+        return self._partial
+
+    def wait(self, timeout: typing.Optional[float] = None) -> bool:
+        """
+        Waits until the end of the loading in progress, if any.
+
+        :param timeout: The maximum time to wait (in seconds), or `None` to
+            wait as long as necessary.
+        :return: Whether the loading is over.
+        :raises: The exception that interrupted a loading in the background,
+            only once: the catalogues then remain partial (see `is_partial()`)
+            until the loading is resumed by `start_background_loading()`.
+        """
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: not self._loading, timeout):
+                return False
+
+            error, self._error = self._error, None
+
+        if error is not None:
+            raise error
+
+        return True
+
+    async def load_async(
+            self,
+            transport: "imslp.interfaces.async_transport.AsyncTransport",
+            from_file: typing.Optional[bool] = None,
+            concurrency: int = 8,
+            persist: typing.Optional[bool] = None,
+            compact: typing.Optional[bool] = None,
+    ) -> None:
+        """
+        Asynchronous version of `load()`, which fetches the people and the
+        works concurrently through an `imslp.interfaces.async_transport.AsyncTransport`.
+        """
+
+        options = self._get_options(from_file=from_file, persist=persist, compact=compact)
+        loop = asyncio.get_running_loop()
+
+        with self._condition:
+            busy = self._loading
+            names = [name for name, records in self._catalogues.items() if records is None]
+            if not busy and len(names) > 0:
+                self._loading = True
+
+        if busy:
+            # the loading in progress is waited for (and what it did not
+            # load is loaded) without blocking the event loop
+            await loop.run_in_executor(None, functools.partial(self.load, **options))
+            return
+
+        if len(names) == 0:
+            return
+
+        loaded = dict()
+        try:
+            catalogues = await asyncio.gather(*[
+                _load_catalogue_async(
+                    transport=transport,
+                    name=name,
+                    imslp_url_pattern=IMSLP_API_PEOPLE if name == "people" else IMSLP_API_WORKS,
+                    from_file=options["from_file"],
+                    persist=options["persist"],
+                    concurrency=concurrency,
+                    compact=options["compact"],
+                )
+                for name in names
+            ])
+            loaded = dict(zip(names, catalogues))
+
+        finally:
+            with self._condition:
+                self._install(loaded)
+                self._loading = False
+
+    def sync(
+            self,
+            site: typing.Optional["imslp.interfaces.mw_api.ImslpMwClient"] = None,
+            since: typing.Optional[str] = None,
+            persist: typing.Optional[bool] = None,
+    ) -> typing.Dict[str, int]:
+        """
+        Brings the catalogues up to date with IMSLP (see `sync_cache()`),
+        loading them first if necessary. If a loading is in progress, it is
+        waited for first.
+
+        :param site: The MediaWiki client used to read the logs of the wiki,
+            by default a new `imslp.interfaces.mw_api.ImslpMwClient`.
+        :param since: The time (in the format of the MediaWiki API) of the
+            oldest changes to apply, by default the time up to which the
+            catalogues were last synced (see `_get_sync_baseline()`); if
+            it is not known, the catalogues are loaded again instead.
+        :param persist: Determines whether to update the user-level disk cache
+        :return: The numbers of records `"inserted"`, `"updated"` and `"deleted"`.
+        """
+
+        persist = self._get_options(persist=persist)["persist"]
+
+        if site is None:
+            site = imslp.interfaces.mw_api.ImslpMwClient()
+
+        for name in self._catalogues:
+            self.get_catalogue(name)
+
+        since = since or self._synced or _get_sync_baseline()
+        if since is None:
+            return self._reload(persist=persist)
+
+        with self._condition:
+            self._condition.wait_for(lambda: not self._loading)
+            self._loading = True
+
+        stats = {"inserted": 0, "updated": 0, "deleted": 0}
         try:
-            req = requests.get(imslp_url_pattern.format(start=start))
-            if not req.ok:
+            with imslp.interfaces.instrumentation.span("catalogue.sync") as span:
+                events = list(imslp.interfaces.recent_changes.iter_log_events(site=site, since=since))
+
+                for name in self._catalogues:
+                    self._sync_catalogue(
+                        name=name,
+                        events=[event for event in events if event.catalogue == name],
+                        persist=persist,
+                        stats=stats)
+
+                # the changes made during the second of the last event are
+                # requested again by the next sync, which is harmless since
+                # applying an event twice has no effect
+                self._synced = max([since] + [event.timestamp for event in events])
+
+                if persist:
+                    try:
+                        imslp.interfaces.disk_cache.write_sync_timestamp(timestamp=self._synced)
+                    except OSError:
+                        # the disk cache is only an optimization
+                        pass
+
+                span.set(events=len(events), **stats)
+
+        finally:
+            with self._condition:
+                self._loading = False
+                self._condition.notify_all()
+
+        return stats
+
+    def _reload(self, persist: bool) -> typing.Dict[str, int]:
+        """
+        Loads the catalogues again from IMSLP, without the local snapshots,
+        for catalogues that cannot be synced as the time from which they
+        derive is unknown; all their records count as deleted, then
+        inserted.
+        """
+
+        synced = imslp.interfaces.recent_changes.format_timestamp()
+        deleted = sum(len(self.get_catalogue(name)) for name in self._catalogues)
+
+        with imslp.interfaces.instrumentation.span("catalogue.reload"):
+            self.reset(from_file=False, persist=persist)
+
+        with self._condition:
+            self._synced = synced
+
+        if persist:
+            try:
+                imslp.interfaces.disk_cache.write_sync_timestamp(timestamp=synced)
+            except OSError:
+                # the disk cache is only an optimization
+                pass
+
+        inserted = sum(len(self.get_catalogue(name)) for name in self._catalogues)
+        return {"inserted": inserted, "updated": 0, "deleted": deleted}
+
+    def _sync_catalogue(
+            self,
+            name: str,
+            events: typing.List["imslp.interfaces.recent_changes.LogEvent"],
+            persist: bool,
+            stats: typing.Dict[str, int],
+    ) -> None:
+        """
+        Appends the records of a catalogue past its high-water mark, applies
+        the deletions, undeletions and renamings of its pages, then
+        refetches the records of the pages that were edited, undeleted or
+        renamed (see `_refetch_records()`).
+        """
+
+        records = self._catalogues[name]
+        if records is None:
+            return
+
+        start = self._starts[name]
+        imslp_url_pattern = IMSLP_API_PEOPLE if name == "people" else IMSLP_API_WORKS
+        inserted = _to_records(_raw_call(imslp_url_pattern=imslp_url_pattern, start=start))
+
+        contents = list(records) + inserted
+        positions = {record["id"]: position for position, record in enumerate(contents)}
+        inserted_count, deleted_count = len(inserted), 0
+
+        # the titles of the records that were renamed or refetched, and of
+        # the records to refetch, as the changes do not tell their fields
+        # other than those that derive from their title
+        updated = set()
+        restored = set()
+        stale = set()
+
+        for event in events:
+            if event.action == "edit":
+                stale.add(event.title)
                 continue
+
+            if event.action == "restore":
+                if event.title not in positions:
+                    positions[event.title] = len(contents)
+                    contents.append(HashablePageRecord(
+                        imslp.interfaces.recent_changes.make_record(catalogue=name, title=event.title)))
+                    restored.add(event.title)
+                    inserted_count += 1
+                stale.add(event.title)
+                continue
+
+            position = positions.pop(event.title, None)
+            updated.discard(event.title)
+            if position is None:
+                continue
+
+            if event.action == "move" and event.target is not None and event.target not in positions:
+                positions[event.target] = position
+                contents[position] = HashablePageRecord(imslp.interfaces.recent_changes.make_record(
+                    catalogue=name, title=event.target, record=contents[position]))
+                updated.add(event.target)
+                stale.add(event.target)
+            else:
+                contents[position] = None
+                deleted_count += 1
+
+        contents = [record for record in contents if record is not None]
+        positions = {record["id"]: position for position, record in enumerate(contents)}
+
+        # (the records past the high-water mark were just fetched)
+        stale = stale.intersection(positions).difference(record["id"] for record in inserted)
+
+        if len(stale) > 0:
+            # the undeleted records, appended to the catalogue, are expected
+            # at the offset of their title, as the internal IMSLP API sorts
+            # the records by title
+            ids = [record["id"] for record in contents[:len(contents) - len(restored)]]
+            offsets = {
+                title: bisect.bisect_left(ids, title) if title in restored else positions[title]
+                for title in stale
+            }
+
+            for title, record in _refetch_records(imslp_url_pattern=imslp_url_pattern, offsets=offsets).items():
+                if record != contents[positions[title]]:
+                    contents[positions[title]] = record
+                    if title not in restored:
+                        updated.add(title)
+
+        updated_count = len(updated)
+
+        if inserted_count + updated_count + deleted_count == 0:
+            return
+
+        catalogue = contents
+        if isinstance(records, imslp.interfaces.compact.CompactCatalogue):
+            # the compact file is rebuilt, so that the catalogue stays
+            # memory-mapped rather than held in memory
+            path = imslp.interfaces.compact.get_compact_catalogue_path(name=name)
+            imslp.interfaces.compact.write_compact_catalogue(
+                path=path, records=contents, start=start + len(inserted))
+            catalogue = imslp.interfaces.compact.CompactCatalogue(path=path, record_factory=HashablePageRecord)
+
+        with self._condition:
+            if updated_count + deleted_count == 0 and isinstance(records, list):
+                # the search keys, indexes and lookup tables are extended
+                # when they are next used
+                records.extend(contents[len(records):])
+            elif updated_count + deleted_count == 0:
+                # (likewise, as the records only follow the former ones)
+                self._catalogues[name] = catalogue
+            else:
+                # the positions of the records changed, so the structures
+                # built over the catalogue are rebuilt when they are next used
+                with self._lock:
+                    self._catalogues[name] = catalogue
+                    for structures in (self._search_keys, self._indexes, self._lookup_tables):
+                        for key in [key for key in structures if key[0] == name]:
+                            del structures[key]
+
+            self._starts[name] = start + len(inserted)
+            self._changed()
+            self._condition.notify_all()
+
+        stats["inserted"] += inserted_count
+        stats["updated"] += updated_count
+        stats["deleted"] += deleted_count
+
+        if persist:
+            try:
+                imslp.interfaces.disk_cache.write_catalogue(
+                    name=name, records=contents, start=start + len(inserted), overwrite=True)
+            except OSError:
+                # the disk cache is only an optimization
+                pass
+
+
+# Memory cache of the catalogues used by the module-level functions, and by
+# default by `imslp.client.ImslpClient`
+_default_cache = CatalogueCache()
+
+
+def get_default_cache() -> CatalogueCache:
+    """
+    Returns the process-wide memory cache of the catalogues, used by the
+    module-level functions of this module.
+    """
+    return _default_cache
+
+
+# noinspection PyBroadException
+def _fetch_page(
+        imslp_url_pattern: str,
+        start: int,
+        delay: float = 0.0,
+) -> typing.Optional[typing.Tuple[list, bool]]:
+    """
+    Fetches the page of results of the internal IMSLP API that begins at
+    offset `start`, and returns the records of the page along with whether
+    more results are available; returns `None` if the request failed.
+    """
+
+    if delay > 0:
+        time.sleep(delay)
+
+    try:
+        # (the transport module is only imported on first access, as
+        # `requests` is slow to import and not needed to search a
+        # loaded catalogue)
+        req = imslp.interfaces.transport.get(imslp_url_pattern.format(start=start))
+        if not req.ok:
+            # the transport already retries transient failures
+            return None
+        with imslp.interfaces.instrumentation.span("api.decode"):
             obj = req.json()
-        except:
-            break
+    except Exception:
+        return None
+
+    return _parse_page(obj)
+
+
+def _parse_page(obj: dict) -> typing.Tuple[list, bool]:
+    """
+    Returns the records of a page of results of the internal IMSLP API,
+    along with whether more results are available.
+    """
+
+    more_results = False
+
+    if "metadata" in obj:
+        metadata = obj.get("metadata", dict())
+        more_results = metadata.get("moreresultsavailable", False)
+        del obj["metadata"]
+
+    return list(obj.values()), more_results
+
+
+def _iter_raw_pages(
+        imslp_url_pattern: str,
+        start: int = 0,
+        delay: float = 0.0,
+) -> typing.Iterator[list]:
+    """
+    Yields the successive pages of results of the internal IMSLP API,
+    beginning at offset `start`; only the page being yielded is held in
+    memory.
+    """
+
+    more_results = True
 
-        more_results = False
+    while more_results:
+        page = _fetch_page(imslp_url_pattern=imslp_url_pattern, start=start, delay=delay)
+        if page is None:
+            break
 
-        if "metadata" in obj:
-            metadata = obj.get("metadata", dict())
-            more_results = metadata.get("moreresultsavailable", False)
-            del obj["metadata"]
+        new_results, more_results = page
+        if len(new_results) == 0:
+            break
 
-        new_results = list(obj.values())
         start += len(new_results)
+        yield new_results
+
+
+def _raw_call(
+        imslp_url_pattern: str,
+        start: int = 0,
+        count: int = None,
+        concurrency: int = 1,
+        delay: float = 0.0,
+):
+    """
+    Returns the result of a request made to the internal IMSLP API
+    to retrieve a list of works or of people. This method is a helper
+    method called by `list_people()` and `list_works()`.
+
+    If `concurrency` is larger than 1, the first page is fetched alone to
+    learn the page size, and the following pages are then fetched by
+    windows of `concurrency` simultaneous requests; `delay` is the number
+    of seconds each request waits before being sent.
+    """
+
+    with imslp.interfaces.instrumentation.span(
+            "api.raw_call", url=imslp_url_pattern, start=start, concurrency=concurrency) as span:
+
+        if concurrency > 1:
+            results = _raw_call_concurrent(
+                imslp_url_pattern=imslp_url_pattern,
+                start=start,
+                count=count,
+                concurrency=concurrency,
+                delay=delay,
+            )
+        else:
+            results = _raw_call_serial(
+                imslp_url_pattern=imslp_url_pattern,
+                start=start,
+                count=count,
+                delay=delay,
+            )
+
+        span.set(records=len(results))
+
+    return results
+
+
+def _raw_call_serial(
+        imslp_url_pattern: str,
+        start: int,
+        count: typing.Optional[int],
+        delay: float,
+):
+    """
+    Serial version of `_raw_call()`, which fetches the pages one by one.
+    """
+
+    results = []
+
+    for new_results in _iter_raw_pages(imslp_url_pattern=imslp_url_pattern, start=start, delay=delay):
         results += new_results
 
         if count is not None and 0 <= count <= len(results):
@@ -91,67 +1046,486 @@ def _raw_call(imslp_url_pattern: str, start: int = 0, count: int = None):
     return results[:count]
 
 
+def _raw_call_concurrent(
+        imslp_url_pattern: str,
+        start: int,
+        count: typing.Optional[int],
+        concurrency: int,
+        delay: float,
+):
+    """
+    Concurrent version of `_raw_call()`, which prefetches pages by windows
+    of `concurrency` requests made through a bounded thread pool, and
+    reassembles the results in order.
+    """
+
+    page = _fetch_page(imslp_url_pattern=imslp_url_pattern, start=start, delay=delay)
+    if page is None:
+        return []
+
+    results, more_results = page
+    page_size = len(results)
+    start += page_size
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        while more_results and page_size > 0:
+            if count is not None and 0 <= count <= len(results):
+                break
+
+            window_starts = [start + i * page_size for i in range(concurrency)]
+            window_pages = executor.map(
+                lambda page_start: _fetch_page(
+                    imslp_url_pattern=imslp_url_pattern,
+                    start=page_start,
+                    delay=delay),
+                window_starts)
+
+            for page_start, page in zip(window_starts, window_pages):
+                if page is None:
+                    more_results = False
+                    break
+
+                new_results, more_results = page
+                results += new_results
+                start = page_start + len(new_results)
+
+                # a short page means the offsets of the rest of the
+                # window are off, so these pages are discarded
+                if not more_results or len(new_results) != page_size:
+                    break
+
+    return results[:count]
+
+
+def _refetch_records(
+        imslp_url_pattern: str,
+        offsets: typing.Dict[str, int],
+) -> typing.Dict[str, HashablePageRecord]:
+    """
+    Refetches the records with the given titles from the internal IMSLP API,
+    which cannot look records up by title: for each title, the page of
+    results that begins `IMSLP_REFETCH_MARGIN` records before its expected
+    offset is fetched (once for the titles it covers), so that the offsets
+    may drift as pages are created or deleted. Returns the records found,
+    keyed by title.
+    """
+
+    fetched = dict()
+    page_end = 0
+
+    # (as the offsets are visited in order, a title whose offset precedes
+    # the end of the last page fetched is covered by that page)
+    for title, offset in sorted(offsets.items(), key=lambda item: item[1]):
+        if title in fetched or offset < page_end:
+            continue
+
+        page_start = max(0, offset - IMSLP_REFETCH_MARGIN)
+        page = _fetch_page(imslp_url_pattern=imslp_url_pattern, start=page_start)
+        if page is None:
+            continue
+
+        new_results, _ = page
+        page_end = page_start + len(new_results)
+        fetched.update((record["id"], record) for record in _to_records(new_results))
+
+    return {title: fetched[title] for title in offsets if title in fetched}
+
+
 def list_people(
         start: int = 0,
         count: typing.Optional[int] = None,
-        cache: bool = True
+        cache: bool = True,
+        concurrency: int = 1,
+        delay: float = 0.0,
 ) -> typing.List[HashablePageRecord]:
     if cache:
-        if _cache_people is None:
-            load_cache()
-        return _cache_people[start:start+count if count is not None else None]
+        return _default_cache.get_records(catalogue="people", start=start, count=count)
 
     return list(map(HashablePageRecord, _raw_call(
         imslp_url_pattern=IMSLP_API_PEOPLE,
         start=start,
         count=count,
+        concurrency=concurrency,
+        delay=delay,
     )))
 
 
-def list_works(start: int = 0, count: int = None, cache: bool = True):
+def list_works(
+        start: int = 0,
+        count: int = None,
+        cache: bool = True,
+        concurrency: int = 1,
+        delay: float = 0.0,
+) -> typing.List[HashablePageRecord]:
     if cache:
-        if _cache_works is None:
-            load_cache()
-        return _cache_works[start:start+count if count is not None else None]
+        return _default_cache.get_records(catalogue="works", start=start, count=count)
 
     return list(map(HashablePageRecord, _raw_call(
         imslp_url_pattern=IMSLP_API_WORKS,
         start=start,
         count=count,
+        concurrency=concurrency,
+        delay=delay,
     )))
 
 
-def reset_cache(from_file: bool = True) -> typing.NoReturn:
+def _iter_records(
+        imslp_url_pattern: str,
+        start: int,
+        count: typing.Optional[int],
+        delay: float,
+) -> typing.Iterator[HashablePageRecord]:
+
+    if count is not None and count <= 0:
+        return
+
+    for new_results in _iter_raw_pages(imslp_url_pattern=imslp_url_pattern, start=start, delay=delay):
+        for result in new_results:
+            yield HashablePageRecord(result)
+
+            if count is not None:
+                count -= 1
+                if count == 0:
+                    return
+
+
+def iter_people(
+        start: int = 0,
+        count: typing.Optional[int] = None,
+        delay: float = 0.0,
+) -> typing.Iterator[HashablePageRecord]:
+    """
+    Iterates over the people of IMSLP, as they are fetched page by page
+    from the internal IMSLP API (bypassing the cache), so that records can
+    be processed as soon as their page arrives, with at most one page held
+    in memory.
+
+    To resume an interrupted iteration, call the function again with
+    `start` increased by the number of records already consumed.
+
+    :param start: The offset of the first record.
+    :param count: The maximum number of records, or `None` for all.
+    :param delay: The number of seconds to wait before each request.
+    :return: An iterator over the records.
+    """
+    return _iter_records(imslp_url_pattern=IMSLP_API_PEOPLE, start=start, count=count, delay=delay)
+
+
+def iter_works(
+        start: int = 0,
+        count: typing.Optional[int] = None,
+        delay: float = 0.0,
+) -> typing.Iterator[HashablePageRecord]:
+    """
+    Iterates over the works of IMSLP, as they are fetched page by page
+    from the internal IMSLP API (bypassing the cache), so that records can
+    be processed as soon as their page arrives, with at most one page held
+    in memory.
+
+    To resume an interrupted iteration, call the function again with
+    `start` increased by the number of records already consumed.
+
+    :param start: The offset of the first record.
+    :param count: The maximum number of records, or `None` for all.
+    :param delay: The number of seconds to wait before each request.
+    :return: An iterator over the records.
+    """
+    return _iter_records(imslp_url_pattern=IMSLP_API_WORKS, start=start, count=count, delay=delay)
+
+
+def get_record_field(record: HashablePageRecord, field: str) -> str:
+    """
+    Returns the value of a field of an IMSLP API record, where nested
+    fields are designated by a dotted path (such as `"intvals.worktitle"`).
+
+    :param record: The IMSLP API record.
+    :param field: The (possibly dotted) name of the field.
+    :return: The value of the field.
+    """
+    value = record
+    for key in field.split("."):
+        value = value[key]
+    return value
+
+
+def get_field_values(
+        records: typing.Sequence[HashablePageRecord],
+        field: str,
+) -> typing.Sequence[str]:
+    """
+    Returns the values of a field of a sequence of records, in order; for a
+    compact catalogue, the values are read from the column of the field
+    without materializing the records.
+
+    :param records: The records.
+    :param field: The (possibly dotted) name of the field.
+    :return: A sequence of the values of the field.
+    """
+
+    if isinstance(records, imslp.interfaces.compact.CompactCatalogue):
+        return records.column(field)
+
+    return [get_record_field(record, field) for record in records]
+
+
+def get_search_keys(catalogue: str, field: str) -> typing.List[str]:
+    """
+    Returns the normalized search keys of a field of the records of the
+    people or works catalogue (see `CatalogueCache.get_search_keys()`); the
+    keys are in the same order as the records in `list_people()` or
+    `list_works()`.
+
+    :param catalogue: Either `"people"` or `"works"`.
+    :param field: The (possibly dotted) name of the field.
+    :return: The list of search keys.
+    """
+    return _default_cache.get_search_keys(catalogue=catalogue, field=field)
+
+
+def get_search_index(catalogue: str, field: str) -> imslp.helpers.search_index.NgramIndex:
+    """
+    Returns the search index over a field of the records of the people or
+    works catalogue (see `CatalogueCache.get_search_index()`). The positions
+    in the index are the positions of the records in `list_people()` or
+    `list_works()`.
+
+    :param catalogue: Either `"people"` or `"works"`.
+    :param field: The (possibly dotted) name of the field to index.
+    :return: The search index.
+    """
+    return _default_cache.get_search_index(catalogue=catalogue, field=field)
+
+
+def get_lookup_table(
+        catalogue: str,
+        field: str,
+        unique: bool = False,
+) -> typing.Dict[str, typing.Union[int, typing.List[int]]]:
+    """
+    Returns a hash map from the exact values of a field of the records of
+    the people or works catalogue to the positions of these records in
+    `list_people()` or `list_works()` (see `CatalogueCache.get_lookup_table()`).
+
+    :param catalogue: Either `"people"` or `"works"`.
+    :param field: The (possibly dotted) name of the field.
+    :param unique: Whether the values of the field identify the records
+        (such as `"permlink"`), in which case each value is mapped to a
+        single position (the first one), rather than to a list.
+    :return: The hash map from values to positions.
+    """
+    return _default_cache.get_lookup_table(catalogue=catalogue, field=field, unique=unique)
+
+
+def reset_cache(from_file: bool = True, persist: bool = True, compact: bool = False) -> typing.NoReturn:
     """
 
     :param from_file:
+    :param persist:
+    :param compact:
     :return:
     """
 
-    global _cache_people, _cache_works
+    return _default_cache.reset(from_file=from_file, persist=persist, compact=compact)
 
-    _cache_people = None
-    _cache_works = None
 
-    return load_cache(from_file=from_file)
+def _get_bundled_catalogue_path(name: str) -> typing.Optional[str]:
+    """
+    Returns the path of the most recent catalogue snapshot bundled with the
+    package, or `None` if there is no such snapshot.
+    """
 
+    possible_files = sorted(
+        list(map(os.path.abspath,
+                 map(os.path.expanduser,
+                     glob.glob(os.path.join(
+                         imslp.__path__[0],
+                         "../cache/imslp-{}-cache-*.zip".format(name)))))),
+        reverse=True)
 
-# noinspection PyBroadException
-def load_cache(from_file: bool = True) -> typing.NoReturn:
+    if len(possible_files) == 0:
+        return None
+
+    return possible_files[0]
+
+
+def _read_bundled_catalogue(name: str) -> typing.Optional[typing.List[dict]]:
+    """
+    Returns the records of the most recent catalogue snapshot bundled with
+    the package, or `None` if there is no such snapshot.
+    """
+
+    path = _get_bundled_catalogue_path(name=name)
+    if path is None:
+        return None
+
+    zf = zipfile.ZipFile(path, mode="r")
+    return json.loads(zf.read(zf.namelist()[0]))
+
+
+def _get_bundled_catalogue_timestamp(name: str) -> typing.Optional[str]:
+    """
+    Returns the time (in the format of the MediaWiki API) at which the most
+    recent catalogue snapshot bundled with the package was built, from the
+    date in its name (such as `imslp-works-cache-2020-08-02.zip`), or `None`
+    if there is no such snapshot.
+    """
+
+    path = _get_bundled_catalogue_path(name=name)
+    if path is None:
+        return None
+
+    match = re.search(r"-(\d{4}-\d{2}-\d{2})\.zip$", path)
+    if match is None:
+        return None
+
+    return "{}T00:00:00Z".format(match.group(1))
+
+
+def _read_local_catalogue(
+        name: str,
+        from_file: bool,
+        compact: bool = False,
+) -> typing.Tuple[typing.Sequence[dict], int]:
+    """
+    Returns the most advanced of the compact file (if `compact` is `True`),
+    the user-level disk cache and the bundled snapshot of a catalogue, along
+    with its high-water mark; or an empty catalogue if `from_file` is
+    `False`.
+    """
+
+    contents = []
+    start = 0
+
+    if from_file:
+        if compact:
+            compact_catalogue = imslp.interfaces.compact.open_compact_catalogue(
+                name=name, record_factory=HashablePageRecord)
+            if compact_catalogue is not None:
+                contents, start = compact_catalogue, compact_catalogue.start
+
+        persisted_header = imslp.interfaces.disk_cache.read_catalogue_header(name=name)
+        if persisted_header is not None and persisted_header["start"] > start:
+            persisted = imslp.interfaces.disk_cache.read_catalogue(name=name)
+            if persisted is not None:
+                contents, start = persisted
+
+        bundled = _read_bundled_catalogue(name=name)
+        if bundled is not None and len(bundled) > start:
+            contents, start = bundled, len(bundled)
+
+    return contents, start
+
+
+def _complete_catalogue(
+        name: str,
+        contents: typing.Sequence[dict],
+        start: int,
+        remainder_contents: typing.List[dict],
+        persist: bool,
+        compact: bool = False,
+) -> typing.Sequence[HashablePageRecord]:
+    """
+    Appends the records fetched past the high-water mark of a catalogue,
+    persists the result if `persist` is `True`, and returns the catalogue
+    in its in-memory (or compact) representation.
+    """
+
+    if len(remainder_contents) > 0:
+        contents = list(contents) + remainder_contents
+        start += len(remainder_contents)
+
+        if persist:
+            try:
+                imslp.interfaces.disk_cache.write_catalogue(name=name, records=contents, start=start)
+            except OSError:
+                # the disk cache is only an optimization
+                pass
+
+    if compact:
+        if isinstance(contents, imslp.interfaces.compact.CompactCatalogue):
+            return contents
+
+        path = imslp.interfaces.compact.get_compact_catalogue_path(name=name)
+        imslp.interfaces.compact.write_compact_catalogue(path=path, records=contents, start=start)
+        return imslp.interfaces.compact.CompactCatalogue(path=path, record_factory=HashablePageRecord)
+
+    return list(map(HashablePageRecord, contents))
+
+
+def _load_catalogue(
+        name: str,
+        list_function: typing.Callable[..., typing.List[HashablePageRecord]],
+        from_file: bool,
+        persist: bool,
+        concurrency: int,
+        compact: bool = False,
+) -> typing.Tuple[typing.Sequence[HashablePageRecord], int]:
+    """
+    Loads a catalogue from the most advanced of the user-level disk cache
+    and the bundled snapshot, then fetches the records past its high-water
+    mark from IMSLP and, if `persist` is `True`, persists the result back
+    to the user-level disk cache; returns the catalogue along with its new
+    high-water mark.
+
+    If `compact` is `True`, the catalogue is returned as a memory-mapped
+    `imslp.interfaces.compact.CompactCatalogue`, which is (re)built in the
+    user-level disk cache if it is missing or out of date.
+    """
+
+    contents, start = _read_local_catalogue(name=name, from_file=from_file, compact=compact)
+
+    remainder_contents = list_function(start=start, cache=False, concurrency=concurrency)
+
+    catalogue = _complete_catalogue(
+        name=name,
+        contents=contents,
+        start=start,
+        remainder_contents=remainder_contents,
+        persist=persist,
+        compact=compact,
+    )
+
+    return catalogue, start + len(remainder_contents)
+
+
+def load_cache(
+        from_file: bool = True,
+        concurrency: int = 1,
+        persist: bool = True,
+        compact: bool = False,
+) -> typing.NoReturn:
     """
     Loads a copy of the IMSLP people and works to memory cache, so that
     subsequent queries will be faster; if `from_file` is `True`, this
     method will attempt to load a partial cache from the package's
-    internal files and only request newer entries from IMSLP. This
+    internal files, or from the user-level disk cache if it is more
+    recent, and only request newer entries from IMSLP. This
     considerably speeds up operations by about 4 minutes on a typical
     high-speed bandwidth.
 
+    If `persist` is `True`, the merged catalogues are written back to the
+    user-level disk cache (see `imslp.interfaces.disk_cache`), so that other
+    processes only need to request the entries added since.
+
+    If `compact` is `True`, the catalogues are stored in memory-mapped files
+    (see `imslp.interfaces.compact`) rather than as lists of records, so
+    that processes share their memory; `list_people()` and `list_works()`
+    then return lightweight views that only materialize the records that
+    are accessed.
+
+    The people and the works are loaded in parallel. If the catalogues are
+    already being loaded (by another thread, or in the background, see
+    `start_background_loading()`), this waits for the end of that loading
+    rather than starting another one.
+
     :param from_file: Determines whether to use package's internal cache
+    :param concurrency: Number of simultaneous requests made to IMSLP
+    :param persist: Determines whether to update the user-level disk cache
+    :param compact: Determines whether to use the compact representation
     :return:
     """
 
-    global _cache_people, _cache_works
-
     # this is slow when not using the disk cache (which makes the
     # package quite large unfortunately! but at least not routinely
     # downloading 60 MB)
@@ -160,55 +1534,257 @@ def load_cache(from_file: bool = True) -> typing.NoReturn:
     # - list_people: 164880 items, 200 seconds to load
     # - list_works: 30559 items, 35 seconds to load
 
-    if _cache_people is None:
-
-        if from_file:
-            # Try to load from file
-            possible_files = sorted(
-                list(map(os.path.abspath,
-                         map(os.path.expanduser,
-                             glob.glob(os.path.join(
-                                 imslp.__path__[0],
-                                 "../cache/imslp-people-cache-*.zip"))))),
-                reverse=True)
-
-            if len(possible_files) > 0:
-                zf = zipfile.ZipFile(possible_files[0], mode="r")
-                partial_contents = json.loads(zf.read(zf.namelist()[0]))
-                try:
-                    remainder_contents = list_people(start=len(partial_contents), cache=False)
-                    _cache_people = partial_contents + remainder_contents
-                except:
-                    _cache_people = None
-
-                _cache_people = list(map(HashablePageRecord, _cache_people))
-
-        if _cache_people is None:
-            _cache_people = list_people(cache=False)
-
-    if _cache_works is None:
-
-        if from_file:
-            # Try to load from file
-            possible_files = sorted(
-                list(map(os.path.abspath,
-                         map(os.path.expanduser,
-                             glob.glob(os.path.join(
-                                 imslp.__path__[0],
-                                 "../cache/imslp-works-cache-*.zip"))))),
-                reverse=True)
-
-            if len(possible_files) > 0:
-                zf = zipfile.ZipFile(possible_files[0], mode="r")
-                partial_contents = json.loads(zf.read(zf.namelist()[0]))
-                try:
-                    remainder_contents = list_works(start=len(partial_contents), cache=False)
-                    _cache_works = partial_contents + remainder_contents
-                except:
-                    _cache_works = None
-
-                _cache_works = list(map(HashablePageRecord, _cache_works))
-
-        if _cache_works is None:
-            _cache_works = list_works(cache=False)
+    _default_cache.load(from_file=from_file, concurrency=concurrency, persist=persist, compact=compact)
+
+
+def start_background_loading(
+        from_file: bool = True,
+        persist: bool = True,
+        delay: float = 0.0,
+) -> None:
+    """
+    Starts loading the IMSLP people and works to memory cache in a
+    background thread, and returns immediately. Unlike `load_cache()`, the
+    catalogues can be searched while they are being loaded: the local
+    snapshot of each catalogue (see `load_cache()`) is installed as soon as
+    it is decoded, and the records added on IMSLP since are then appended
+    page by page, as they arrive. The search keys, indexes and lookup tables
+    built over a catalogue are extended when they are next used.
+
+    `list_people()` and `list_works()` only wait for the local snapshots;
+    use `wait_for_cache()` to wait for the end of the loading, and
+    `is_cache_partial()` to check whether it is over.
+
+    Nothing is done if the catalogues are already loaded, or being loaded.
+    The compact representation is not supported, as the memory-mapped
+    files of `imslp.interfaces.compact` cannot be appended to.
+
+    :param from_file: Determines whether to use package's internal cache
+    :param persist: Determines whether to update the user-level disk cache
+    :param delay: Time (in seconds) to wait between two requests to IMSLP
+    """
+
+    _default_cache.start_background_loading(from_file=from_file, persist=persist, delay=delay)
+
+
+def is_cache_partial() -> bool:
+    """
+    Returns whether the memory cache only holds part of the catalogues,
+    that is, whether searches only cover the records loaded so far: while
+    they are being loaded by `start_background_loading()`, or if that
+    loading was interrupted.
+    """
+    return _default_cache.is_partial()
+
+
+def wait_for_cache(timeout: typing.Optional[float] = None) -> bool:
+    """
+    Waits until the end of the loading of the catalogues in progress, if
+    any (such as a loading in the background, see
+    `start_background_loading()`); catalogues that are not loaded at all
+    are loaded by `list_people()` and `list_works()` when they are first
+    used.
+
+    :param timeout: The maximum time to wait (in seconds), or `None` to
+        wait as long as necessary.
+    :return: Whether the loading is over.
+    :raises: The exception that interrupted the loading, if any (only
+        once, see `imslp.interfaces.internal.CatalogueCache.wait()`).
+    """
+    return _default_cache.wait(timeout=timeout)
+
+
+def _get_sync_baseline() -> typing.Optional[str]:
+    """
+    Returns the time from which to sync catalogues that were not synced
+    since they were loaded: the time up to which the persisted catalogues
+    were synced, or else the time at which the oldest of the bundled
+    snapshots (from which the catalogues derive) was built; or `None` if
+    neither is known. An earlier time is always safe, as changes that were
+    already applied have no effect.
+    """
+
+    timestamp = imslp.interfaces.disk_cache.read_sync_timestamp()
+    if timestamp is not None:
+        return timestamp
+
+    timestamps = list(filter(None, map(_get_bundled_catalogue_timestamp, ("people", "works"))))
+    if len(timestamps) == 0:
+        return None
+
+    return min(timestamps)
+
+
+def sync_cache(
+        site: typing.Optional["imslp.interfaces.mw_api.ImslpMwClient"] = None,
+        since: typing.Optional[str] = None,
+        persist: bool = True,
+) -> typing.Dict[str, int]:
+    """
+    Brings the memory cache of the IMSLP people and works up to date,
+    without fetching the catalogues again: the records added since they
+    were loaded are requested from the internal IMSLP API (as by
+    `load_cache()`), and the pages deleted, undeleted, renamed or edited
+    (including the changes of their categories) since the last sync are
+    read from the recent changes of the wiki (`list=recentchanges`), which
+    usually takes a few requests. Deleted pages are removed from the
+    catalogues, renamed pages are updated in place, and undeleted pages
+    are appended; the records of the renamed, undeleted and edited pages
+    are then refetched from the internal IMSLP API, by pages of results
+    (which keep only the fields that derive from their title if they are
+    not found near their expected offset).
+
+    The time up to which the catalogues are synced is kept in the memory
+    cache and, if `persist` is `True`, in the user-level disk cache along
+    with the updated catalogues, so that the next sync (possibly by
+    another process) only reads the changes made since. Catalogues that
+    were never synced are synced from the time at which the bundled
+    snapshots were built; without bundled snapshots, that time is not
+    known, so the catalogues are loaded again from IMSLP instead.
+
+    :param site: The MediaWiki client used to read the logs of the wiki,
+        by default a new `imslp.interfaces.mw_api.ImslpMwClient`.
+    :param since: The time (such as `"2020-08-02T00:00:00Z"`) of the
+        oldest changes to apply, by default the time of the last sync.
+    :param persist: Determines whether to update the user-level disk cache
+    :return: The numbers of records `"inserted"`, `"updated"` and `"deleted"`.
+    """
+    return _default_cache.sync(site=site, since=since, persist=persist)
+
+
+async def _fetch_page_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        imslp_url_pattern: str,
+        start: int,
+        delay: float = 0.0,
+) -> typing.Optional[typing.Tuple[list, bool]]:
+    """
+    Asynchronous version of `_fetch_page()`.
+    """
+
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    try:
+        req = await transport.get(imslp_url_pattern.format(start=start))
+        if not req.ok:
+            return None
+        obj = req.json()
+    except Exception:
+        return None
+
+    return _parse_page(obj)
+
+
+async def _raw_call_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        imslp_url_pattern: str,
+        start: int = 0,
+        concurrency: int = 8,
+        delay: float = 0.0,
+) -> list:
+    """
+    Asynchronous version of `_raw_call()`: the first page is fetched alone
+    to learn the page size, and the following pages are then fetched by
+    windows of `concurrency` simultaneous requests; `delay` is the number
+    of seconds each request waits before being sent.
+    """
+
+    page = await _fetch_page_async(
+        transport=transport, imslp_url_pattern=imslp_url_pattern, start=start, delay=delay)
+    if page is None:
+        return []
+
+    results, more_results = page
+    page_size = len(results)
+    start += page_size
+
+    while more_results and page_size > 0:
+        window_starts = [start + i * page_size for i in range(max(concurrency, 1))]
+        window_pages = await asyncio.gather(*[
+            _fetch_page_async(
+                transport=transport, imslp_url_pattern=imslp_url_pattern, start=page_start, delay=delay)
+            for page_start in window_starts
+        ])
+
+        for page_start, page in zip(window_starts, window_pages):
+            if page is None:
+                more_results = False
+                break
+
+            new_results, more_results = page
+            results += new_results
+            start = page_start + len(new_results)
+
+            # a short page means the offsets of the rest of the window
+            # are off, so these pages are discarded
+            if not more_results or len(new_results) != page_size:
+                break
+
+    return results
+
+
+async def _load_catalogue_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        name: str,
+        imslp_url_pattern: str,
+        from_file: bool,
+        persist: bool,
+        concurrency: int,
+        compact: bool = False,
+) -> typing.Tuple[typing.Sequence[HashablePageRecord], int]:
+    """
+    Asynchronous version of `_load_catalogue()`, in which the disk
+    operations are run in the default executor of the event loop.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    contents, start = await loop.run_in_executor(
+        None, functools.partial(_read_local_catalogue, name=name, from_file=from_file, compact=compact))
+
+    remainder_contents = await _raw_call_async(
+        transport=transport,
+        imslp_url_pattern=imslp_url_pattern,
+        start=start,
+        concurrency=concurrency)
+
+    catalogue = await loop.run_in_executor(
+        None, functools.partial(
+            _complete_catalogue,
+            name=name,
+            contents=contents,
+            start=start,
+            remainder_contents=remainder_contents,
+            persist=persist,
+            compact=compact))
+
+    return catalogue, start + len(remainder_contents)
+
+
+async def load_cache_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        from_file: bool = True,
+        concurrency: int = 8,
+        persist: bool = True,
+        compact: bool = False,
+) -> None:
+    """
+    Asynchronous version of `load_cache()`, which fetches the people and the
+    works concurrently through an `imslp.interfaces.async_transport.AsyncTransport`.
+    The catalogues are loaded into the same memory cache as `load_cache()`.
+
+    :param transport: The asynchronous transport.
+    :param from_file: Determines whether to use package's internal cache
+    :param concurrency: Number of simultaneous requests made to IMSLP per catalogue
+    :param persist: Determines whether to update the user-level disk cache
+    :param compact: Determines whether to use the compact representation
+    """
 
+    await _default_cache.load_async(
+        transport=transport,
+        from_file=from_file,
+        concurrency=concurrency,
+        persist=persist,
+        compact=compact,
+    )
@@ -1,6 +1,9 @@
 
 import mwclient
 
+import imslp.interfaces.constants
+import imslp.interfaces.transport
+
 
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 
@@ -20,10 +23,13 @@ class ImslpMwClient(mwclient.Site):
     _site = None
 
     def __init__(self, username=None, password=None):
+        # use a session of its own (for the cookies of the login), over the
+        # pooled, rate-limited connections of the package
         super().__init__(
             host=IMSLP_HOST,
             path=IMSLP_API_PATH,
             scheme=IMSLP_SCHEME,
+            pool=imslp.interfaces.transport.new_session(),
         )
 
         if username is not None and password is not None:
@@ -37,10 +43,7 @@ class ImslpMwClient(mwclient.Site):
         domain: str = None,
     ):
         # these cookies are necessary to allow for proper download of images/PDFs
-        combined_cookies = {
-            "imslp_wikiLanguageSelectorLanguage": "en",
-            "imslpdisclaimeraccepted": "yes",
-        }
+        combined_cookies = dict(imslp.interfaces.constants.IMSLP_DISCLAIMER_COOKIES)
 
         # include user provided cookies
         if cookies is not None:
@@ -0,0 +1,176 @@
+
+import re
+import time
+import typing
+
+import imslp.interfaces.instrumentation
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "LogEvent",
+    "format_timestamp",
+    "iter_log_events",
+    "make_record",
+]
+
+
+# Base URL of the permanent links of the records of the internal IMSLP API
+IMSLP_WIKI_URL = "http://imslp.org/wiki/"
+
+# Namespaces of the wiki pages of the catalogues: works are articles, and
+# people are categories
+IMSLP_NAMESPACE_CATALOGUES = {
+    0: "works",
+    14: "people",
+}
+
+# Pattern of the titles of work pages, such as "Symphony No.5 (Beethoven, Ludwig van)"
+IMSLP_WORK_TITLE_PATTERN = re.compile(r"^(?P<worktitle>.*) \((?P<composer>[^()]*)\)$")
+
+# Pattern of the summaries of the changes of the members of a category, such
+# as "[[Symphony No.5 (Beethoven, Ludwig van)]] added to category"
+IMSLP_CATEGORIZE_COMMENT_PATTERN = re.compile(
+    r"^\[\[:?(?P<title>[^\]|]+)(?:\|[^\]]*)?\]\] (?:added to|removed from) category")
+
+
+class LogEvent(typing.NamedTuple):
+    """
+    Change of a page of the people or works catalogue, as listed by the
+    recent changes of the wiki: a deletion (`"delete"`), an undeletion
+    (`"restore"`) or a renaming (`"move"`) of the page titled `title`, as
+    recorded in the logs of the wiki, or an edit (`"edit"`) of the page,
+    including the changes of its categories. For renamings, `target` is
+    the new title, or `None` if the page was moved out of the namespace of
+    the catalogue (which amounts to a deletion).
+    """
+    catalogue: str
+    action: str
+    title: str
+    timestamp: str
+    target: typing.Optional[str] = None
+
+
+def format_timestamp(seconds: typing.Optional[float] = None) -> str:
+    """
+    Returns a time (by default, the current time) in the ISO 8601 format
+    used by the MediaWiki API, such as `"2020-08-02T12:00:00Z"`.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+def _to_log_event(change: dict) -> typing.Optional[LogEvent]:
+    catalogue = IMSLP_NAMESPACE_CATALOGUES.get(change.get("ns"))
+    if catalogue is None:
+        return None
+
+    if change.get("type") == "edit":
+        return LogEvent(catalogue=catalogue, action="edit", title=change["title"], timestamp=change["timestamp"])
+
+    if change.get("type") == "categorize":
+        # the change is listed under the category, and the page added to
+        # or removed from the category is only named in the summary
+        match = IMSLP_CATEGORIZE_COMMENT_PATTERN.match(change.get("comment", ""))
+        if match is None:
+            return None
+        title = match.group("title")
+        return LogEvent(catalogue="people" if title.startswith("Category:") else "works", action="edit",
+                        title=title, timestamp=change["timestamp"])
+
+    log_type = change.get("logtype")
+    log_action = change.get("logaction")
+
+    if log_type == "delete" and log_action in ("delete", "restore"):
+        return LogEvent(catalogue=catalogue, action=log_action, title=change["title"],
+                        timestamp=change["timestamp"])
+
+    if log_type == "move" and log_action in ("move", "move_redir"):
+        # recent versions of MediaWiki report the target in "logparams",
+        # older ones in "move"
+        params = change.get("logparams")
+        if params is not None and "target_title" in params:
+            target, target_namespace = params["target_title"], params.get("target_ns")
+        else:
+            params = change.get("move", dict())
+            target, target_namespace = params.get("new_title"), params.get("new_ns")
+
+        if target_namespace != change["ns"]:
+            target = None
+
+        return LogEvent(catalogue=catalogue, action="move", title=change["title"],
+                        timestamp=change["timestamp"], target=target)
+
+    return None
+
+
+def iter_log_events(
+        site: "imslp.interfaces.mw_api.ImslpMwClient",
+        since: typing.Optional[str] = None,
+) -> typing.Iterator[LogEvent]:
+    """
+    Yields the deletions, undeletions, renamings and edits (including the
+    changes of categories) of the pages of the people and works catalogues
+    since a given time, oldest first, as listed by the recent changes of
+    the wiki (`list=recentchanges`); each request returns up to 500
+    changes, so that following the changes of a few hours only takes a
+    few requests.
+
+    :param site: The MediaWiki client used to query the wiki.
+    :param since: The time (see `format_timestamp()`) of the oldest
+        changes, or `None` for all the changes the wiki still lists.
+    :return: An iterator over the changes.
+    """
+
+    params = {
+        "list": "recentchanges",
+        "rctype": "log|edit|categorize",
+        "rcnamespace": "|".join(map(str, IMSLP_NAMESPACE_CATALOGUES)),
+        "rcprop": "title|timestamp|loginfo|comment",
+        "rcdir": "newer",
+        "rclimit": "max",
+    }
+    if since is not None:
+        params["rcstart"] = since
+
+    while True:
+        with imslp.interfaces.instrumentation.span("api.recent_changes", since=since):
+            response = site.get("query", **params)
+
+        for change in response.get("query", dict()).get("recentchanges", []):
+            event = _to_log_event(change)
+            if event is not None:
+                yield event
+
+        if "continue" not in response:
+            break
+        params.update(response["continue"])
+
+
+def make_record(catalogue: str, title: str, record: typing.Optional[dict] = None) -> dict:
+    """
+    Returns a record of the people or works catalogue for the page titled
+    `title`, with the fields that derive from the title (the identifier,
+    the permanent link and, for works, the title of the work, its composer
+    and its parent category) and the other fields of `record`, if given.
+
+    :param catalogue: Either `"people"` or `"works"`.
+    :param title: The title of the page.
+    :param record: The record of the page before it was renamed, if any.
+    :return: The record.
+    """
+
+    new_record = dict(record or {"type": "1" if catalogue == "people" else "2", "parent": "", "intvals": {}})
+    new_record["id"] = title
+    new_record["permlink"] = IMSLP_WIKI_URL + title.replace(" ", "_")
+
+    if catalogue == "works":
+        match = IMSLP_WORK_TITLE_PATTERN.match(title)
+        if match is not None:
+            new_record["parent"] = "Category:{}".format(match.group("composer"))
+            new_record["intvals"] = dict(
+                new_record.get("intvals") or {},
+                worktitle=match.group("worktitle"),
+                composer=match.group("composer"))
+
+    return new_record
@@ -1,31 +1,72 @@
 
+import asyncio
+import concurrent.futures
+import functools
+import html
 import json
 import re
 import typing
 import urllib.parse
 
 import bs4
+import mwclient
+import mwclient.image
 import mwclient.page
-import requests
+
+import imslp.interfaces.constants
+import imslp.interfaces.http_cache
+import imslp.interfaces.instrumentation
+import imslp.interfaces.transport
 
 
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 
 __all__ = [
     "fetch_category_table",
+    "fetch_category_table_async",
+    "fetch_category_tables",
+    "fetch_category_tables_async",
     "fetch_images_metadata",
+    "fetch_images_metadata_async",
+    "fetch_images_metadata_batch",
+    "fetch_images_metadata_batch_async",
+    "iter_category_table",
 ]
 
 
 # Pattern of the URL base
 IMSLP_BASE_URL = "https://imslp.org{}"
 
+# Pattern of the URL of a wiki page
+IMSLP_WIKI_URL = IMSLP_BASE_URL.format("/wiki/{}")
+
+# URL of the MediaWiki API (for the asynchronous functions, which do not
+# go through `mwclient`)
+IMSLP_API_URL = IMSLP_BASE_URL.format("/api.php")
+
+# Maximum number of titles per MediaWiki API query
+IMSLP_API_BATCH_SIZE = 50
+
+# Image information requested from the MediaWiki API (as by `mwclient`)
+IMSLP_API_IMAGEINFO_PROPERTIES = "timestamp|user|comment|url|size|sha1|metadata|archivename"
+
+# Default maximum number of simultaneous scraping requests
+IMSLP_SCRAPE_MAX_WORKERS = 8
+
 # Regular expression to extract the ratings
 IMSLP_REGEXP_RATINGS = re.compile(r"IMSLPRatings=({[^}]+})")
+IMSLP_REGEXP_RATINGS_BYTES = re.compile(IMSLP_REGEXP_RATINGS.pattern.encode("ascii"))
 
 # Regular expression to extract the page count
 IMSLP_REGEXP_PAGE_COUNT = re.compile(r"(\d+)\s*pp*\.*")
 
+# Name of the BeautifulSoup parser to use (by default, `lxml` if it is
+# installed and `html.parser` otherwise)
+IMSLP_HTML_PARSER = None             # type: typing.Optional[str]
+
+# Internal variable to cache the name of the default parser
+_default_html_parser = None          # type: typing.Optional[str]
+
 # Pattern of URL to fetch category charts
 IMSLP_SCRAPE_CATCHART_URL = IMSLP_BASE_URL.format("/index.php?title={}&customcat=ccperson1")
 
@@ -34,6 +75,13 @@ IMSLP_SCRAPE_CATCHART_TABLE_CLASS = "wikitable"
 IMSLP_SCRAPE_CATCHART_NEXT_CLASS = "categorypaginglink"
 IMSLP_SCRAPE_CATCHART_NEXT_TEXT = "next 200"
 
+# Regular expressions to locate the link to the next page of a category
+# chart in the raw HTML, and to extract the attributes of a tag
+IMSLP_REGEXP_CATCHART_NEXT_BYTES = re.compile(
+    r"<a\s([^>]*)>\s*{}\s*</a>".format(re.escape(IMSLP_SCRAPE_CATCHART_NEXT_TEXT)).encode("ascii"),
+    flags=re.IGNORECASE)
+IMSLP_REGEXP_HTML_ATTRIBUTE_BYTES = re.compile(rb"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
 
 def _extract_tag_text(tag: bs4.element.Tag) -> str:
     """
@@ -49,33 +97,59 @@ def _extract_tag_text(tag: bs4.element.Tag) -> str:
     return tag.text.replace("\xa0", " ").strip()
 
 
-def fetch_category_table(category_name: str, subcategory: typing.Optional[str] = None):
+def _get_category_full_name(category_name: str, subcategory: typing.Optional[str] = None) -> str:
     """
-    Fetches the chart containing an index to a category's works.
-
-    :param category_name:
-    :param subcategory:
-    :return:
+    Returns the full name of a category page, such as
+    `"Category:Scarlatti, Domenico/Collections"`.
     """
-
-    # Compute the category name
     catname_full = "Category:{}".format(category_name)
     if subcategory is not None:
         catname_full += "/"
         catname_full += subcategory
-    catname_urlenc = urllib.parse.quote(catname_full, safe='/:')
+    return catname_full
 
-    # Accumulator variables
-    header = None
-    rows_parsed = []
 
-    next_page_link = IMSLP_SCRAPE_CATCHART_URL.format(catname_urlenc)
+def _peek_category_next_page_link(content: bytes, catname_full: str) -> typing.Optional[str]:
+    """
+    Finds the link to the next page of a category chart in the raw HTML of
+    a page, without parsing the page, so that the next page can be
+    requested while the current page is being parsed.
+
+    :param content: The raw HTML of a page of the category chart.
+    :param catname_full: The full name of the category page.
+    :return: The URL of the next page, or `None` if it was not found.
+    """
+
+    for m in IMSLP_REGEXP_CATCHART_NEXT_BYTES.finditer(content):
+        attrs = {
+            key.decode("ascii").lower(): html.unescape((value or other_value).decode("utf-8", errors="replace"))
+            for key, value, other_value in IMSLP_REGEXP_HTML_ATTRIBUTE_BYTES.findall(m.group(1))
+        }
+        if (IMSLP_SCRAPE_CATCHART_NEXT_CLASS in attrs.get("class", "").split() and
+                attrs.get("title") == catname_full and
+                "href" in attrs):
+            return IMSLP_BASE_URL.format(attrs["href"])
+
+    return None
 
-    while next_page_link is not None:
 
-        # Fetch the data chunk
-        r = requests.get(next_page_link)
-        s = bs4.BeautifulSoup(r.content)
+def _parse_category_page(
+        content: bytes,
+        catname_full: str,
+        parser: typing.Optional[str] = None,
+) -> typing.Tuple[typing.List[str], typing.List[typing.List[str]], typing.Optional[str]]:
+    """
+    Parses a page of the chart of a category.
+
+    :param content: The raw HTML of the page.
+    :param catname_full: The full name of the category page.
+    :param parser: The name of the BeautifulSoup parser (see `_get_html_parser()`).
+    :return: A tuple containing the header of the chart, its rows, and the
+        URL of the next page (or `None` if this is the last page).
+    """
+
+    with imslp.interfaces.instrumentation.span("scraping.parse_category_page", bytes=len(content)) as span:
+        s = bs4.BeautifulSoup(content, features=_get_html_parser(parser))
         ts = s.find_all(name="table", attrs={"class": IMSLP_SCRAPE_CATCHART_TABLE_CLASS})
         t = ts[0]
 
@@ -86,52 +160,327 @@ def fetch_category_table(category_name: str, subcategory: typing.Optional[str] =
             attrs={
                 "title": catname_full,
                 "class": IMSLP_SCRAPE_CATCHART_NEXT_CLASS},
-            text=IMSLP_SCRAPE_CATCHART_NEXT_TEXT,
+            string=IMSLP_SCRAPE_CATCHART_NEXT_TEXT,
         )
         if next_page_link_candidates is not None and len(next_page_link_candidates) > 0:
             next_page_link = IMSLP_BASE_URL.format(next_page_link_candidates[0]["href"])
 
         # Parse the data
-        if header is None:
-            # parse new header
-            header = list(map(lambda tag: tag.text.strip(), t.find_all("th")))
-        else:
-            # confirm header is the same
-            assert header == list(map(lambda tag: tag.text.strip(), t.find_all("th")))
+        header = list(map(lambda tag: tag.text.strip(), t.find_all("th")))
+        rows = [list(map(_extract_tag_text, row.find_all("td"))) for row in t.find_all("tr")[1:]]
 
-        rows = t.find_all("tr")[1:]
+        span.set(rows=len(rows))
 
-        # Add to already parsed rows
-        rows_parsed += [list(map(_extract_tag_text, row.find_all("td"))) for row in rows]
+    return header, rows, next_page_link
 
-    # Turn into dicts
-    rows_as_dicts = list(map(lambda parsed_row: dict(zip(header, parsed_row)), rows_parsed))
 
-    return rows_as_dicts
+def iter_category_table(
+        category_name: str,
+        subcategory: typing.Optional[str] = None,
+        pipelined: bool = True,
+        parser: typing.Optional[str] = None,
+) -> typing.Iterator[dict]:
+    """
+    Iterates over the rows of the chart containing an index to a category's
+    works, as they are fetched page by page.
 
-def fetch_images_metadata(page: mwclient.page.Page) -> list:
+    If `pipelined` is `True`, the link to the next page is located in the
+    raw HTML of each page as soon as it arrives, and the next page is
+    requested in the background while the current page is being parsed.
+
+    :param category_name:
+    :param subcategory:
+    :param pipelined:
+    :param parser:
+    :return:
     """
-    Fetches the metadata associated with the images of an IMSLP page, as
-    specified by a `mwclient.page.Page` object. This contains the download
-    counter which is not available through the MediaWiki API and requires
-    scraping to obtain.
 
-    :param page:
+    # Compute the category name
+    catname_full = _get_category_full_name(category_name, subcategory)
+    catname_urlenc = urllib.parse.quote(catname_full, safe='/:')
+
+    header = None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+
+        page_link = IMSLP_SCRAPE_CATCHART_URL.format(catname_urlenc)
+        page_future = executor.submit(imslp.interfaces.http_cache.cached_get, page_link)
+
+        while page_future is not None:
+
+            # Fetch the data chunk
+            r = page_future.result()
+            page_future = None
+
+            # Start fetching the next chunk if its link can be found cheaply
+            peeked_page_link = None
+            if pipelined:
+                peeked_page_link = _peek_category_next_page_link(r.content, catname_full)
+                if peeked_page_link is not None:
+                    page_future = executor.submit(imslp.interfaces.http_cache.cached_get, peeked_page_link)
+
+            page_header, rows, next_page_link = _parse_category_page(
+                content=r.content,
+                catname_full=catname_full,
+                parser=parser,
+            )
+
+            # Only trust the prefetched page if its link is the one found
+            # by the parser
+            if next_page_link != peeked_page_link:
+                if page_future is not None:
+                    page_future.cancel()
+                page_future = None
+                if next_page_link is not None:
+                    page_future = executor.submit(imslp.interfaces.http_cache.cached_get, next_page_link)
+
+            if header is None:
+                # parse new header
+                header = page_header
+            else:
+                # confirm header is the same
+                assert header == page_header
+
+            # Turn into dicts
+            for parsed_row in rows:
+                yield dict(zip(header, parsed_row))
+
+
+def fetch_category_table(
+        category_name: str,
+        subcategory: typing.Optional[str] = None,
+        pipelined: bool = True,
+        parser: typing.Optional[str] = None,
+):
+    """
+    Fetches the chart containing an index to a category's works.
+
+    :param category_name:
+    :param subcategory:
+    :param pipelined:
+    :param parser:
     :return:
     """
 
-    if page is None:
-        return list()
+    with imslp.interfaces.instrumentation.span(
+            "scraping.fetch_category_table", category=category_name, subcategory=subcategory) as span:
+
+        rows = list(iter_category_table(
+            category_name=category_name,
+            subcategory=subcategory,
+            pipelined=pipelined,
+            parser=parser,
+        ))
+
+        span.set(rows=len(rows))
+
+    return rows
+
+
+def fetch_category_tables(
+        category_name: str,
+        subcategories: typing.Optional[typing.Iterable[str]] = None,
+        max_workers: int = IMSLP_SCRAPE_MAX_WORKERS,
+        pipelined: bool = True,
+        parser: typing.Optional[str] = None,
+) -> typing.Dict[str, typing.List[dict]]:
+    """
+    Fetches the charts of several subcategories of a category concurrently,
+    by default the standard subcategories of a person (see
+    `imslp.interfaces.constants.IMSLP_SUBCATEGORIES`); subcategories that
+    have no chart are mapped to an empty list.
+
+    :param category_name: The name of the category, such as a person.
+    :param subcategories: The names of the subcategories.
+    :param max_workers: The maximum number of charts fetched simultaneously.
+    :param pipelined: Whether to pipeline the pages of each chart.
+    :param parser: The name of the BeautifulSoup parser.
+    :return: A dictionary mapping each subcategory to the rows of its chart.
+    """
+
+    if subcategories is None:
+        subcategories = imslp.interfaces.constants.IMSLP_SUBCATEGORIES
+    subcategories = list(subcategories)
+
+    def fetch_one(subcategory: str) -> typing.List[dict]:
+        try:
+            return fetch_category_table(
+                category_name=category_name,
+                subcategory=subcategory,
+                pipelined=pipelined,
+                parser=parser,
+            )
+        except IndexError:
+            # the page does not contain any chart
+            return list()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(subcategories, executor.map(fetch_one, subcategories)))
+
+
+def _fetch_page_html(title: str) -> typing.Optional[bytes]:
+    """
+    Fetches the rendered HTML of an IMSLP wiki page.
+
+    :param title: The title of the page.
+    :return: The HTML contents of the page, or `None` if the request failed.
+    """
 
-    esc_title = urllib.parse.quote(page.base_title.replace(" ", "_"))
+    esc_title = urllib.parse.quote(title.replace(" ", "_"))
 
-    u = "https://imslp.org/wiki/{}".format(esc_title)
+    u = IMSLP_WIKI_URL.format(esc_title)
 
-    r = requests.get(u)
+    r = imslp.interfaces.http_cache.cached_get(u)
     if not r.ok:
-        return list()
+        return None
+
+    return r.content
+
+
+def _get_html_parser(parser: typing.Optional[str] = None) -> str:
+    """
+    Returns the name of the BeautifulSoup parser to use: `parser` if it is
+    specified, and otherwise `IMSLP_HTML_PARSER` if it is set, and
+    otherwise the (faster) `lxml` parser if it is installed, and otherwise
+    the standard library's `html.parser`.
+
+    :param parser: The name of a BeautifulSoup parser, or `None`.
+    :return: The name of the BeautifulSoup parser to use.
+    """
+
+    global _default_html_parser
+
+    if parser is not None:
+        return parser
+
+    if IMSLP_HTML_PARSER is not None:
+        return IMSLP_HTML_PARSER
+
+    if _default_html_parser is None:
+        try:
+            import lxml
+            _default_html_parser = "lxml"
+        except ImportError:
+            _default_html_parser = "html.parser"
+
+    return _default_html_parser
+
+
+def _parse_ratings(ratings_dict_str: typing.Union[str, bytes]) -> typing.Dict[int, dict]:
+    """
+    Parses the ratings dictionary embedded in the JavaScript of a page.
+    """
+
+    ratings_dict = dict()
 
-    s = bs4.BeautifulSoup(r.content, features="html.parser")
+    for key, value in json.loads(ratings_dict_str).items():
+        try:
+            ratings_dict[int(key)] = {
+                "rating": value[0],
+                "count": int(value[1]),
+            }
+        except ValueError:
+            continue
+
+    return ratings_dict
+
+
+def _make_image_metadata(
+        f: mwclient.image.Image,
+        t: bs4.element.Tag,
+        find_counter: typing.Callable[[int], typing.Optional[bs4.element.Tag]],
+        ratings_dict: typing.Dict[int, dict],
+) -> typing.Optional[dict]:
+    """
+    Builds the metadata of an image, given the tag of the link to its file
+    page, and a function to find the tag of its download counter.
+    """
+
+    if t.text.strip() == "":
+        return None
+
+    page_count = None
+    m = IMSLP_REGEXP_PAGE_COUNT.search(t.parent.text)
+    if m is not None:
+        try:
+            page_count = int(m.group(1))
+        except ValueError:
+            pass
+
+    file_id = int(t.text.replace("#", ""))
+
+    t = find_counter(file_id)
+    if t is None:
+        return None
+
+    file_counter = int(t.text)
+
+    # Fix image URL
+    if f.imageinfo["url"][0] == "/":
+        # URL is //imslp.org/stuff...
+        f.imageinfo["url"] = "http:" + f.imageinfo["url"]
+
+    return {
+        "id": file_id,
+        "rating": ratings_dict.get(file_id, dict()).get("rating", -1),
+        "rating_count": ratings_dict.get(file_id, dict()).get("count", 0),
+        "download_count": file_counter,
+        "title": f.base_title,
+        "url": f.imageinfo["url"],
+        "page_count": page_count,
+        "size": f.imageinfo.get("size"),
+        "sha1": f.imageinfo.get("sha1"),
+        "obj": f,
+    }
+
+
+def _parse_images_metadata(
+        content: bytes,
+        files: typing.Iterable[mwclient.image.Image],
+        single_pass: bool = True,
+        parser: typing.Optional[str] = None,
+) -> list:
+    """
+    Extracts the metadata associated with the images of an IMSLP page from
+    the rendered HTML of the page, for each of the image objects.
+
+    In single-pass mode (the default), the ratings are extracted from the
+    raw HTML, and the links of the page are indexed by `href` and `title`
+    in a single traversal of the tree, so the cost no longer grows with
+    the product of the number of files and the size of the page; otherwise
+    the tree is searched anew for each file.
+
+    :param content: The rendered HTML of the page.
+    :param files: The image objects of the files of the page.
+    :param single_pass: Whether to index the tags in a single traversal.
+    :param parser: The name of the BeautifulSoup parser (see `_get_html_parser()`).
+    :return: The list of metadata of the images found in the page.
+    """
+
+    with imslp.interfaces.instrumentation.span(
+            "scraping.parse_images_metadata", bytes=len(content), single_pass=single_pass) as span:
+
+        if single_pass:
+            images = _parse_images_metadata_single_pass(content=content, files=files, parser=parser)
+        else:
+            images = _parse_images_metadata_multi_pass(content=content, files=files, parser=parser)
+
+        span.set(images=len(images))
+
+    return images
+
+
+def _parse_images_metadata_multi_pass(
+        content: bytes,
+        files: typing.Iterable[mwclient.image.Image],
+        parser: typing.Optional[str] = None,
+) -> list:
+    """
+    Version of `_parse_images_metadata()` that searches the tree anew for
+    each file.
+    """
+
+    s = bs4.BeautifulSoup(content, features=_get_html_parser(parser))
 
     images = []
 
@@ -140,19 +489,9 @@ def fetch_images_metadata(page: mwclient.page.Page) -> list:
     ratings_dict = dict()
     m = IMSLP_REGEXP_RATINGS.search(s.__str__())
     if m is not None:
-        ratings_dict_str = m.group(1)
-        ratings_dict_old = json.loads(ratings_dict_str)
-
-        for key, value in ratings_dict_old.items():
-            try:
-                ratings_dict[int(key)] = {
-                    "rating": value[0],
-                    "count": int(value[1]),
-                }
-            except ValueError:
-                continue
+        ratings_dict = _parse_ratings(m.group(1))
 
-    for f in page.images():
+    for f in files:
 
         f_title = f.base_title
         f_esc_title = urllib.parse.quote(f_title.replace(" ", "_"))
@@ -164,42 +503,493 @@ def fetch_images_metadata(page: mwclient.page.Page) -> list:
         if t1 is None and t2 is None:
             continue
 
-        t = t1 or t2
-        if t.text.strip() == "":
-            continue
+        image = _make_image_metadata(
+            f=f,
+            t=t1 or t2,
+            find_counter=lambda file_id: s.find(
+                attrs={"href": "/wiki/Special:GetFCtrStats/@{}".format(file_id)}),
+            ratings_dict=ratings_dict,
+        )
+        if image is not None:
+            images.append(image)
+
+    return images
+
 
-        page_count = None
-        m = IMSLP_REGEXP_PAGE_COUNT.search(t.parent.text)
-        if m is not None:
-            try:
-                page_count = int(m.group(1))
-            except ValueError:
-                pass
+def _parse_images_metadata_single_pass(
+        content: bytes,
+        files: typing.Iterable[mwclient.image.Image],
+        parser: typing.Optional[str] = None,
+) -> list:
+    """
+    Single-pass version of `_parse_images_metadata()`.
+    """
+
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    # obtain ratings dictionary from embedded JavaScript, directly from
+    # the raw HTML rather than from a re-serialization of the tree
+    ratings_dict = dict()
+    m = IMSLP_REGEXP_RATINGS_BYTES.search(content)
+    if m is not None:
+        ratings_dict = _parse_ratings(m.group(1))
+
+    s = bs4.BeautifulSoup(content, features=_get_html_parser(parser))
+
+    # index the first tag with each `href` and each `title` attribute,
+    # in document order (like `s.find()` would)
+    tags_by_href = dict()
+    tags_by_title = dict()
+    for tag in s.find_all(True):
+        href = tag.get("href")
+        if href is not None:
+            tags_by_href.setdefault(href, tag)
+        title = tag.get("title")
+        if title is not None:
+            tags_by_title.setdefault(title, tag)
+
+    images = []
+
+    for f in files:
 
-        file_id = int(t.text.replace("#", ""))
+        f_title = f.base_title
+        f_esc_title = urllib.parse.quote(f_title.replace(" ", "_"))
 
-        t = s.find(attrs={"href": "/wiki/Special:GetFCtrStats/@{}".format(file_id)})
+        t = (tags_by_href.get("/wiki/File:{}".format(f_esc_title)) or
+             tags_by_title.get("File:{}".format(f_title)))
         if t is None:
             continue
 
-        file_counter = int(t.text)
-
-        # Fix image URL
-        if f.imageinfo["url"][0] == "/":
-            # URL is //imslp.org/stuff...
-            f.imageinfo["url"] = "http:" + f.imageinfo["url"]
-
-        images.append({
-            "id": file_id,
-            "rating": ratings_dict.get(file_id, dict()).get("rating", -1),
-            "rating_count": ratings_dict.get(file_id, dict()).get("count", 0),
-            "download_count": file_counter,
-            "title": f_title,
-            "url": f.imageinfo["url"],
-            "page_count": page_count,
-            "size": f.imageinfo.get("size"),
-            "sha1": f.imageinfo.get("sha1"),
-            "obj": f,
-        })
+        image = _make_image_metadata(
+            f=f,
+            t=t,
+            find_counter=lambda file_id: tags_by_href.get(
+                "/wiki/Special:GetFCtrStats/@{}".format(file_id)),
+            ratings_dict=ratings_dict,
+        )
+        if image is not None:
+            images.append(image)
+
+    return images
+
+
+def fetch_images_metadata(page: mwclient.page.Page) -> list:
+    """
+    Fetches the metadata associated with the images of an IMSLP page, as
+    specified by a `mwclient.page.Page` object. This contains the download
+    counter which is not available through the MediaWiki API and requires
+    scraping to obtain.
+
+    :param page:
+    :return:
+    """
+
+    if page is None:
+        return list()
+
+    with imslp.interfaces.instrumentation.span("scraping.fetch_images_metadata", page=page.name) as span:
+
+        content = _fetch_page_html(page.base_title)
+        if content is None:
+            return list()
+
+        images = _parse_images_metadata(content=content, files=page.images())
+
+        span.set(images=len(images))
 
     return images
+
+
+def _query_pages(
+        site: mwclient.Site,
+        titles: typing.List[str],
+        **kwargs
+) -> typing.Dict[str, dict]:
+    """
+    Queries the MediaWiki API for the properties of many pages, by batches
+    of `IMSLP_API_BATCH_SIZE` titles, following continuations and merging
+    their list-valued properties.
+
+    :param site: The MediaWiki site.
+    :param titles: The titles of the pages.
+    :param kwargs: The parameters of the `query` action.
+    :return: A dictionary mapping each title, as given, to the information
+        about the page returned by the API.
+    """
+
+    pages_info = dict()
+
+    for i in range(0, len(titles), IMSLP_API_BATCH_SIZE):
+        batch = titles[i:i + IMSLP_API_BATCH_SIZE]
+
+        # map titles as normalized by MediaWiki back to the given titles
+        given_titles = {title: {title} for title in batch}
+
+        batch_info = dict()
+        continuation = dict()
+
+        while True:
+            response = site.get("query", titles="|".join(batch), **kwargs, **continuation)
+            _merge_query_response(response=response, batch_info=batch_info, given_titles=given_titles)
+
+            if "continue" not in response:
+                break
+            continuation = response["continue"]
+
+        for title, page_info in batch_info.items():
+            for given_title in given_titles.get(title, {title}):
+                pages_info[given_title] = page_info
+
+    return pages_info
+
+
+def _merge_query_response(
+        response: dict,
+        batch_info: typing.Dict[str, dict],
+        given_titles: typing.Dict[str, typing.Set[str]],
+) -> None:
+    """
+    Merges a response of the `query` action of the MediaWiki API (which may
+    be one of several continuations) into the information about the pages
+    of a batch, and records the normalizations of the titles.
+    """
+
+    query = response.get("query", dict())
+
+    for normalization in query.get("normalized", []):
+        given_titles.setdefault(normalization["to"], set()).add(normalization["from"])
+
+    for page_info in query.get("pages", dict()).values():
+        title = page_info.get("title")
+        if title not in batch_info:
+            batch_info[title] = page_info
+            continue
+        for key, value in page_info.items():
+            if isinstance(value, list):
+                batch_info[title].setdefault(key, []).extend(value)
+
+
+def _make_page_files(
+        site: typing.Optional[mwclient.Site],
+        page_info: typing.Optional[dict],
+        files_info: typing.Dict[str, dict],
+) -> typing.Optional[typing.Tuple[mwclient.page.Page, typing.List[mwclient.image.Image]]]:
+    """
+    Builds the page object of a page, and the image objects of its files,
+    from the information returned by the MediaWiki API (without making any
+    request); returns `None` if the page does not exist.
+    """
+
+    if page_info is None or "missing" in page_info or "invalid" in page_info:
+        return None
+
+    page = mwclient.page.Page(site, page_info["title"], info=page_info)
+    files = [
+        mwclient.image.Image(site, image["title"], info=files_info[image["title"]])
+        for image in page_info.get("images", [])
+        if image["title"] in files_info
+    ]
+
+    return page, files
+
+
+def fetch_images_metadata_batch(
+        pages: typing.Sequence[typing.Union[mwclient.page.Page, str]],
+        site: typing.Optional[mwclient.Site] = None,
+        max_workers: int = IMSLP_SCRAPE_MAX_WORKERS,
+) -> typing.List[list]:
+    """
+    Fetches the metadata associated with the images of many IMSLP pages, as
+    returned by `fetch_images_metadata()` for each page. The lists of files
+    of the pages and their image information are obtained through batched
+    MediaWiki API queries (of up to `IMSLP_API_BATCH_SIZE` titles each),
+    and the HTML pages are fetched concurrently by at most `max_workers`
+    threads.
+
+    :param pages: The pages, as `mwclient.page.Page` objects or titles.
+    :param site: The MediaWiki site, required if `pages` contains titles
+        (by default, the site of the first `mwclient.page.Page`).
+    :param max_workers: The maximum number of simultaneous HTML requests.
+    :return: The list of metadata of the images of each page, in order.
+    """
+
+    if site is None:
+        site = next(
+            (page.site for page in pages if isinstance(page, mwclient.page.Page)),
+            None)
+        if site is None and len(pages) > 0:
+            raise ValueError("a site is required to fetch pages given by their titles")
+
+    titles = [page.name if isinstance(page, mwclient.page.Page) else page for page in pages]
+    unique_titles = list(dict.fromkeys(titles))
+
+    # list the files of every page
+    pages_info = _query_pages(
+        site=site,
+        titles=unique_titles,
+        prop="info|images",
+        imlimit="max",
+    )
+
+    # obtain the image information of every file
+    file_titles = list(dict.fromkeys(
+        image["title"]
+        for page_info in pages_info.values()
+        for image in page_info.get("images", [])
+    ))
+    files_info = _query_pages(
+        site=site,
+        titles=file_titles,
+        prop="info|imageinfo",
+        iiprop=IMSLP_API_IMAGEINFO_PROPERTIES,
+    )
+
+    def fetch_one(title: str) -> list:
+        page_files = _make_page_files(
+            site=site, page_info=pages_info.get(title), files_info=files_info)
+        if page_files is None:
+            return list()
+        page, files = page_files
+
+        content = _fetch_page_html(page.base_title)
+        if content is None:
+            return list()
+
+        return _parse_images_metadata(content=content, files=files)
+
+    with imslp.interfaces.instrumentation.span("scraping.fetch_images_metadata_batch", pages=len(titles)):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(unique_titles, executor.map(fetch_one, unique_titles)))
+
+    return [results[title] for title in titles]
+
+
+async def fetch_category_table_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        category_name: str,
+        subcategory: typing.Optional[str] = None,
+        parser: typing.Optional[str] = None,
+) -> typing.List[dict]:
+    """
+    Asynchronous version of `fetch_category_table()`, which fetches the
+    pages of the chart through an `imslp.interfaces.async_transport.AsyncTransport`
+    (requesting each page while the previous one is parsed) and parses them
+    in the default executor of the event loop. The HTTP cache is not used.
+
+    :param transport: The asynchronous transport.
+    :param category_name:
+    :param subcategory:
+    :param parser:
+    :return:
+    """
+
+    loop = asyncio.get_running_loop()
+
+    catname_full = _get_category_full_name(category_name, subcategory)
+    catname_urlenc = urllib.parse.quote(catname_full, safe='/:')
+
+    header = None
+    results = []
+
+    page_task = asyncio.ensure_future(transport.get(IMSLP_SCRAPE_CATCHART_URL.format(catname_urlenc)))
+
+    try:
+        while page_task is not None:
+
+            r = await page_task
+            page_task = None
+
+            peeked_page_link = _peek_category_next_page_link(r.content, catname_full)
+            if peeked_page_link is not None:
+                page_task = asyncio.ensure_future(transport.get(peeked_page_link))
+
+            page_header, rows, next_page_link = await loop.run_in_executor(None, functools.partial(
+                _parse_category_page,
+                content=r.content,
+                catname_full=catname_full,
+                parser=parser,
+            ))
+
+            # only trust the prefetched page if its link is the one found
+            # by the parser
+            if next_page_link != peeked_page_link:
+                if page_task is not None:
+                    page_task.cancel()
+                page_task = None
+                if next_page_link is not None:
+                    page_task = asyncio.ensure_future(transport.get(next_page_link))
+
+            if header is None:
+                header = page_header
+            else:
+                assert header == page_header
+
+            results += [dict(zip(header, parsed_row)) for parsed_row in rows]
+
+    finally:
+        if page_task is not None:
+            page_task.cancel()
+
+    return results
+
+
+async def fetch_category_tables_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        category_name: str,
+        subcategories: typing.Optional[typing.Iterable[str]] = None,
+        parser: typing.Optional[str] = None,
+) -> typing.Dict[str, typing.List[dict]]:
+    """
+    Asynchronous version of `fetch_category_tables()`, in which the charts
+    are fetched concurrently on the event loop.
+
+    :param transport: The asynchronous transport.
+    :param category_name: The name of the category, such as a person.
+    :param subcategories: The names of the subcategories.
+    :param parser: The name of the BeautifulSoup parser.
+    :return: A dictionary mapping each subcategory to the rows of its chart.
+    """
+
+    if subcategories is None:
+        subcategories = imslp.interfaces.constants.IMSLP_SUBCATEGORIES
+    subcategories = list(subcategories)
+
+    async def fetch_one(subcategory: str) -> typing.List[dict]:
+        try:
+            return await fetch_category_table_async(
+                transport=transport,
+                category_name=category_name,
+                subcategory=subcategory,
+                parser=parser,
+            )
+        except IndexError:
+            # the page does not contain any chart
+            return list()
+
+    return dict(zip(subcategories, await asyncio.gather(*map(fetch_one, subcategories))))
+
+
+async def _query_pages_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        titles: typing.List[str],
+        **kwargs
+) -> typing.Dict[str, dict]:
+    """
+    Asynchronous version of `_query_pages()`, in which the batches are
+    queried concurrently.
+    """
+
+    async def query_batch(batch: typing.List[str]) -> typing.Dict[str, dict]:
+        given_titles = {title: {title} for title in batch}
+
+        batch_info = dict()
+        continuation = dict()
+
+        while True:
+            r = await transport.get(IMSLP_API_URL, params=dict(
+                action="query", format="json", titles="|".join(batch), **kwargs, **continuation))
+            response = r.json()
+            _merge_query_response(response=response, batch_info=batch_info, given_titles=given_titles)
+
+            if "continue" not in response:
+                break
+            continuation = response["continue"]
+
+        return {
+            given_title: page_info
+            for title, page_info in batch_info.items()
+            for given_title in given_titles.get(title, {title})
+        }
+
+    pages_info = dict()
+    for batch_pages_info in await asyncio.gather(*[
+        query_batch(titles[i:i + IMSLP_API_BATCH_SIZE])
+        for i in range(0, len(titles), IMSLP_API_BATCH_SIZE)
+    ]):
+        pages_info.update(batch_pages_info)
+
+    return pages_info
+
+
+async def fetch_images_metadata_batch_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        pages: typing.Sequence[typing.Union[mwclient.page.Page, str]],
+        parser: typing.Optional[str] = None,
+) -> typing.List[list]:
+    """
+    Asynchronous version of `fetch_images_metadata_batch()`, which queries
+    the MediaWiki API directly (rather than through `mwclient`) and fetches
+    the HTML pages concurrently through an
+    `imslp.interfaces.async_transport.AsyncTransport`; the pages are parsed
+    in the default executor of the event loop. The image objects in the
+    metadata (`obj`) are not bound to a `mwclient.Site`.
+
+    :param transport: The asynchronous transport.
+    :param pages: The pages, as `mwclient.page.Page` objects or titles.
+    :param parser: The name of the BeautifulSoup parser.
+    :return: The list of metadata of the images of each page, in order.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    titles = [page.name if isinstance(page, mwclient.page.Page) else page for page in pages]
+    unique_titles = list(dict.fromkeys(titles))
+
+    pages_info = await _query_pages_async(
+        transport=transport,
+        titles=unique_titles,
+        prop="info|images",
+        imlimit="max",
+    )
+
+    file_titles = list(dict.fromkeys(
+        image["title"]
+        for page_info in pages_info.values()
+        for image in page_info.get("images", [])
+    ))
+    files_info = await _query_pages_async(
+        transport=transport,
+        titles=file_titles,
+        prop="info|imageinfo",
+        iiprop=IMSLP_API_IMAGEINFO_PROPERTIES,
+    )
+
+    async def fetch_one(title: str) -> list:
+        page_files = _make_page_files(
+            site=None, page_info=pages_info.get(title), files_info=files_info)
+        if page_files is None:
+            return list()
+        page, files = page_files
+
+        r = await transport.get(IMSLP_WIKI_URL.format(urllib.parse.quote(page.base_title.replace(" ", "_"))))
+        if not r.ok:
+            return list()
+
+        return await loop.run_in_executor(None, functools.partial(
+            _parse_images_metadata, content=r.content, files=files, parser=parser))
+
+    results = dict(zip(unique_titles, await asyncio.gather(*map(fetch_one, unique_titles))))
+
+    return [results[title] for title in titles]
+
+
+async def fetch_images_metadata_async(
+        transport: "imslp.interfaces.async_transport.AsyncTransport",
+        page: typing.Union[mwclient.page.Page, str],
+        parser: typing.Optional[str] = None,
+) -> list:
+    """
+    Asynchronous version of `fetch_images_metadata()` (see
+    `fetch_images_metadata_batch_async()`).
+
+    :param transport: The asynchronous transport.
+    :param page: The page, as a `mwclient.page.Page` object or a title.
+    :param parser: The name of the BeautifulSoup parser.
+    :return: The list of metadata of the images of the page.
+    """
+
+    if page is None:
+        return list()
+
+    return (await fetch_images_metadata_batch_async(transport=transport, pages=[page], parser=parser))[0]
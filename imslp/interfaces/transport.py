@@ -0,0 +1,298 @@
+
+import threading
+import time
+import typing
+
+import requests
+import requests.adapters
+import urllib3.util.retry
+
+import imslp.interfaces.instrumentation
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "TokenBucket",
+
+    "configure",
+    "get",
+    "get_rate_limiter",
+    "get_session",
+    "new_session",
+    "request",
+]
+
+
+# Default maximum number of connections kept alive per host
+IMSLP_HTTP_POOL_SIZE = 16
+
+# Default timeout (in seconds) to connect, and to wait for a response
+IMSLP_HTTP_TIMEOUT = (10, 60)
+
+# Default number of retries of failed requests, with exponential backoff
+# (a request is retried after backoff_factor * 2^(n-1) seconds)
+IMSLP_HTTP_RETRIES = 5
+IMSLP_HTTP_BACKOFF_FACTOR = 0.5
+
+# HTTP status codes of the responses that cause a request to be retried
+IMSLP_HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Default maximum rate of requests (per second), `None` for no limit, and
+# number of requests that can be made in a burst
+IMSLP_HTTP_RATE = None     # type: typing.Optional[float]
+IMSLP_HTTP_BURST = 1
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter: tokens are added at a rate of
+    `rate` per second, up to `capacity` tokens, and each request consumes a
+    token, waiting for one to be available if necessary.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self._rate = float(rate)
+        self._capacity = float(max(capacity, 1))
+        self._tokens = self._capacity
+        self._timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Consumes tokens without waiting for them, so that the caller (such
+        as a coroutine) can wait in its own way.
+
+        :param tokens: The number of tokens to consume.
+        :return: The number of seconds to wait before the tokens are available.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._timestamp) * self._rate)
+            self._timestamp = now
+
+            # tokens can go negative: this reserves the next tokens for
+            # this request, so that waiting requests are served in order
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self._rate)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Consumes tokens, waiting until they are available.
+
+        :param tokens: The number of tokens to consume.
+        :return: The number of seconds spent waiting.
+        """
+
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+class _ImslpSession(requests.Session):
+    """
+    Session shared by all the requests of the package, which applies a
+    default timeout and the global rate limiter to every request.
+    """
+
+    timeout = IMSLP_HTTP_TIMEOUT
+    rate_limiter = None        # type: typing.Optional[TokenBucket]
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        if not imslp.interfaces.instrumentation.is_enabled():
+            return super().request(method, url, *args, **kwargs)
+
+        with imslp.interfaces.instrumentation.span("http.request", method=method, url=url) as span:
+            r = super().request(method, url, *args, **kwargs)
+            span.set(status=r.status_code, bytes=_get_response_size(r), retries=_get_retries(r))
+        return r
+
+
+class _ImslpClientSession(_ImslpSession):
+    """
+    Session with its own cookies (such as those of a login), which sends
+    its requests through the connection pools of the shared session, and
+    follows its settings (see `configure()`).
+    """
+
+    @property
+    def timeout(self):
+        return get_session().timeout
+
+    @property
+    def rate_limiter(self):
+        return get_session().rate_limiter
+
+    def get_adapter(self, url):
+        return get_session().get_adapter(url)
+
+
+def _get_response_size(r: requests.Response) -> int:
+    # the body of a streamed response has not been read yet
+    if r._content_consumed and isinstance(r._content, bytes):
+        return len(r._content)
+    return int(r.headers.get("Content-Length") or 0)
+
+
+def _get_retries(r: requests.Response) -> int:
+    retries = getattr(r.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+# Internal variables for the shared session, the global rate limiter (shared
+# by the synchronous and asynchronous requests) and their settings
+_session = None            # type: typing.Optional[_ImslpSession]
+_rate_limiter = None       # type: typing.Optional[TokenBucket]
+_session_lock = threading.Lock()
+_settings = {
+    "pool_size": IMSLP_HTTP_POOL_SIZE,
+    "timeout": IMSLP_HTTP_TIMEOUT,
+    "retries": IMSLP_HTTP_RETRIES,
+    "backoff_factor": IMSLP_HTTP_BACKOFF_FACTOR,
+    "rate": IMSLP_HTTP_RATE,
+    "burst": IMSLP_HTTP_BURST,
+}
+
+
+def _make_session() -> _ImslpSession:
+    session = _ImslpSession()
+    session.timeout = _settings["timeout"]
+    session.rate_limiter = _rate_limiter
+
+    retry = urllib3.util.retry.Retry(
+        total=_settings["retries"],
+        backoff_factor=_settings["backoff_factor"],
+        status_forcelist=IMSLP_HTTP_RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=_settings["pool_size"],
+        pool_maxsize=_settings["pool_size"],
+        max_retries=retry,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def configure(
+        pool_size: typing.Optional[int] = None,
+        timeout: typing.Optional[typing.Union[float, typing.Tuple[float, float]]] = None,
+        retries: typing.Optional[int] = None,
+        backoff_factor: typing.Optional[float] = None,
+        rate: typing.Optional[float] = None,
+        burst: typing.Optional[int] = None,
+) -> None:
+    """
+    Changes the settings of the shared session; parameters that are `None`
+    keep their current value. The session is recreated on next use (so
+    cookies set on the previous session are lost), and the global rate
+    limiter is recreated if its settings change.
+
+    :param pool_size: The maximum number of connections kept alive per host.
+    :param timeout: The timeout of requests, in seconds, either as a single
+        value or as a tuple `(connect timeout, read timeout)`.
+    :param retries: The number of retries of failed requests.
+    :param backoff_factor: The factor of the exponential backoff.
+    :param rate: The maximum rate of requests per second (0 for no limit).
+    :param burst: The number of requests that can be made in a burst.
+    """
+
+    global _session, _rate_limiter
+
+    with _session_lock:
+        for key, value in [
+            ("pool_size", pool_size),
+            ("timeout", timeout),
+            ("retries", retries),
+            ("backoff_factor", backoff_factor),
+            ("burst", burst),
+        ]:
+            if value is not None:
+                _settings[key] = value
+
+        if rate is not None:
+            _settings["rate"] = rate if rate > 0 else None
+
+        if rate is not None or burst is not None:
+            _rate_limiter = None
+            if _settings["rate"] is not None:
+                _rate_limiter = TokenBucket(rate=_settings["rate"], capacity=_settings["burst"])
+
+        _session = None
+
+
+def get_rate_limiter() -> typing.Optional[TokenBucket]:
+    """
+    Returns the global rate limiter (see `configure()`), applied to all the
+    requests of the package, synchronous and asynchronous, or `None` if the
+    rate of requests is not limited.
+
+    :return: The global rate limiter, or `None`.
+    """
+    return _rate_limiter
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the `requests.Session` shared by all the requests of the
+    package (except those of the `mwclient` site, see `new_session()`),
+    which pools connections, retries failed requests with exponential
+    backoff, and applies the global rate limit.
+
+    :return: The shared session.
+    """
+
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = _make_session()
+        return _session
+
+
+def new_session() -> requests.Session:
+    """
+    Returns a new `requests.Session`, with its own cookies, whose requests
+    go through the connection pools of the shared session (see
+    `get_session()`), and are retried, timed out and rate-limited in the
+    same way, even after `configure()` is called. Clients that log in, such
+    as the `mwclient` site, use such a session, so that their cookies are
+    not sent with the other requests of the package.
+
+    :return: The new session.
+    """
+    return _ImslpClientSession()
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Makes a request through the shared session.
+
+    :param method: The HTTP method.
+    :param url: The URL.
+    :param kwargs: The parameters of `requests.Session.request()`.
+    :return: The response.
+    """
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Makes a GET request through the shared session.
+
+    :param url: The URL.
+    :param kwargs: The parameters of `requests.Session.request()`.
+    :return: The response.
+    """
+    return request("GET", url, **kwargs)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import imslp.async_client
+import imslp.interfaces.async_transport
+import imslp.interfaces.internal
+import imslp.interfaces.scraping
+
+from tests import test_internal
+from tests import test_scraping
+
+
+class FakeAsyncTransport:
+    """
+    Stand-in for an `AsyncTransport` that answers the requests made to the
+    internal IMSLP API, the MediaWiki API, and the HTML pages, using the
+    fakes of the synchronous tests.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.site = test_scraping.FakeSite()
+
+    async def get(self, url, params=None, **kwargs):
+        self.urls.append(url)
+        await asyncio.sleep(0)
+
+        if params is not None:
+            obj = self.site.get(**params)
+            return imslp.interfaces.async_transport.AsyncResponse(
+                url=url, status_code=200, headers={}, content=json.dumps(obj).encode())
+
+        if "start=" in url:
+            obj = test_internal.fake_worklist_get(url).json()
+            return imslp.interfaces.async_transport.AsyncResponse(
+                url=url, status_code=200, headers={}, content=json.dumps(obj).encode())
+
+        if "customcat" in url:
+            content = test_scraping.fake_category_get(url).content
+        else:
+            content = test_scraping.read_fixture("work_page.html")
+        return imslp.interfaces.async_transport.AsyncResponse(
+            url=url, status_code=200, headers={}, content=content)
+
+    async def close(self):
+        pass
+
+
+def test_load_cache_async(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache())
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+
+    client = imslp.async_client.AsyncImslpClient(transport=FakeAsyncTransport())
+    asyncio.run(client.load_cache(concurrency=4))
+
+    expected = ["Work {}".format(i) for i in range(test_internal.TOTAL)]
+    assert [record["id"] for record in imslp.interfaces.internal.list_works()] == expected
+    assert [record["id"] for record in imslp.interfaces.internal.list_people()] == expected
+
+    # the searches run in the executor of the loop
+    people = asyncio.run(client.search_people(name="Work 1"))
+    assert {record["id"] for record in people} == {"Work 1"} | {"Work 1{}".format(i) for i in range(10)}
+
+
+def test_fetch_async():
+    transport = FakeAsyncTransport()
+    client = imslp.async_client.AsyncImslpClient(transport=transport)
+
+    async def fetch():
+        return await asyncio.gather(
+            client.fetch_category_table("O'Brien, Jane"),
+            client.fetch_images_metadata_batch(
+                [test_scraping.WORK_TITLE, "Missing Work", test_scraping.WORK_TITLE]),
+        )
+
+    table, results = asyncio.run(fetch())
+
+    assert table == [{"Work": "Piece {}".format(i), "Key": "C major"} for i in range(9)]
+
+    assert results[1] == []
+    assert results[0] == results[2]
+    assert [image["download_count"] for image in results[0]] == [12345, 678]
+    assert results[0][0]["url"] == "http://imslp.org/files/PMLP01586-Beethoven Symphony No.5 Score.pdf"
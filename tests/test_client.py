@@ -0,0 +1,47 @@
+
+import requests
+
+import imslp.client
+import imslp.interfaces.constants
+import imslp.interfaces.download
+import imslp.interfaces.mw_api
+
+
+class FakeMwClient:
+    """
+    Stand-in for `ImslpMwClient` that logs in without any request, by
+    setting the session cookies that IMSLP would set.
+    """
+
+    instances = []
+
+    def __init__(self, username=None, password=None):
+        self.connection = requests.Session()
+        if username is not None and password is not None:
+            self.connection.cookies.set(imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME, username)
+            self.connection.cookies.set("imslp_wiki_session", "0123456789abcdef")
+        FakeMwClient.instances.append(self)
+
+
+def test_client_with_credentials_is_logged_in(monkeypatch):
+    monkeypatch.setattr(imslp.interfaces.mw_api, "ImslpMwClient", FakeMwClient)
+    monkeypatch.setattr(FakeMwClient, "instances", [])
+
+    # without credentials, no site is created to answer these
+    client = imslp.client.ImslpClient()
+    assert not client.logged_in
+    assert client.username is None
+    assert FakeMwClient.instances == []
+
+    client = imslp.client.ImslpClient(username="jane", password="secret")
+    assert client.logged_in
+    assert client.username == "jane"
+
+    download_cookies = []
+    monkeypatch.setattr(
+        imslp.interfaces.download, "download_files",
+        lambda cookies, **kwargs: download_cookies.append(cookies) or [])
+    client.download_scores(images=[], directory=".")
+    assert download_cookies[0][imslp.interfaces.constants.IMSLP_COOKIE_NAME_USERNAME] == "jane"
+
+    assert len(FakeMwClient.instances) == 1
@@ -0,0 +1,49 @@
+
+import hashlib
+
+import pytest
+import requests
+
+import imslp.interfaces.download
+import imslp.interfaces.transport
+
+
+CONTENT = bytes(range(256)) * 1000
+
+
+class FakeStreamedResponse(requests.Response):
+
+    def __init__(self, status_code, content):
+        super().__init__()
+        self.status_code = status_code
+        self._content = content
+        self._content_consumed = True
+
+
+def fake_ranged_get(url, headers=None, cookies=None, stream=False, **kwargs):
+    assert cookies["imslpdisclaimeraccepted"] == "yes"
+    range_header = (headers or dict()).get("Range")
+    if range_header is None:
+        return FakeStreamedResponse(200, CONTENT)
+    offset = int(range_header[len("bytes="):-1])
+    return FakeStreamedResponse(206, CONTENT[offset:])
+
+
+def test_download_file_resumes_and_checks(monkeypatch, tmp_path):
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_ranged_get)
+
+    path = str(tmp_path / "score.pdf")
+    with open(path + ".part", "wb") as f:
+        f.write(CONTENT[:1000])
+
+    imslp.interfaces.download.download_file(
+        "http://imslp.org/images/score.pdf", path,
+        size=len(CONTENT), sha1=hashlib.sha1(CONTENT).hexdigest())
+
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+    with pytest.raises(imslp.interfaces.download.DownloadError):
+        imslp.interfaces.download.download_file(
+            "http://imslp.org/images/other.pdf", str(tmp_path / "other.pdf"), sha1="0" * 40)
+    assert not (tmp_path / "other.pdf.part").exists()
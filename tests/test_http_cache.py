@@ -0,0 +1,54 @@
+
+import requests
+
+import imslp.interfaces.http_cache
+import imslp.interfaces.transport
+
+
+def make_response(status_code, content=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or dict())
+    return response
+
+
+class FakeServer:
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or dict())))
+        if (headers or dict()).get("If-None-Match") == '"v1"':
+            return make_response(304, headers={"ETag": '"v1"'})
+        return make_response(200, content=url.encode("utf-8") * 100, headers={"ETag": '"v1"'})
+
+
+def test_http_cache_serves_and_revalidates(monkeypatch, tmp_path):
+    server = FakeServer()
+    monkeypatch.setattr(imslp.interfaces.transport, "get", server.get)
+
+    cache = imslp.interfaces.http_cache.HttpCache(directory=str(tmp_path), ttl=3600)
+    first = cache.get("https://imslp.org/wiki/A")
+    second = cache.get("https://imslp.org/wiki/A")
+    assert not first.from_cache and second.from_cache
+    assert second.content == first.content
+    assert len(server.requests) == 1
+
+    stale_cache = imslp.interfaces.http_cache.HttpCache(directory=str(tmp_path), ttl=0)
+    third = stale_cache.get("https://imslp.org/wiki/A")
+    assert third.from_cache and third.content == first.content
+    assert server.requests[-1][1]["If-None-Match"] == '"v1"'
+
+
+def test_http_cache_evicts_least_recently_used(monkeypatch, tmp_path):
+    server = FakeServer()
+    monkeypatch.setattr(imslp.interfaces.transport, "get", server.get)
+
+    cache = imslp.interfaces.http_cache.HttpCache(directory=str(tmp_path), max_size=6000)
+    for page in "ABCDEF":
+        cache.get("https://imslp.org/wiki/{}".format(page))
+
+    assert cache._read("https://imslp.org/wiki/F") is not None
+    assert cache._read("https://imslp.org/wiki/A") is None
@@ -6,14 +6,25 @@ def test_import_all():
     warnings.filterwarnings("ignore", category=DeprecationWarning)
 
     import imslp
+    import imslp.helpers.lru_cache
+    import imslp.helpers.search_index
     import imslp.helpers.string_search
     import imslp.helpers
+    import imslp.interfaces.async_transport
+    import imslp.interfaces.compact
     import imslp.interfaces.constants
+    import imslp.interfaces.disk_cache
+    import imslp.interfaces.download
+    import imslp.interfaces.http_cache
+    import imslp.interfaces.instrumentation
     import imslp.interfaces.internal
     import imslp.interfaces.mw_api
+    import imslp.interfaces.recent_changes
     import imslp.interfaces.scraping
+    import imslp.interfaces.transport
     import imslp.interfaces
     import imslp.client
+    import imslp.async_client
 
     assert True
 
@@ -0,0 +1,75 @@
+import requests
+import requests.adapters
+
+import imslp.interfaces.http_cache
+import imslp.interfaces.instrumentation
+import imslp.interfaces.scraping
+import imslp.interfaces.transport
+
+from tests import test_http_cache
+from tests import test_scraping
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+
+    def send(self, request, **kwargs):
+        response = test_http_cache.make_response(200, content=b"x" * 1234)
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_disabled_instrumentation_is_a_no_op():
+    assert not imslp.interfaces.instrumentation.is_enabled()
+    assert imslp.interfaces.instrumentation.span("a") is imslp.interfaces.instrumentation.span("b")
+
+
+def test_metrics_collector(monkeypatch, tmp_path):
+    collector = imslp.interfaces.instrumentation.MetricsCollector()
+    events = []
+
+    def failing_listener(event):
+        raise RuntimeError("listener failure")
+
+    monkeypatch.setattr(imslp.interfaces.instrumentation, "_listeners", [])
+    imslp.interfaces.instrumentation.add_listener(collector)
+    imslp.interfaces.instrumentation.add_listener(events.append)
+    imslp.interfaces.instrumentation.add_listener(failing_listener)
+
+    # requests made through the shared session
+    session = imslp.interfaces.transport.get_session()
+    monkeypatch.setitem(session.adapters, "https://", FakeAdapter())
+    imslp.interfaces.transport.get("https://imslp.org/wiki/A")
+
+    # pages parsed while fetching a category chart
+    monkeypatch.setattr(imslp.interfaces.transport, "get", test_scraping.fake_category_get)
+    imslp.interfaces.scraping.fetch_category_table("O'Brien, Jane")
+
+    # lookups in the HTTP cache
+    monkeypatch.setattr(imslp.interfaces.transport, "get", test_http_cache.FakeServer().get)
+    cache = imslp.interfaces.http_cache.HttpCache(directory=str(tmp_path))
+    for _ in range(4):
+        cache.get("https://imslp.org/wiki/B")
+
+    summary = collector.summary()
+    operations = summary["operations"]
+
+    assert operations["http.request"]["count"] == 1
+    assert operations["http.request"]["bytes"] == 1234
+    assert sum(operations["http.request"]["histogram"].values()) == 1
+
+    assert operations["scraping.parse_category_page"]["count"] == 3
+    assert operations["scraping.fetch_category_table"]["count"] == 1
+    assert [event.attributes["rows"] for event in events if event.name == "scraping.fetch_category_table"] == [9]
+
+    assert summary["cache"]["hit"] == 3
+    assert summary["cache"]["miss"] == 1
+    assert summary["cache"]["hit_rate"] == 0.75
+
+    imslp.interfaces.instrumentation.remove_listener(collector)
+    imslp.interfaces.instrumentation.remove_listener(events.append)
+    imslp.interfaces.instrumentation.remove_listener(failing_listener)
+    assert not imslp.interfaces.instrumentation.is_enabled()
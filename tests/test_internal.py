@@ -0,0 +1,462 @@
+
+import pickle
+import re
+import threading
+
+import pytest
+
+import imslp.client
+import imslp.helpers.string_search
+import imslp.interfaces.compact
+import imslp.interfaces.disk_cache
+import imslp.interfaces.internal
+import imslp.interfaces.transport
+
+
+PAGE_SIZE = 10
+TOTAL = 95
+
+
+class FakeResponse:
+
+    ok = True
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def json(self):
+        return self._obj
+
+
+def fake_worklist_get(url, *args, **kwargs):
+    start = int(re.search(r"start=(\d+)", url).group(1))
+    obj = {
+        str(i): {"id": "Work {}".format(i), "permlink": "https://imslp.org/wiki/Work_{}".format(i)}
+        for i in range(start, min(start + PAGE_SIZE, TOTAL))
+    }
+    obj["metadata"] = {"moreresultsavailable": start + PAGE_SIZE < TOTAL}
+    return FakeResponse(obj)
+
+
+def test_raw_call_concurrent_matches_serial(monkeypatch):
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    url = imslp.interfaces.internal.IMSLP_API_WORKS
+    serial = imslp.interfaces.internal._raw_call(url)
+    assert [record["id"] for record in serial] == ["Work {}".format(i) for i in range(TOTAL)]
+
+    for concurrency in (2, 4, 16):
+        assert imslp.interfaces.internal._raw_call(url, concurrency=concurrency) == serial
+        assert imslp.interfaces.internal._raw_call(url, start=13, concurrency=concurrency) == serial[13:]
+        assert imslp.interfaces.internal._raw_call(url, count=25, concurrency=concurrency) == serial[:25]
+
+
+def test_fetch_page_gives_up_on_failed_request(monkeypatch):
+    requests = []
+
+    def failing_get(url, *args, **kwargs):
+        requests.append(url)
+        response = FakeResponse(None)
+        response.ok = False
+        return response
+
+    monkeypatch.setattr(imslp.interfaces.transport, "get", failing_get)
+
+    assert imslp.interfaces.internal._fetch_page(imslp.interfaces.internal.IMSLP_API_WORKS, start=0) is None
+    assert imslp.interfaces.internal._raw_call(imslp.interfaces.internal.IMSLP_API_WORKS) == []
+    assert len(requests) == 2
+
+
+def test_pickled_record_does_not_keep_hash():
+    record = imslp.interfaces.internal.HashablePageRecord(id="Work 1", permlink="https://imslp.org/wiki/Work_1")
+    records = {record}
+
+    unpickled = pickle.loads(pickle.dumps(record))
+    assert isinstance(unpickled, imslp.interfaces.internal.HashablePageRecord)
+    assert unpickled == record and unpickled._hash is None
+    assert unpickled in records
+
+
+def test_load_cache_persists_and_fetches_delta(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache())
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+
+    requested_starts = []
+
+    def recording_get(url, *args, **kwargs):
+        requested_starts.append(int(re.search(r"start=(\d+)", url).group(1)))
+        return fake_worklist_get(url)
+
+    monkeypatch.setattr(imslp.interfaces.transport, "get", recording_get)
+
+    imslp.interfaces.internal.reset_cache()
+    assert len(imslp.interfaces.internal.list_works()) == TOTAL
+    assert imslp.interfaces.disk_cache.read_catalogue_header("works")["start"] == TOTAL
+
+    requested_starts.clear()
+    imslp.interfaces.internal.reset_cache()
+    assert len(imslp.interfaces.internal.list_people()) == TOTAL
+    assert requested_starts == [TOTAL, TOTAL]
+
+
+def test_load_cache_compact(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache())
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    imslp.interfaces.internal.reset_cache()
+    records = imslp.interfaces.internal.list_works()
+
+    imslp.interfaces.internal.reset_cache(compact=True)
+    compact_records = imslp.interfaces.internal.list_works()
+
+    assert isinstance(compact_records, imslp.interfaces.compact.CompactCatalogue)
+    assert list(compact_records) == records
+    assert list(imslp.interfaces.internal.list_works(start=10, count=5)) == records[10:15]
+    assert isinstance(compact_records[0], imslp.interfaces.internal.HashablePageRecord)
+
+
+def test_iter_works_streams_pages(monkeypatch):
+    requested_starts = []
+
+    def recording_get(url, *args, **kwargs):
+        requested_starts.append(int(re.search(r"start=(\d+)", url).group(1)))
+        return fake_worklist_get(url)
+
+    monkeypatch.setattr(imslp.interfaces.transport, "get", recording_get)
+
+    records = imslp.interfaces.internal.iter_works(start=5)
+    first = next(records)
+    assert first["id"] == "Work 5"
+    assert requested_starts == [5]
+
+    assert [first] + list(records) == imslp.interfaces.internal.list_works(start=5, cache=False)
+    assert len(list(imslp.interfaces.internal.iter_people(start=90, count=3))) == 3
+
+
+def test_background_loading_searches_loaded_prefix(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache())
+
+    # the bundled snapshot holds the first 30 records, and the requests for
+    # the others are held until the snapshot has been searched
+    snapshot = [fake_worklist_get("start={}".format(start)).json() for start in range(0, 30, PAGE_SIZE)]
+    snapshot = [record for page in snapshot for key, record in page.items() if key != "metadata"]
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: snapshot)
+
+    released = threading.Event()
+
+    def held_get(url, *args, **kwargs):
+        released.wait()
+        return fake_worklist_get(url)
+
+    monkeypatch.setattr(imslp.interfaces.transport, "get", held_get)
+
+    imslp.client.ImslpClient(background_loading=True)
+
+    try:
+        results = imslp.client.ImslpClient.search_people(name="Work 2", wait=False)
+        assert not results.complete
+        assert imslp.interfaces.internal.is_cache_partial()
+        assert {record["id"] for record in results} == {"Work 2"} | {"Work {}".format(i) for i in range(20, 30)}
+        assert imslp.client.ImslpClient.get_work("https://imslp.org/wiki/Work_50") is None
+        assert not imslp.interfaces.internal.wait_for_cache(timeout=0.01)
+    finally:
+        released.set()
+
+    results = imslp.client.ImslpClient.search_people(name="Work 5", wait=True)
+    assert results.complete
+    assert len(results) == 1 + 10
+    assert imslp.client.ImslpClient.get_work("https://imslp.org/wiki/Work_50")["id"] == "Work 50"
+    assert len(imslp.interfaces.internal.list_works()) == TOTAL
+    assert imslp.interfaces.disk_cache.read_catalogue_header("people")["start"] == TOTAL
+
+
+def test_interrupted_background_loading_fails_once_and_resumes(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    iter_raw_pages = imslp.interfaces.internal._iter_raw_pages
+    failures = [RuntimeError("connection lost"), RuntimeError("connection lost")]
+
+    def failing_iter_raw_pages(imslp_url_pattern, start=0, delay=0.0):
+        pages = iter_raw_pages(imslp_url_pattern=imslp_url_pattern, start=start, delay=delay)
+        yield next(pages)
+        if len(failures) > 0:
+            raise failures.pop()
+        yield from pages
+
+    monkeypatch.setattr(imslp.interfaces.internal, "_iter_raw_pages", failing_iter_raw_pages)
+
+    cache = imslp.interfaces.internal.CatalogueCache(persist=False)
+    cache.start_background_loading()
+
+    with pytest.raises(RuntimeError):
+        cache.wait()
+    assert cache.wait() and cache.is_partial()
+    assert len(cache.get_catalogue("works")) == PAGE_SIZE
+
+    # the loading is resumed past the records already loaded
+    cache.start_background_loading()
+    assert cache.wait() and not cache.is_partial()
+    assert [record["id"] for record in cache.get_catalogue("works")] == ["Work {}".format(i) for i in range(TOTAL)]
+
+
+def test_load_cache_is_single_flight_and_parallel(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache())
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+
+    # the first requests for the people and for the works only return once
+    # both have been made, which fails if the catalogues are loaded serially
+    both_requested = threading.Barrier(2, timeout=5)
+    requested_urls = []
+
+    def recording_get(url, *args, **kwargs):
+        requested_urls.append(url)
+        if "start=0/" in url:
+            both_requested.wait()
+        return fake_worklist_get(url)
+
+    monkeypatch.setattr(imslp.interfaces.transport, "get", recording_get)
+
+    threads = [threading.Thread(target=imslp.interfaces.internal.list_works) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(imslp.interfaces.internal.list_works()) == TOTAL
+    assert len(imslp.interfaces.internal.list_people()) == TOTAL
+    assert len(requested_urls) == 2 * len(range(0, TOTAL, PAGE_SIZE))
+
+
+def test_client_with_own_catalogue_cache(monkeypatch):
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_default_cache",
+        imslp.interfaces.internal.CatalogueCache(people=[{"id": "Category:Satie, Erik", "permlink": "a"}]))
+
+    cache = imslp.interfaces.internal.CatalogueCache(
+        people=[{"id": "Category:Bach, Johann Sebastian", "permlink": "b"}])
+    client = imslp.client.ImslpClient(catalogue_cache=cache)
+
+    assert client.catalogue_cache is cache
+    assert [record["id"] for record in client.search_people(name="bach")] == ["Category:Bach, Johann Sebastian"]
+    assert client.get_person("Satie, Erik") is None
+    assert imslp.client.ImslpClient.search_people(name="bach") == set()
+    assert imslp.client.ImslpClient.get_person("Satie, Erik")["permlink"] == "a"
+
+
+def test_search_results_are_memoized(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    get_search_expr_key = imslp.helpers.string_search.get_search_expr_key
+    assert get_search_expr_key(["Work", re.compile("1$")]) == get_search_expr_key(["WORK", re.compile("1$")])
+    assert get_search_expr_key("Work", case_insensitive=False) != get_search_expr_key("WORK", case_insensitive=False)
+    assert get_search_expr_key(["Work", str.isupper]) is None
+
+    cache = imslp.interfaces.internal.CatalogueCache(persist=False)
+    client = imslp.client.ImslpClient(catalogue_cache=cache)
+
+    results = client.search_people(name="Work 1")
+    assert len(results) == 11
+    assert cache.search_results_info().misses == 1
+
+    # equivalent expressions hit the cache, and the results can be modified
+    results.clear()
+    assert client.search_people(name="WORK 1") == client.search_people(name="work 1")
+    assert len(client.search_people(name="work 1")) == 11
+    assert cache.search_results_info().hits == 3
+
+    # callables are not memoized
+    client.search_people(name=lambda name: name.endswith("1"))
+    assert cache.search_results_info()[:2] == (3, 1)
+
+    cache.reset()
+    assert cache.search_results_info().currsize == 0
+    assert len(client.search_people(name="Work 1")) == 11
+    assert cache.search_results_info().misses == 2
+
+
+class FakeSite:
+
+    def __init__(self, pages):
+        self._pages = list(pages)
+        self.requests = []
+
+    def get(self, action, **params):
+        assert action == "query" and params["list"] == "recentchanges"
+        self.requests.append(params)
+        return self._pages.pop(0)
+
+
+def test_sync_applies_log_events(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    records = imslp.interfaces.internal._raw_call(imslp.interfaces.internal.IMSLP_API_WORKS)
+    cache = imslp.interfaces.internal.CatalogueCache(people=records, works=records[:90])
+    assert len(cache.get_search_index("works", "id").lookup("work 4")) == 11
+
+    def log_change(title, timestamp, logtype="delete", logaction="delete", ns=0, **fields):
+        return dict(title=title, ns=ns, timestamp=timestamp, logtype=logtype, logaction=logaction, **fields)
+
+    site = FakeSite([
+        {
+            "continue": {"rccontinue": "20201002000000|2", "continue": "-||"},
+            "query": {"recentchanges": [
+                log_change("Work 3", "2020-10-01T00:00:00Z"),
+                log_change("Work 4", "2020-10-01T00:00:01Z", logtype="move", logaction="move",
+                           logparams={"target_ns": 0, "target_title": "Sonata (Satie, Erik)"}),
+                log_change("Work 5", "2020-10-01T00:00:02Z", logtype="move", logaction="move_redir",
+                           logparams={"target_ns": 14, "target_title": "Category:Work 5"}),
+                log_change("Work 7", "2020-10-01T00:00:03Z", logtype="protect", logaction="protect"),
+            ]},
+        },
+        {
+            "query": {"recentchanges": [
+                log_change("Work 6", "2020-10-02T00:00:00Z", logtype="move", logaction="move",
+                           move={"new_ns": 0, "new_title": "Prelude (Bach, Johann Sebastian)"}),
+                log_change("Work 3", "2020-10-02T00:00:01Z", logaction="restore"),
+                log_change("Category:Nobody", "2020-10-02T00:00:02Z", ns=14),
+            ]},
+        },
+    ])
+
+    stats = cache.sync(site=site, since="2020-08-02T00:00:00Z")
+    assert stats == {"inserted": 6, "updated": 2, "deleted": 2}
+    assert site.requests[0]["rcstart"] == "2020-08-02T00:00:00Z"
+    assert site.requests[1]["rccontinue"] == "20201002000000|2"
+
+    works = cache.get_catalogue("works")
+    expected_ids = ["Work {}".format(i) for i in range(95) if i not in (3, 5)] + ["Work 3"]
+    expected_ids[3] = "Sonata (Satie, Erik)"
+    expected_ids[4] = "Prelude (Bach, Johann Sebastian)"
+    assert [work["id"] for work in works] == expected_ids
+    assert works[3]["intvals"] == {"worktitle": "Sonata", "composer": "Satie, Erik"}
+    assert works[3]["parent"] == "Category:Satie, Erik"
+    assert len(cache.get_catalogue("people")) == 95
+
+    # the structures built over the catalogue follow the new positions
+    assert cache.get_search_index("works", "id").lookup("work 4") == {
+        position for position, work_id in enumerate(expected_ids) if "Work 4" in work_id}
+    permlinks = cache.get_lookup_table("works", "permlink", unique=True)
+    assert permlinks["http://imslp.org/wiki/Sonata_(Satie,_Erik)"] == 3
+
+    # the catalogue and the time of the last event are persisted, and the
+    # next sync starts from that time
+    persisted, start = imslp.interfaces.disk_cache.read_catalogue(name="works")
+    assert start == 95 and [work["id"] for work in persisted] == expected_ids
+    assert imslp.interfaces.disk_cache.read_sync_timestamp() == "2020-10-02T00:00:02Z"
+
+    site = FakeSite([{"query": {"recentchanges": []}}])
+    assert cache.sync(site=site) == {"inserted": 0, "updated": 0, "deleted": 0}
+    assert site.requests[0]["rcstart"] == "2020-10-02T00:00:02Z"
+
+
+def test_sync_keeps_compact_catalogues_compact(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.internal, "_read_bundled_catalogue", lambda name: None)
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    cache = imslp.interfaces.internal.CatalogueCache(compact=True)
+    records = list(cache.get_catalogue("works"))
+    assert cache.get_search_index("works", "id").lookup("work 3") == {3} | set(range(30, 40))
+
+    site = FakeSite([{"query": {"recentchanges": [
+        dict(title="Work 3", ns=0, timestamp="2020-10-01T00:00:00Z", logtype="delete", logaction="delete"),
+    ]}}])
+    assert cache.sync(site=site, since="2020-08-02T00:00:00Z", persist=False)["deleted"] == 1
+
+    works = cache.get_catalogue("works")
+    assert isinstance(works, imslp.interfaces.compact.CompactCatalogue)
+    assert list(works) == records[:3] + records[4:]
+    assert cache.get_search_index("works", "id").lookup("work 3") == set(range(29, 39))
+
+
+def test_sync_baseline_is_bundled_snapshot_or_reload(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_worklist_get)
+
+    # catalogues never synced are synced from the build time of the oldest
+    # bundled snapshot
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_get_bundled_catalogue_path",
+        lambda name: "/imslp/cache/imslp-{}-cache-{}.zip".format(
+            name, "2020-09-01" if name == "people" else "2020-08-02"))
+    assert imslp.interfaces.internal._get_sync_baseline() == "2020-08-02T00:00:00Z"
+
+    records = imslp.interfaces.internal._raw_call(imslp.interfaces.internal.IMSLP_API_WORKS)
+    cache = imslp.interfaces.internal.CatalogueCache(people=records, works=records)
+    site = FakeSite([{"query": {"recentchanges": []}}])
+    assert cache.sync(site=site, persist=False) == {"inserted": 0, "updated": 0, "deleted": 0}
+    assert site.requests[0]["rcstart"] == "2020-08-02T00:00:00Z"
+
+    # without a bundled snapshot, the catalogues are loaded again instead
+    monkeypatch.setattr(imslp.interfaces.internal, "_get_bundled_catalogue_path", lambda name: None)
+    assert imslp.interfaces.internal._get_sync_baseline() is None
+
+    cache = imslp.interfaces.internal.CatalogueCache(people=records[:5], works=records[:5])
+    site = FakeSite([])
+    assert cache.sync(site=site) == {"inserted": 2 * TOTAL, "updated": 0, "deleted": 10}
+    assert site.requests == []
+    assert list(cache.get_catalogue("works")) == records
+    assert imslp.interfaces.disk_cache.read_sync_timestamp() is not None
+
+    site = FakeSite([{"query": {"recentchanges": []}}])
+    cache.sync(site=site)
+    assert site.requests[0]["rcstart"] == imslp.interfaces.disk_cache.read_sync_timestamp()
+
+
+def test_sync_refetches_edited_and_restored_records(monkeypatch, tmp_path):
+    monkeypatch.setenv("IMSLP_CACHE_DIR", str(tmp_path))
+
+    # the internal IMSLP API sorts the records by title
+    worklist = sorted(
+        ({"id": "Work {}".format(i), "parent": "Category:Composer {}".format(i % 7)} for i in range(TOTAL)),
+        key=lambda record: record["id"])
+    requested_starts = []
+
+    def sorted_worklist_get(url, *args, **kwargs):
+        start = int(re.search(r"start=(\d+)", url).group(1))
+        requested_starts.append(start)
+        obj = {str(i): worklist[i] for i in range(start, min(start + PAGE_SIZE, len(worklist)))}
+        obj["metadata"] = {"moreresultsavailable": start + PAGE_SIZE < len(worklist)}
+        return FakeResponse(obj)
+
+    monkeypatch.setattr(imslp.interfaces.transport, "get", sorted_worklist_get)
+
+    # the cached catalogue misses a deleted work, and has outdated records
+    works = [dict(record) for record in worklist if record["id"] != "Work 3"]
+    for work in works:
+        if work["id"] in ("Work 8", "Work 42"):
+            work["parent"] = "Category:Somebody"
+    cache = imslp.interfaces.internal.CatalogueCache(people=[], works=works)
+    cache._starts.update(people=len(worklist), works=len(worklist))
+
+    site = FakeSite([{"query": {"recentchanges": [
+        dict(type="edit", title="Work 8", ns=0, timestamp="2020-10-01T00:00:00Z"),
+        dict(type="categorize", title="Category:Composer 0", ns=14, timestamp="2020-10-01T00:00:01Z",
+             comment="[[Work 42]] added to category"),
+        dict(type="edit", title="Work 10", ns=0, timestamp="2020-10-01T00:00:02Z"),
+        dict(type="edit", title="Work 11", ns=0, timestamp="2020-10-01T00:00:02Z"),
+        dict(type="log", title="Work 3", ns=0, timestamp="2020-10-01T00:00:03Z",
+             logtype="delete", logaction="restore"),
+    ]}}])
+
+    requested_starts.clear()
+    stats = cache.sync(site=site, since="2020-08-02T00:00:00Z", persist=False)
+    assert stats == {"inserted": 1, "updated": 2, "deleted": 0}
+
+    # the edited, recategorized and restored records are those of the API,
+    # fetched with one request per page (after one request past the
+    # high-water mark of each catalogue)
+    by_id = {work["id"]: work for work in cache.get_catalogue("works")}
+    assert len(by_id) == len(worklist)
+    assert all(by_id[work["id"]] == work for work in worklist)
+    assert len(requested_starts) == 2 + 4
@@ -0,0 +1,136 @@
+
+import os
+
+import imslp.interfaces.scraping
+import imslp.interfaces.transport
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+WORK_TITLE = "Symphony No.5, Op.67 (Beethoven, Ludwig van)"
+FILE_TITLES = [
+    "File:PMLP01586-Beethoven Symphony No.5 Score.pdf",
+    "File:PMLP01586-Beethoven Symphony No.5 Violin1.pdf",
+]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class FakeSite:
+    """
+    Stand-in for a `mwclient.Site` that answers `query` actions for a
+    single work page and its files.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def get(self, action, titles, prop, **kwargs):
+        self.queries.append(titles)
+        pages = dict()
+        for i, title in enumerate(titles.split("|")):
+            if title == WORK_TITLE:
+                pages[str(i)] = {
+                    "pageid": 1, "ns": 0, "title": title,
+                    "images": [{"ns": 6, "title": file_title} for file_title in FILE_TITLES],
+                }
+            elif title in FILE_TITLES:
+                pages[str(i)] = {
+                    "pageid": 2 + i, "ns": 6, "title": title,
+                    "imageinfo": [{
+                        "url": "//imslp.org/files/{}".format(title[5:]),
+                        "size": 1000 + i,
+                        "sha1": "{:040x}".format(i),
+                    }],
+                }
+            else:
+                pages[str(-i - 1)] = {"ns": 0, "title": title, "missing": ""}
+        return {"query": {"pages": pages}}
+
+
+def test_fetch_images_metadata_batch(monkeypatch):
+    monkeypatch.setattr(
+        imslp.interfaces.scraping, "_fetch_page_html",
+        lambda title: read_fixture("work_page.html"))
+
+    site = FakeSite()
+    results = imslp.interfaces.scraping.fetch_images_metadata_batch(
+        [WORK_TITLE, "Missing Work", WORK_TITLE], site=site)
+
+    assert len(site.queries) == 2
+    assert results[1] == []
+    assert results[0] == results[2]
+
+    score, violin = results[0]
+    assert score["id"] == 10101
+    assert score["download_count"] == 12345
+    assert score["page_count"] == 82
+    assert score["rating"] == 9.2
+    assert score["rating_count"] == 25
+    assert score["url"] == "http://imslp.org/files/PMLP01586-Beethoven Symphony No.5 Score.pdf"
+    assert violin["id"] == 10102
+    assert violin["download_count"] == 678
+
+
+class FakeImage:
+
+    def __init__(self, title):
+        self.base_title = title[len("File:"):]
+        self.imageinfo = {"url": "//imslp.org/files/{}".format(self.base_title), "size": 1, "sha1": "0"}
+
+
+def strip_obj(images):
+    return [{k: v for k, v in image.items() if k != "obj"} for image in images]
+
+
+def test_single_pass_matches_legacy_parsing():
+    content = read_fixture("work_page.html")
+
+    for parser in ("html.parser", None):
+        legacy = imslp.interfaces.scraping._parse_images_metadata(
+            content, list(map(FakeImage, FILE_TITLES)), single_pass=False, parser=parser)
+        single_pass = imslp.interfaces.scraping._parse_images_metadata(
+            content, list(map(FakeImage, FILE_TITLES)), single_pass=True, parser=parser)
+
+        assert len(legacy) == 2
+        assert strip_obj(single_pass) == strip_obj(legacy)
+
+
+CATEGORY_PAGE = """<html><body>
+<a href="/index.php?title=Category:O%27Brien,_Jane&amp;customcat=ccperson1&amp;from={next}" class="categorypaginglink" title="Category:O'Brien, Jane">next 200</a>
+<table class="wikitable"><tr><th>Work</th><th>Key</th></tr>{rows}</table>
+</body></html>"""
+
+LAST_CATEGORY_PAGE = """<html><body>
+<table class="wikitable"><tr><th>Work</th><th>Key</th></tr>{rows}</table>
+</body></html>"""
+
+
+class FakeCategoryResponse:
+
+    ok = True
+
+    def __init__(self, content):
+        self.content = content
+
+
+def fake_category_get(url, *args, **kwargs):
+    page = int(url.split("from=")[1]) if "from=" in url else 0
+    rows = "".join(
+        "<tr><td>Piece&#xA0;{}</td><td>C major</td></tr>".format(3 * page + i) for i in range(3))
+    template = CATEGORY_PAGE if page < 2 else LAST_CATEGORY_PAGE
+    return FakeCategoryResponse(template.format(next=page + 1, rows=rows).encode("utf-8"))
+
+
+def test_fetch_category_table_pipelined(monkeypatch):
+    monkeypatch.setattr(imslp.interfaces.transport, "get", fake_category_get)
+
+    assert imslp.interfaces.scraping._peek_category_next_page_link(
+        fake_category_get("first").content, "Category:O'Brien, Jane").endswith("&from=1")
+
+    expected = [{"Work": "Piece {}".format(i), "Key": "C major"} for i in range(9)]
+    assert imslp.interfaces.scraping.fetch_category_table("O'Brien, Jane", pipelined=False) == expected
+    assert imslp.interfaces.scraping.fetch_category_table("O'Brien, Jane") == expected
@@ -0,0 +1,170 @@
+
+import re
+
+import imslp.client
+import imslp.helpers.search_index
+import imslp.helpers.string_search
+import imslp.interfaces.internal
+
+
+WORKS = [
+    imslp.interfaces.internal.HashablePageRecord({
+        "id": "{} ({})".format(title, composer),
+        "permlink": "https://imslp.org/wiki/{}_({})".format(title, composer),
+        "intvals": {"worktitle": title, "composer": composer},
+    })
+    for title, composer in [
+        ("Symphony No.5, Op.67", "Beethoven, Ludwig van"),
+        ("Piano Sonata No.14, Op.27 No.2", "Beethoven, Ludwig van"),
+        ("Symphony No.9, Op.95", "Dvořák, Antonín"),
+        ("Goldberg-Variationen, BWV 988", "Bach, Johann Sebastian"),
+        ("Das wohltemperierte Klavier I, BWV 846-869", "Bach, Johann Sebastian"),
+        ("Gymnopédies", "Satie, Erik"),
+    ]
+]
+
+
+def brute_force(field, search_expr, intersect=True, case_insensitive=True):
+    return set(filter(
+        lambda record: imslp.helpers.string_search.check_search_expr_to_query(
+            query=imslp.interfaces.internal.get_record_field(record, field),
+            search_expr=search_expr,
+            intersect=intersect,
+            case_insensitive=case_insensitive),
+        WORKS))
+
+
+def test_lookup_returns_candidates():
+    index = imslp.helpers.search_index.NgramIndex(["Symphony", "Sonata", "symphonic"])
+    assert index.lookup("SYMPHON") == {0, 2}
+    assert index.lookup("quartet") == set()
+    assert index.lookup("so") is None
+
+
+def test_search_works_matches_scan(monkeypatch):
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache(works=WORKS))
+
+    for search_expr in [
+        "symphony", "Symphony", "BWV", "op.", "No", "x", "",
+        ["sym", "op.67"], ["variationen", "gymno"],
+        re.compile(r"No\.\d+"), lambda title: title.endswith("s"),
+        ["symphony", re.compile(r"9")],
+    ]:
+        for intersect in (True, False):
+            for case_insensitive in (True, False):
+                expected = brute_force("intvals.worktitle", search_expr, intersect, case_insensitive)
+                assert imslp.client.ImslpClient.search_works(
+                    title=search_expr,
+                    intersect=intersect,
+                    case_insensitive=case_insensitive) == (
+                    expected if intersect else set(WORKS))
+
+    assert imslp.client.ImslpClient.search_works(title="symphony", composer="beethoven") == {WORKS[0]}
+    assert imslp.client.ImslpClient.search_works(
+        title="gymno", composer="beethoven", intersect=False) == {WORKS[0], WORKS[1], WORKS[5]}
+
+
+def test_search_works_accent_insensitive(monkeypatch):
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache(works=WORKS))
+
+    assert imslp.helpers.string_search.normalize_search_key("Dvořák, Antonín") == "dvorak, antonin"
+
+    assert imslp.client.ImslpClient.search_works(composer="dvorak") == set()
+    assert imslp.client.ImslpClient.search_works(composer="dvorak", accent_insensitive=True) == {WORKS[2]}
+    assert imslp.client.ImslpClient.search_works(composer="DVOŘÁK", accent_insensitive=True) == {WORKS[2]}
+    assert imslp.client.ImslpClient.search_works(
+        title=["gymnopedies", "symphony"], composer=["antonin", "erik"],
+        intersect=False, accent_insensitive=True) >= {WORKS[0], WORKS[2], WORKS[5]}
+
+    # regular expressions and callables see the raw values, not the search keys
+    assert imslp.client.ImslpClient.search_works(
+        composer=re.compile(r"^Dvořák"), accent_insensitive=True) == {WORKS[2]}
+    assert imslp.client.ImslpClient.search_works(
+        composer=re.compile(r"^[A-Z]\w+, Antonín$"), accent_insensitive=True) == {WORKS[2]}
+    assert imslp.client.ImslpClient.search_works(
+        composer=["dvorak", lambda value: value.startswith("Dvořák")], accent_insensitive=True) == {WORKS[2]}
+    assert list(imslp.client.ImslpClient.iter_search_works(
+        title=re.compile(r"Gymnopédies"), composer="ERIK", accent_insensitive=True)) == [WORKS[5]]
+
+
+def test_rank_returns_top_k():
+    index = imslp.helpers.search_index.NgramIndex(["Symphony", "Sonata", "symphonic", "Quartet"])
+    scores = index.scores("symphny")
+    assert 3 not in scores
+    assert scores[0] > scores[2] > scores.get(1, 0)
+    assert index.rank("symphny", k=2) == [(scores[0], 0), (scores[2], 2)]
+    assert index.rank("xy") == []
+
+
+def test_rank_works_is_fuzzy(monkeypatch):
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache(works=WORKS))
+
+    results = imslp.client.ImslpClient.rank_works(title="Goldberg Variatons", limit=3)
+    assert results[0][0] is WORKS[3]
+    assert [score for _, score in results] == sorted([score for _, score in results], reverse=True)
+
+    results = imslp.client.ImslpClient.rank_works(composer="Dvorak, Antonin", limit=1)
+    assert results == [(WORKS[2], 1.0)]
+
+    # works of equal score are ordered by download count
+    results = imslp.client.ImslpClient.rank_works(composer="Beethoven", limit=2)
+    assert [record for record, _ in results] == [WORKS[0], WORKS[1]]
+    results = imslp.client.ImslpClient.rank_works(
+        composer="Beethoven", limit=2, download_counts={WORKS[1]["id"]: 10})
+    assert [record for record, _ in results] == [WORKS[1], WORKS[0]]
+
+    assert imslp.client.ImslpClient.rank_works(title="Symphony", min_score=0.99) == []
+
+
+def test_secondary_indexes(monkeypatch):
+    people = [
+        imslp.interfaces.internal.HashablePageRecord({
+            "id": "Category:{}".format(name),
+            "permlink": "https://imslp.org/wiki/Category:{}".format(name),
+        })
+        for name in ["Bach, Johann Sebastian", "Satie, Erik"]
+    ]
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_default_cache",
+        imslp.interfaces.internal.CatalogueCache(people=people, works=WORKS))
+
+    assert imslp.client.ImslpClient.works_by_composer("Bach, Johann Sebastian") == [WORKS[3], WORKS[4]]
+    assert imslp.client.ImslpClient.works_by_composer(people[1]["id"]) == [WORKS[5]]
+    assert imslp.client.ImslpClient.works_by_composer("Bach") == []
+
+    assert imslp.client.ImslpClient.get_work(WORKS[2]["permlink"]) is WORKS[2]
+    assert imslp.client.ImslpClient.get_work("https://imslp.org/wiki/Nothing") is None
+
+    assert imslp.client.ImslpClient.get_person("Category:Satie, Erik") is people[1]
+    assert imslp.client.ImslpClient.get_person("Bach, Johann Sebastian") is people[0]
+    assert imslp.client.ImslpClient.get_person("Bach") is None
+
+
+def test_iter_search_works_is_lazy_and_ordered(monkeypatch):
+    monkeypatch.setattr(
+        imslp.interfaces.internal, "_default_cache", imslp.interfaces.internal.CatalogueCache(works=WORKS))
+
+    for title, composer in [
+        ("symphony", None), (None, "bach"), ("op.", "beethoven"), (["bwv", "gymno"], ["satie", "bach"]),
+        (re.compile(r"No\.\d+"), "o"), (None, None), ("nothing", None),
+    ]:
+        for intersect in (True, False):
+            expected = sorted(
+                imslp.client.ImslpClient.search_works(title=title, composer=composer, intersect=intersect),
+                key=WORKS.index)
+            assert list(imslp.client.ImslpClient.iter_search_works(
+                title=title, composer=composer, intersect=intersect)) == expected
+            assert list(imslp.client.ImslpClient.iter_search_works(
+                title=title, composer=composer, intersect=intersect, offset=1, limit=2)) == expected[1:3]
+
+    assert list(imslp.client.ImslpClient.iter_search_works(composer="dvorak", accent_insensitive=True)) == [WORKS[2]]
+
+    # the search stops as soon as enough works are found
+    checked = []
+    results = imslp.client.ImslpClient.iter_search_works(
+        title=lambda title: checked.append(title) or True, limit=2)
+    assert list(results) == WORKS[:2]
+    assert len(checked) == 2
@@ -0,0 +1,44 @@
+
+import itertools
+import re
+
+import imslp.helpers.string_search
+
+
+QUERIES = [
+    "Symphony No.5, Op.67",
+    "Piano Sonata No.14, Op.27 No.2",
+    "Dvořák, Antonín",
+    "BACH, Johann Sebastian",
+    "",
+]
+
+SEARCH_EXPRS = [
+    None,
+    "",
+    "op.",
+    "OP.",
+    "sonata",
+    re.compile(r"No\.\d+"),
+    re.compile(r"bach"),
+    lambda query: len(query) > 20,
+    [],
+    ["op.", "no."],
+    ["sonata", "symphony", "bach"],
+    ["symphony", re.compile(r"\d"), lambda query: query.startswith("S")],
+    [["op.", "67"], "antonín"],
+    42,
+]
+
+
+def test_compiled_search_expr_matches_interpreted():
+    for search_expr, case_insensitive, intersect in itertools.product(
+            SEARCH_EXPRS, (True, False), (True, False)):
+
+        matcher = imslp.helpers.string_search.compile_search_expr(
+            search_expr=search_expr, case_insensitive=case_insensitive, intersect=intersect)
+
+        for query in QUERIES:
+            assert matcher(query) == imslp.helpers.string_search.check_search_expr_to_query(
+                query=query, search_expr=search_expr,
+                case_insensitive=case_insensitive, intersect=intersect)
@@ -0,0 +1,88 @@
+
+import asyncio
+import time
+
+import imslp.interfaces.transport
+
+
+def test_token_bucket_limits_rate():
+    bucket = imslp.interfaces.transport.TokenBucket(rate=50, capacity=2)
+
+    t0 = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+    elapsed = time.monotonic() - t0
+
+    # two tokens are available at once, the other five arrive at 50/s
+    assert elapsed >= 0.09
+
+
+def test_sync_and_async_requests_share_global_rate_limit():
+    assert imslp.interfaces.transport.get_rate_limiter() is None
+
+    async def acquire_all(count):
+        for _ in range(count):
+            await asyncio.sleep(imslp.interfaces.transport.get_rate_limiter().reserve())
+
+    try:
+        imslp.interfaces.transport.configure(rate=50, burst=2)
+        bucket = imslp.interfaces.transport.get_rate_limiter()
+        assert isinstance(bucket, imslp.interfaces.transport.TokenBucket)
+        assert imslp.interfaces.transport.get_session().rate_limiter is bucket
+
+        # the burst is consumed by the synchronous requests, so that the
+        # asynchronous ones wait for the next tokens
+        t0 = time.monotonic()
+        bucket.acquire()
+        bucket.acquire()
+        asyncio.run(acquire_all(5))
+        assert time.monotonic() - t0 >= 0.09
+
+        # the limiter is only recreated when its settings change
+        imslp.interfaces.transport.configure(pool_size=4)
+        assert imslp.interfaces.transport.get_rate_limiter() is bucket
+    finally:
+        imslp.interfaces.transport.configure(
+            rate=0, burst=imslp.interfaces.transport.IMSLP_HTTP_BURST,
+            pool_size=imslp.interfaces.transport.IMSLP_HTTP_POOL_SIZE)
+
+    assert imslp.interfaces.transport.get_rate_limiter() is None
+
+
+def test_configure_recreates_session():
+    session = imslp.interfaces.transport.get_session()
+    assert imslp.interfaces.transport.get_session() is session
+
+    adapter = session.get_adapter("https://imslp.org/")
+    assert 503 in adapter.max_retries.status_forcelist
+
+    try:
+        imslp.interfaces.transport.configure(rate=10, pool_size=4)
+        new_session = imslp.interfaces.transport.get_session()
+        assert new_session is not session
+        assert new_session.rate_limiter is not None
+    finally:
+        imslp.interfaces.transport.configure(
+            rate=0, pool_size=imslp.interfaces.transport.IMSLP_HTTP_POOL_SIZE)
+
+
+def test_new_session_has_own_cookies_over_shared_pools():
+    session = imslp.interfaces.transport.new_session()
+    other_session = imslp.interfaces.transport.new_session()
+
+    session.cookies.set("imslp_wikiUserName", "someone")
+    assert "imslp_wikiUserName" not in other_session.cookies
+    assert "imslp_wikiUserName" not in imslp.interfaces.transport.get_session().cookies
+
+    shared = imslp.interfaces.transport.get_session()
+    assert session.get_adapter("https://imslp.org/") is shared.get_adapter("https://imslp.org/")
+    assert session.rate_limiter is None
+
+    # the session follows the settings of the shared session
+    try:
+        imslp.interfaces.transport.configure(rate=10)
+        new_shared = imslp.interfaces.transport.get_session()
+        assert session.get_adapter("https://imslp.org/") is new_shared.get_adapter("https://imslp.org/")
+        assert session.rate_limiter is imslp.interfaces.transport.get_rate_limiter() is not None
+    finally:
+        imslp.interfaces.transport.configure(rate=0)